@@ -0,0 +1,214 @@
+"""
+agents/allocationKernel.py
+───────────────────────────
+Compiled greedy-trial kernel for allocateDrivers_optimized.
+
+Public API:
+    from agents.allocationKernel import greedy_trial, kernel_backend
+
+    assign, consecutive = greedy_trial(order, increments, loads, weights,
+                                       is_heavy, consecutive, spatial, nearest,
+                                       imbalance_weight=1.5, fatigue_surcharge=0.3,
+                                       heavy_limit=None, constraints=None)
+    kernel_backend()   # "numba" | "numpy"
+
+One call runs a whole trial — every cluster in `order`, every candidate
+driver — over contiguous arrays.  Candidate scoring uses the same
+variance-update identity as optimized_allocation.ShortlistPruner:
+
+    Δ_d = Σ_k β_k · loads[d, k] + const,   β_k = (2/n)(w_k·a_k + λ·mean(a)/dims)
+
+plus the fatigue surcharge for drivers with consecutive_heavy_days ≥ 2,
+the spatial penalty and the soft-constraint bias, so it picks the same
+drivers as the calculate_penalty loop (λ and the surcharge come from
+AllocationConfig, the bias from agents.softConstraints).
+
+Numba is optional: when it is installed the loop form is compiled with
+@njit (on first use, cached on disk); otherwise a NumPy version that
+vectorises over drivers is used.
+
+Arguments (n drivers, c clusters, m dims):
+    order        int64[t]       cluster indices in assignment order
+    increments   float64[c, m]  per-dimension normalised load of each cluster
+    loads        float64[n, m]  per-dimension normalised load of each driver
+    weights      float64[m]     AllocationConfig.dim_weight_vec
+    is_heavy     bool[c]
+    consecutive  int64[n]       consecutive heavy days (copied, not mutated)
+    spatial      float64[n, c]  or shape (0, 0) when location-blind
+    nearest      int64[c, k]    candidate drivers per cluster, or (0, 0)
+    heavy_limit  int64[n]       heavy clusters only while consecutive < limit
+    bias_ptr     int64[c + 1]   column-compressed driver × cluster bias
+    bias_rows    int64[nnz]     (SoftConstraints.bias_*; empty when unused)
+    bias_vals    float64[nnz]
+
+Returns (assign int64[c] with -1 for unassigned, consecutive int64[n]).
+"""
+
+import importlib.util
+
+import numpy as np
+
+FATIGUE_SURCHARGE = 0.3
+HEAVY_DAY_LIMIT   = 2
+
+
+def _greedy_trial_loops(order, increments, loads, weights,
+                        is_heavy, consecutive, spatial, nearest,
+                        heavy_limit, bias_ptr, bias_rows, bias_vals,
+                        imbalance_weight, fatigue_surcharge):
+    n, m     = loads.shape
+    loads    = loads.copy()
+    cons     = consecutive.copy()
+    assign   = np.full(increments.shape[0], -1, dtype=np.int64)
+    beta     = np.empty(m)
+    bias     = np.zeros(n)
+    located  = spatial.shape[0] > 0
+    pruned   = nearest.shape[0] > 0
+
+    for t in range(order.shape[0]):
+        c     = order[t]
+        heavy = is_heavy[c]
+        mean_inc = 0.0
+        for k in range(m):
+            mean_inc += increments[c, k]
+        mean_inc /= m
+        for k in range(m):
+            beta[k] = (2.0 / n) * (weights[k] * increments[c, k]
+                                   + imbalance_weight * mean_inc / m)
+
+        for j in range(bias_ptr[c], bias_ptr[c + 1]):
+            bias[bias_rows[j]] += bias_vals[j]
+
+        best_d    = -1
+        best_cost = np.inf
+        for pass_ in range(2):
+            if pass_ == 1 and (best_d != -1 or not pruned):
+                break
+            count = nearest.shape[1] if (pruned and pass_ == 0) else n
+            for j in range(count):
+                d = nearest[c, j] if (pruned and pass_ == 0) else j
+                if heavy and cons[d] >= heavy_limit[d]:
+                    continue
+                cost = bias[d]
+                for k in range(m):
+                    cost += beta[k] * loads[d, k]
+                if cons[d] >= 2:
+                    cost += fatigue_surcharge
+                if located:
+                    cost += spatial[d, c]
+                if cost < best_cost:
+                    best_cost = cost
+                    best_d    = d
+
+        for j in range(bias_ptr[c], bias_ptr[c + 1]):
+            bias[bias_rows[j]] = 0.0
+
+        if best_d != -1:
+            for k in range(m):
+                loads[best_d, k] += increments[c, k]
+            if heavy:
+                cons[best_d] += 1
+            else:
+                cons[best_d] = 0
+            assign[c] = best_d
+
+    return assign, cons
+
+
+def _greedy_trial_numpy(order, increments, loads, weights,
+                        is_heavy, consecutive, spatial, nearest,
+                        heavy_limit, bias_ptr, bias_rows, bias_vals,
+                        imbalance_weight, fatigue_surcharge):
+    n, m    = loads.shape
+    loads   = loads.copy()
+    cons    = consecutive.copy()
+    assign  = np.full(increments.shape[0], -1, dtype=np.int64)
+    located = spatial.shape[0] > 0
+    pruned  = nearest.shape[0] > 0
+    everyone = np.arange(n)
+
+    for c in order:
+        inc   = increments[c]
+        heavy = is_heavy[c]
+        beta  = (2.0 / n) * (weights * inc + imbalance_weight * inc.mean() / m)
+
+        pools = (nearest[c], everyone) if pruned else (everyone,)
+        for pool in pools:
+            candidates = np.sort(pool)
+            if heavy:
+                candidates = candidates[cons[candidates] < heavy_limit[candidates]]
+            if len(candidates):
+                break
+        if not len(candidates):
+            continue
+
+        costs = loads[candidates] @ beta + fatigue_surcharge * (cons[candidates] >= 2)
+        if located:
+            costs = costs + spatial[candidates, c]
+        lo, hi = bias_ptr[c], bias_ptr[c + 1]
+        if lo < hi:
+            bias = np.zeros(n)
+            np.add.at(bias, bias_rows[lo:hi], bias_vals[lo:hi])
+            costs = costs + bias[candidates]
+        d = int(candidates[int(np.argmin(costs))])
+
+        loads[d] += inc
+        cons[d]   = cons[d] + 1 if heavy else 0
+        assign[c] = d
+
+    return assign, cons
+
+
+_KERNEL = None
+
+
+def numba_available() -> bool:
+    return importlib.util.find_spec("numba") is not None
+
+
+def _load_kernel():
+    global _KERNEL
+    if _KERNEL is None:
+        if numba_available():
+            from numba import njit
+            _KERNEL = ("numba", njit(cache=True)(_greedy_trial_loops))
+        else:
+            _KERNEL = ("numpy", _greedy_trial_numpy)
+    return _KERNEL
+
+
+def kernel_backend() -> str:
+    return _load_kernel()[0]
+
+
+def greedy_trial(order, increments, loads, weights,
+                 is_heavy, consecutive, spatial=None, nearest=None,
+                 imbalance_weight=1.5, fatigue_surcharge=FATIGUE_SURCHARGE,
+                 heavy_limit=None, constraints=None):
+    """`constraints` is a compiled agents.softConstraints.SoftConstraints."""
+    if spatial is None:
+        spatial = np.zeros((0, 0))
+    if nearest is None:
+        nearest = np.zeros((0, 0), dtype=np.int64)
+    if heavy_limit is None:
+        heavy_limit = np.full(loads.shape[0], HEAVY_DAY_LIMIT)
+    if constraints is not None:
+        bias = (constraints.bias_ptr, constraints.bias_rows, constraints.bias_vals)
+    else:
+        bias = (np.zeros(increments.shape[0] + 1), np.zeros(0), np.zeros(0))
+    return _load_kernel()[1](
+        np.ascontiguousarray(order,       dtype=np.int64),
+        np.ascontiguousarray(increments,  dtype=np.float64),
+        np.ascontiguousarray(loads,       dtype=np.float64),
+        np.ascontiguousarray(weights,     dtype=np.float64),
+        np.ascontiguousarray(is_heavy,    dtype=np.bool_),
+        np.ascontiguousarray(consecutive, dtype=np.int64),
+        np.ascontiguousarray(spatial,     dtype=np.float64),
+        np.ascontiguousarray(nearest,     dtype=np.int64),
+        np.ascontiguousarray(heavy_limit, dtype=np.int64),
+        np.ascontiguousarray(bias[0],     dtype=np.int64),
+        np.ascontiguousarray(bias[1],     dtype=np.int64),
+        np.ascontiguousarray(bias[2],     dtype=np.float64),
+        float(imbalance_weight),
+        float(fatigue_surcharge),
+    )
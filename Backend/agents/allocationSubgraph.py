@@ -5,36 +5,72 @@ Allocation sub-graph — runs after contextSubgraph.
 
 Nodes (in order):
   1. planner          — deterministic: picks strategy from anomaly ratio
-  2. core_allocator   — deterministic: runs algorithm with LLM-tuned weights
+  2. core_allocator   — deterministic: runs algorithm with LLM-tuned weights,
+                        or reuses / repairs the speculative allocation
   3. llm_swap_agent   — LLM: proposes up to 3 validated cluster swaps
   4. fairness_scorer  — deterministic: computes 0–1 workload equity score
+
+Repair runs (a non-empty `fixed_assignment`, set by the supervisor's
+reallocator) go core_allocator → fairness_scorer: the kept clusters stay
+with their drivers, only the rest is re-placed, and the strategy and
+swaps of the previous attempt carry over.
 """
 
 import copy
 import json
 import numpy as np
-from typing import TypedDict, Dict, Any, List
+from typing import TypedDict, Dict, Any, List, TYPE_CHECKING
 
-from langchain_groq import ChatGroq
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
 
 # Same package — direct import
 from agents.optimized_allocation import (
     allocateDrivers_optimized,
     flatten_effort_vector,
-    DIM_WEIGHTS,
+    effort_vector_dict,
+    dimension_loads,
+    config_for,
     HEAVY_PERCENTILE,
 )
+from agents.dispatchStore import resolve
+from agents.softConstraints import compile_soft_constraints
+from agents.spatialIndex import spatial_index_for
+from agents.allocationKernel import greedy_trial, kernel_backend
+from telemetry import current_span, span, traced_node
+
+# Score only the k nearest drivers per cluster when drivers are located;
+# None scores every eligible driver.  Fleets under NEAREST_FLEET_FACTOR·k
+# located drivers score everyone: the nearest pass would cover most of
+# them and, for small fleets, pull clusters onto the same few drivers.
+# On the synthetic depots k=64 matches the full set's equity and mean
+# driver→cluster distance and halves allocation time at 2000 drivers;
+# k=8 (the "spatial" benchmark variant) costs 0.02–0.15 equity.
+NEAREST_DRIVERS_K    = 64
+NEAREST_FLEET_FACTOR = 2
+
+# Run each trial in agents.allocationKernel (Numba when installed, NumPy
+# otherwise) instead of the Python candidate loop.
+USE_ALLOCATION_KERNEL = True
+
+# A speculative allocation is repaired only while the tuned inputs move at
+# most this share of clusters; beyond it core_allocator starts afresh.
+SPECULATIVE_REPAIR_LIMIT = 0.5
+
+# Clusters per block of _SpeculativeReplay's cost products.
+SPECULATIVE_CHECK_BLOCK = 512
 
 
 # ─── State ───────────────────────────────────────────────────────────────────
 
 class AllocationState(TypedDict):
-    effort_vectors:   Dict[str, Any]
-    drivers:          Dict[str, Any]
+    inputs:           str              # agents.dispatchStore handle
+    heavy_day_caps:   Dict[str, int]   # caps on the inputs' consecutive heavy days
     tuned_weights:    Dict[str, float]
     soft_constraints: List[Dict]
     anomalies:        List[str]
     context_notes:    str
+    fixed_assignment: Dict[str, str]   # repair: cluster → driver to keep
     strategy:         str
     allocation:       Dict[str, str]   # cluster → driver
     swap_log:         List[Dict]
@@ -101,7 +137,7 @@ def _identify_heavy_clusters(effort_vectors: Dict[str, Any]) -> set:
 # ─── Node 1: Planner (deterministic) ─────────────────────────────────────────
 
 def planner_node(state: AllocationState) -> dict:
-    n_total   = len(state["effort_vectors"])
+    n_total   = len(resolve(state["inputs"]).effort_vectors)
     n_anomaly = len(state["anomalies"])
     ratio     = n_anomaly / max(n_total, 1)
     strategy  = "conservative" if ratio > 0.3 else "balanced"
@@ -112,44 +148,339 @@ def planner_node(state: AllocationState) -> dict:
 
 # ─── Node 2: Core Allocator (deterministic + LLM weight injection) ────────────
 
+def _starting_drivers(inputs, caps) -> Dict[str, Any]:
+    """A private copy of the pre-dispatch drivers with `caps` applied."""
+    drivers = copy.deepcopy(inputs.drivers)
+    for name, cap in (caps or {}).items():
+        if name in drivers:
+            drivers[name]["consecutive_heavy_days"] = min(
+                drivers[name].get("consecutive_heavy_days", 0), cap
+            )
+    return drivers
+
+
+def _compile_constraints(state, inputs, driver_names, config):
+    if not state.get("soft_constraints"):
+        return None
+    constraints = compile_soft_constraints(
+        state["soft_constraints"], driver_names, list(inputs.effort_vectors), config
+    )
+    print(f"[CoreAllocator] soft constraints: {constraints.applied} applied, "
+          f"{len(constraints.bias_vals)} biased pair(s)")
+    return constraints
+
+
+def _nearest_k(n_drivers):
+    """NEAREST_DRIVERS_K, or None when the fleet is too small for it to prune."""
+    k = NEAREST_DRIVERS_K
+    return k if k and n_drivers >= NEAREST_FLEET_FACTOR * k else None
+
+
+def _allocate(effort_vectors, drivers, cluster_locations, config,
+              constraints=None, fixed_assignment=None, trials=3, label=None,
+              spatial_index=None):
+    """allocateDrivers_optimized with this sub-graph's settings; mutates `drivers`."""
+    if spatial_index is None:
+        spatial_index = spatial_index_for(drivers, effort_vectors, cluster_locations)
+    with span(label or "allocateDrivers_optimized", kind="allocator",
+              clusters=len(effort_vectors),
+              drivers=len(drivers),
+              backend=kernel_backend() if USE_ALLOCATION_KERNEL else "python"):
+        return allocateDrivers_optimized(
+            effort_vectors, drivers,
+            spatial_index=spatial_index,
+            nearest_k=_nearest_k(len(drivers)),
+            use_kernel=USE_ALLOCATION_KERNEL,
+            fixed_assignment=fixed_assignment,
+            config=config,
+            constraints=constraints,
+            trials=trials,
+        )
+
+
+def speculative_allocation(effort_vectors:    Dict[str, Any],
+                           drivers:           Dict[str, Any],
+                           cluster_locations: Dict[str, List[float]]) -> Dict[str, Any]:
+    """
+    The allocation core_allocator would make with the default weights and
+    no soft constraints, computed before the context phase has produced
+    either.  The flattened cluster / driver vectors and the spatial index
+    are kept with it, so reconciling it later needs no per-driver work.
+    """
+    drivers_copy  = copy.deepcopy(drivers)
+    spatial_index = spatial_index_for(drivers, effort_vectors, cluster_locations)
+    allocation    = _allocate(effort_vectors, drivers_copy, cluster_locations,
+                              config_for(None), label="speculative_allocation",
+                              spatial_index=spatial_index)
+    return {
+        "allocation":    allocation,
+        "drivers":       drivers_copy,
+        "clusters":      np.array([flatten_effort_vector(v) for v in effort_vectors.values()]),
+        "efforts":       np.array([flatten_effort_vector(d["cumulative_effort_vector"])
+                                   for d in drivers.values()]),
+        "spatial_index": spatial_index,
+    }
+
+
+class _SpeculativeReplay:
+    """
+    A speculative allocation replayed under the tuned config and
+    constraints, without another full allocator pass.
+
+    Clusters are taken in the tuned greedy order (by tuned magnitude, as
+    the tuned run's first trial takes them).  Before cluster t the
+    drivers' dimension loads are V0 plus the speculative clusters placed
+    earlier, so every driver's greedy step cost,
+
+        β_t·V0[d] + Σ_{s<t, spec(s)=d} β_t·inc_s + surcharge + spatial + bias
+
+    (ShortlistPruner's identity), is a (clusters × drivers) product plus a
+    per-driver sum over the (clusters × clusters) matrix β·incᵀ, done in
+    blocks of SPECULATIVE_CHECK_BLOCK clusters.  kept() returns the
+    clusters whose speculative driver is eligible and cheapest there —
+    the choice the tuned greedy pass would make given the same earlier
+    placements.  repair() loads the kept clusters up front and runs one
+    kernel trial over the rest, as allocateDrivers_optimized does with a
+    fixed_assignment and trials=1, rewriting only the drivers whose
+    clusters or heavy days changed.
+    """
+
+    def __init__(self, inputs, speculative, days, config, constraints):
+        self.names       = list(inputs.drivers)
+        self.clusters    = list(inputs.effort_vectors)
+        self.speculative = speculative
+        self.config      = config
+        self.constraints = constraints
+        indices_map, self.decay, _ = config.feature_meta
+
+        vectors = speculative["clusters"]
+        low     = vectors.min(axis=0)
+        width   = vectors.max(axis=0) - low
+        width[width == 0] = 1.0
+        magnitude = (dimension_loads((vectors - low) / width, indices_map)
+                     * config.dim_weight_vec).sum(axis=1)
+        self.order      = np.argsort(magnitude)[::-1]
+        self.increments = dimension_loads(vectors / width, indices_map)
+        self.loads      = dimension_loads((speculative["efforts"] * self.decay - low) / width,
+                                          indices_map)
+        self.heavy = ((vectors[:, 0] >= np.percentile(vectors[:, 0], config.heavy_percentile * 100))
+                      | (vectors[:, 10] >= np.percentile(vectors[:, 10], config.heavy_percentile * 100)))
+        self.days  = days
+        self.limit = constraints.heavy_limit if constraints is not None \
+            else np.full(len(self.names), config.heavy_day_limit)
+
+        index = speculative["spatial_index"]
+        self.spatial = index.distance_km * config.spatial_penalty_per_km \
+            if index is not None else None
+        k = _nearest_k(len(self.names))
+        self.nearest = index.nearest_drivers(k) if index is not None and k else None
+
+        driver_index = {name: i for i, name in enumerate(self.names)}
+        self.own = np.array([driver_index.get(speculative["allocation"].get(c), -1)
+                             for c in self.clusters], dtype=np.int64)
+
+    def kept(self) -> Dict[str, str]:
+        order      = self.order
+        increments = self.increments[order]
+        beta       = (2.0 / len(self.names)) * (
+            self.config.dim_weight_vec * increments
+            + self.config.imbalance_weight * increments.mean(axis=1, keepdims=True)
+            / increments.shape[1]
+        )
+        own   = self.own[order]
+        heavy = self.heavy[order]
+        days  = self.days
+
+        # Heavy days of each speculative driver after each of its clusters.
+        after, running = np.zeros(len(order), dtype=np.int64), {}
+        for t, d in enumerate(own):
+            if d >= 0:
+                running[d] = running.get(d, days[d]) + 1 if heavy[t] else 0
+                after[t]   = running[d]
+        placed = np.flatnonzero(own >= 0)
+        by_own = placed[np.argsort(own[placed], kind="stable")]
+        used, first = np.unique(own[by_own], return_index=True)
+        bounds = np.append(first, len(by_own))
+
+        stands = np.zeros(len(order), dtype=bool)
+        for lo in range(0, len(order), SPECULATIVE_CHECK_BLOCK):
+            hi   = min(lo + SPECULATIVE_CHECK_BLOCK, len(order))
+            rows = np.arange(hi - lo)
+            step = np.arange(lo, hi)
+            mine = own[lo:hi]
+
+            cost = beta[lo:hi] @ self.loads.T
+            if len(by_own):
+                earlier = (beta[lo:hi] @ increments[by_own].T) * (by_own[None, :] < step[:, None])
+                cost[:, used] += np.add.reduceat(earlier, first, axis=1)
+
+            before = np.broadcast_to(days, cost.shape).copy()
+            for j, d in enumerate(used):
+                steps_d = by_own[bounds[j]:bounds[j + 1]]
+                last    = np.searchsorted(steps_d, step) - 1
+                before[:, d] = np.where(last >= 0, after[steps_d[np.maximum(last, 0)]], days[d])
+            cost += self.config.fatigue_surcharge * (before >= 2)
+            if self.spatial is not None:
+                cost += self.spatial[:, order[lo:hi]].T
+            if self.constraints is not None and self.constraints.has_bias:
+                for r in rows:
+                    bias = self.constraints.column(order[lo + r])
+                    if bias is not None:
+                        cost[r] += bias
+
+            allowed = ~(heavy[lo:hi, None] & (before >= self.limit[None, :]))
+            if self.nearest is not None:
+                near = np.zeros_like(allowed)
+                near[rows[:, None], self.nearest[order[lo:hi]]] = True
+                # The allocator widens to every driver when no near one is eligible.
+                near[~(near & allowed).any(axis=1)] = True
+                allowed &= near
+            cost[~allowed] = np.inf
+
+            best = cost.min(axis=1)
+            own_ok = (mine >= 0) & allowed[rows, mine]
+            stands[lo:hi] = own_ok & (cost[rows, mine] <= best + 1e-9 * np.maximum(1.0, np.abs(best)))
+
+        # Kept clusters are loaded onto their drivers unchecked (in this
+        # order, without the dropped ones), so drop a kept heavy cluster
+        # whose driver would be at its heavy-day limit by then.
+        kept, running = {}, {}
+        for t in np.flatnonzero(stands):
+            d = own[t]
+            if not heavy[t]:
+                running[d] = 0
+            elif running.get(d, days[d]) < self.limit[d]:
+                running[d] = running.get(d, days[d]) + 1
+            else:
+                continue
+            kept[self.clusters[order[t]]] = self.names[d]
+        return kept
+
+    def repair(self, kept: Dict[str, str]):
+        """(allocation, drivers) with `kept` fixed and the rest re-placed."""
+        cluster_index = {name: i for i, name in enumerate(self.clusters)}
+        driver_index  = {name: i for i, name in enumerate(self.names)}
+        fixed = np.full(len(self.clusters), -1, dtype=np.int64)
+        for c, d in kept.items():
+            fixed[cluster_index[c]] = driver_index[d]
+
+        loads, days = self.loads.copy(), self.days.copy()
+        for c in self.order:
+            d = fixed[c]
+            if d >= 0:
+                loads[d] += self.increments[c]
+                days[d]   = days[d] + 1 if self.heavy[c] else 0
+        moved = np.array([c for c in self.order if fixed[c] < 0], dtype=np.int64)
+
+        placed, days = greedy_trial(
+            moved, self.increments, loads, self.config.dim_weight_vec,
+            self.heavy, days, self.spatial, self.nearest,
+            imbalance_weight=self.config.imbalance_weight,
+            fatigue_surcharge=self.config.fatigue_surcharge,
+            heavy_limit=self.limit,
+            constraints=self.constraints,
+        )
+        final      = np.where(fixed >= 0, fixed, placed)
+        allocation = {self.clusters[c]: self.names[final[c]] for c in self.order if final[c] >= 0}
+
+        efforts = self.speculative["efforts"] * self.decay
+        np.add.at(efforts, final[final >= 0], self.speculative["clusters"][final >= 0])
+        previous = self.speculative["drivers"]
+        touched  = set(final[moved][final[moved] >= 0]) | set(self.own[moved][self.own[moved] >= 0])
+        touched |= {d for d, name in enumerate(self.names)
+                    if previous[name].get("consecutive_heavy_days") != days[d]}
+        drivers = dict(previous)
+        for d in touched:
+            name = self.names[d]
+            drivers[name] = {**previous[name],
+                             "cumulative_effort_vector": effort_vector_dict(efforts[d]),
+                             "consecutive_heavy_days":   int(days[d])}
+        return allocation, drivers
+
+
+def _reconcile(inputs, days, speculative, config, constraints):
+    """
+    Reuses or repairs a speculative allocation: (path, allocation,
+    drivers), path "reused" or "repaired", or ("full", None, None) when
+    the tuned inputs move more than SPECULATIVE_REPAIR_LIMIT of it.
+    """
+    if config == config_for(None) and constraints is None:
+        print("[CoreAllocator] speculative allocation reused (default inputs)")
+        return "reused", speculative["allocation"], speculative["drivers"]
+
+    replay = _SpeculativeReplay(inputs, speculative, days, config, constraints)
+    kept   = replay.kept()
+    moved  = len(inputs.effort_vectors) - len(kept)
+    if moved == 0:
+        print("[CoreAllocator] speculative allocation reused (stands under tuned inputs)")
+        return "reused", speculative["allocation"], speculative["drivers"]
+    if moved > SPECULATIVE_REPAIR_LIMIT * len(inputs.effort_vectors):
+        print(f"[CoreAllocator] tuned inputs move {moved} cluster(s) → full run")
+        return "full", None, None
+
+    print(f"[CoreAllocator] keeping {len(kept)} speculative cluster(s), re-placing {moved}")
+    with span("speculative_repair", kind="allocator",
+              clusters=moved, drivers=len(inputs.drivers), backend=kernel_backend()):
+        allocation, drivers = replay.repair(kept)
+    return "repaired", allocation, drivers
+
+
 def core_allocator_node(state: AllocationState) -> dict:
     """
-    Temporarily patches the module-level DIM_WEIGHTS with LLM-tuned
-    values, runs the algorithm, then restores the originals.
+    Runs the algorithm with the LLM-tuned weights, passed explicitly as
+    an AllocationConfig, so concurrent dispatches never share weights.
+    Soft constraints (avoid / prefer / cap_heavy) are compiled into the
+    allocator's bias and heavy-limit arrays (agents/softConstraints.py).
+
+    A speculative allocation (default weights, started by the supervisor
+    while the context phase ran, left in the inputs' `derived` values
+    for the first attempt) is reused as is when every cluster stands
+    under the tuned inputs, and repaired incrementally when at most
+    SPECULATIVE_REPAIR_LIMIT of them moved (see _SpeculativeReplay);
+    otherwise the tuned trials run in full.  The path taken is recorded
+    on the node span as `speculative`.
+
+    The updated driver state goes to the inputs' derived values
+    (DispatchInputs.allocated_drivers), not into graph state.
 
     FIX Bug 4: drivers are deep-copied before being passed to
     allocateDrivers_optimized, which mutates its argument in-place.
     Without this, each retry compounds effort vectors from the
     previous attempt instead of starting from the original state.
     """
-    import agents.optimized_allocation as _oa
-
-    original = _oa.DIM_WEIGHTS.copy()
+    inputs = resolve(state["inputs"])
+    caps   = state.get("heavy_day_caps")
 
+    config = config_for(state.get("tuned_weights"))
     if state.get("tuned_weights"):
-        _oa.DIM_WEIGHTS.update(state["tuned_weights"])
         print(f"[CoreAllocator] tuned weights: {state['tuned_weights']}")
-    drivers_copy = copy.deepcopy(state["drivers"])
-    for c in state.get("soft_constraints", []):
-        if c.get("type") == "cap_heavy":
-            driver = c.get("driver", "")
-            cap    = int(c.get("max_consecutive", 2))
-            if driver in drivers_copy:
-                drivers_copy[driver]["consecutive_heavy_days"] = min(
-                    drivers_copy[driver].get("consecutive_heavy_days", 0), cap
-                )
-
-    allocation = allocateDrivers_optimized(state["effort_vectors"], drivers_copy)
-
-    # Restore original weights
-    _oa.DIM_WEIGHTS.update(original)
-
-    return {"allocation": allocation, "drivers": drivers_copy}
+    constraints = _compile_constraints(state, inputs, list(inputs.drivers), config)
+
+    fixed       = state.get("fixed_assignment")
+    speculative = inputs.derived.pop("speculative", None)
+    if speculative and not fixed:
+        days = np.array([min(d.get("consecutive_heavy_days", 0), (caps or {}).get(name, np.inf))
+                         for name, d in inputs.drivers.items()], dtype=np.int64)
+        path, allocation, drivers_done = _reconcile(inputs, days, speculative,
+                                                    config, constraints)
+        node_span = current_span()
+        if node_span is not None:
+            node_span.set(speculative=path)
+        if path != "full":
+            inputs.derived["allocated_drivers"] = drivers_done
+            return {"allocation": dict(allocation)}
+
+    drivers_copy = _starting_drivers(inputs, caps)
+    allocation   = _allocate(inputs.effort_vectors, drivers_copy,
+                             inputs.cluster_locations, config, constraints,
+                             fixed_assignment=fixed)
+    inputs.derived["allocated_drivers"] = drivers_copy
+    return {"allocation": allocation}
 
 
 # ─── Node 3: LLM Swap Agent ───────────────────────────────────────────────────
 
-def llm_swap_agent_node(state: AllocationState, llm: ChatGroq) -> dict:
+def llm_swap_agent_node(state: AllocationState, llm: "ChatGroq") -> dict:
     """
     LLM reviews the allocation and proposes swaps for anomaly clusters
     on fatigued drivers or soft-constraint violations.
@@ -160,8 +491,11 @@ def llm_swap_agent_node(state: AllocationState, llm: ChatGroq) -> dict:
     prevents the LLM from inadvertently creating RULE-1 violations that
     the PolicyChecker would then penalise.
     """
-    driver_loads  = _driver_workloads(state["allocation"], state["effort_vectors"])
-    heavy_clusters = _identify_heavy_clusters(state["effort_vectors"])
+    inputs         = resolve(state["inputs"])
+    effort_vectors = inputs.effort_vectors
+    drivers        = inputs.allocated_drivers()
+    driver_loads  = _driver_workloads(state["allocation"], effort_vectors)
+    heavy_clusters = _identify_heavy_clusters(effort_vectors)
 
     prompt = f"""
 You are a logistics allocation reviewer.
@@ -209,7 +543,6 @@ Return ONLY valid JSON. No markdown.
         if not (ca in updated and cb in updated
                 and updated[ca] == da and updated[cb] == db):
             continue
-        drivers = state["drivers"]
         if ca in heavy_clusters:
             if drivers.get(db, {}).get("consecutive_heavy_days", 0) >= 2:
                 print(
@@ -239,7 +572,7 @@ Return ONLY valid JSON. No markdown.
 # ─── Node 4: Fairness Scorer (deterministic) ─────────────────────────────────
 
 def fairness_scorer_node(state: AllocationState) -> dict:
-    totals = _driver_workloads(state["allocation"], state["effort_vectors"])
+    totals = _driver_workloads(state["allocation"], resolve(state["inputs"]).effort_vectors)
     score  = _equity_score(totals)
 
     report = {
@@ -253,22 +586,35 @@ def fairness_scorer_node(state: AllocationState) -> dict:
     return {"fairness_score": score, "fairness_report": report}
 
 
+# ─── Routing ──────────────────────────────────────────────────────────────────
+
+def _route_repair(state: AllocationState) -> str:
+    return "repair" if state.get("fixed_assignment") else "full"
+
+
 # ─── Sub-graph builder ────────────────────────────────────────────────────────
 
 from langgraph.graph import StateGraph, END as LGEND
 
 
-def build_allocation_subgraph(llm: ChatGroq):
+def build_allocation_subgraph(llm: "ChatGroq"):
     builder = StateGraph(AllocationState)
 
-    builder.add_node("planner",         planner_node)
-    builder.add_node("core_allocator",  core_allocator_node)
-    builder.add_node("llm_swap_agent",  lambda s: llm_swap_agent_node(s, llm))
-    builder.add_node("fairness_scorer", fairness_scorer_node)
+    builder.add_node("planner",         traced_node("planner", planner_node))
+    builder.add_node("core_allocator",  traced_node("core_allocator", core_allocator_node))
+    builder.add_node("llm_swap_agent",  traced_node("llm_swap_agent", lambda s: llm_swap_agent_node(s, llm)))
+    builder.add_node("fairness_scorer", traced_node("fairness_scorer", fairness_scorer_node))
 
-    builder.set_entry_point("planner")
+    builder.set_conditional_entry_point(
+        _route_repair,
+        {"full": "planner", "repair": "core_allocator"},
+    )
     builder.add_edge("planner",         "core_allocator")
-    builder.add_edge("core_allocator",  "llm_swap_agent")
+    builder.add_conditional_edges(
+        "core_allocator",
+        _route_repair,
+        {"full": "llm_swap_agent", "repair": "fairness_scorer"},
+    )
     builder.add_edge("llm_swap_agent",  "fairness_scorer")
     builder.add_edge("fairness_scorer", LGEND)
 
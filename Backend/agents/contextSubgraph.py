@@ -5,22 +5,39 @@ Context sub-graph — runs before allocation.
 
 Nodes (in order):
   1. history_loader     — deterministic: summarises driver fatigue
-  2. anomaly_detector   — LLM: flags outlier clusters
-  3. llm_weight_tuner   — LLM: rewrites DIM_WEIGHTS for today
+  2. anomaly_detector   — deterministic >1.5× median outliers; LLM reviews
+                          only the borderline band just under that
+  3. llm_weight_tuner   — sweep: tunes dimension weights for today
+                          (LLM only breaks near-ties, see LLM_TIE_BREAK)
   4. constraint_gen     — LLM: emits soft avoid/prefer/cap rules
 """
 
 import json
-from typing import TypedDict, Dict, Any, List
+from typing import TypedDict, Dict, Any, List, TYPE_CHECKING
 
-from langchain_groq import ChatGroq
+import numpy as np
+
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
+
+from agents.dispatchStore import resolve
+from agents.weightSweep import sweep_weights
+
+# Weight candidates scored by the sweep.
+SWEEP_CANDIDATES = 256
+
+# Ask the LLM to choose among sweep candidates whose equity is within
+# SWEEP_TIE_TOLERANCE of the best (at most SWEEP_TIE_CHOICES of them);
+# False always takes the sweep's best.
+LLM_TIE_BREAK       = True
+SWEEP_TIE_TOLERANCE = 0.01
+SWEEP_TIE_CHOICES   = 5
 
 
 # ─── State ───────────────────────────────────────────────────────────────────
 
 class ContextState(TypedDict):
-    effort_vectors:   Dict[str, Any]
-    drivers:          Dict[str, Any]
+    inputs:           str              # agents.dispatchStore handle
     anomalies:        List[str]
     tuned_weights:    Dict[str, float]
     soft_constraints: List[Dict]
@@ -60,7 +77,7 @@ def history_loader_node(state: ContextState) -> dict:
     and produces a plain-text snapshot that LLM nodes can consume.
     """
     lines = []
-    for name, data in state["drivers"].items():
+    for name, data in resolve(state["inputs"]).drivers.items():
         ev  = data.get("cumulative_effort_vector", {})
         pl  = ev.get("physical_load", {})
         rd  = ev.get("route_distance", {})
@@ -75,33 +92,88 @@ def history_loader_node(state: ContextState) -> dict:
     return {"context_notes": note}
 
 
-# ─── Node 2: Anomaly Detector (LLM) ──────────────────────────────────────────
+# ─── Node 2: Anomaly Detector (statistics + LLM for borderline) ──────────────
+
+ANOMALY_FEATURES = {
+    "physical_weight":   lambda v: v.get("physical_load",  {}).get("total_weight",     0),
+    "stair_load_index":  lambda v: v.get("stair_load",     {}).get("stair_load_index", 0),
+    "total_distance":    lambda v: v.get("route_distance", {}).get("total_distance",   0),
+    "cognitive_density": lambda v: v.get("cognitive_density", 0),
+}
+
+# A cluster is an outlier when it exceeds ANOMALY_RATIO × the median in any
+# feature — the exact rule, flagged without the LLM.  A cluster under the
+# ratio in every feature is borderline when some feature is still above
+# BORDER_RATIO × the median with a robust z-score (x − median) / (1.4826 ·
+# MAD) of at least ANOMALY_Z_BORDER: unusually demanding for this depot
+# though not over the rule.  Borderline clusters go to the LLM when
+# LLM_BORDERLINE_REVIEW is set and are not flagged otherwise.
+ANOMALY_RATIO         = 1.5
+BORDER_RATIO          = 1.2
+ANOMALY_Z_BORDER      = 2.0
+LLM_BORDERLINE_REVIEW = True
+
 
-def anomaly_detector_node(state: ContextState, llm: ChatGroq) -> dict:
+def _robust_anomalies(effort_vectors: Dict[str, Any]):
     """
-    LLM flags clusters whose values are outliers (>1.5× median)
-    in any dimension so the allocator can treat them carefully.
+    (flagged, borderline, medians): cluster-name lists and per-feature
+    medians, from one vectorised pass over the cluster × feature matrix.
     """
-    summary = {
-        k: {
-            "physical_weight":  v.get("physical_load",  {}).get("total_weight",     0),
-            "stair_load_index": v.get("stair_load",     {}).get("stair_load_index", 0),
-            "total_distance":   v.get("route_distance", {}).get("total_distance",   0),
-            "cognitive_density": v.get("cognitive_density", 0),
-        }
-        for k, v in state["effort_vectors"].items()
-    }
+    names = list(effort_vectors)
+    if not names:
+        return [], [], {}
+    x = np.array([[float(get(v)) for get in ANOMALY_FEATURES.values()]
+                  for v in effort_vectors.values()])
+
+    median = np.median(x, axis=0)
+    mad    = 1.4826 * np.median(np.abs(x - median), axis=0)
+    above  = x > median
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(median > 0, x / median, np.where(above, np.inf, 0.0))
+        z     = np.where(mad > 0, (x - median) / mad, np.where(above, np.inf, 0.0))
+
+    flagged    = (ratio > ANOMALY_RATIO).any(axis=1)
+    borderline = ((ratio > BORDER_RATIO) & (z >= ANOMALY_Z_BORDER)).any(axis=1) & ~flagged
+    return (
+        [names[i] for i in np.flatnonzero(flagged)],
+        [names[i] for i in np.flatnonzero(borderline)],
+        dict(zip(ANOMALY_FEATURES, np.round(median, 4).tolist())),
+    )
 
-    prompt = f"""
+
+def anomaly_detector_node(state: ContextState, llm: "ChatGroq") -> dict:
+    """
+    Flags clusters whose values are outliers (>1.5× median) in any
+    dimension so the allocator can treat them carefully.  That rule is
+    applied exactly by _robust_anomalies; only the borderline band just
+    under it is shown to the LLM, so the prompt scales with that band,
+    not the depot.
+    """
+    effort_vectors = resolve(state["inputs"]).effort_vectors
+    flagged, borderline, medians = _robust_anomalies(effort_vectors)
+    reasoning = f"{len(flagged)} cluster(s) over {ANOMALY_RATIO}x the median"
+    print(f"[AnomalyDetector] flagged={len(flagged)}  borderline={len(borderline)}")
+
+    if borderline and LLM_BORDERLINE_REVIEW:
+        summary = {
+            k: {feature: get(effort_vectors[k])
+                for feature, get in ANOMALY_FEATURES.items()}
+            for k in borderline
+        }
+        prompt = f"""
 You are a logistics anomaly detector.
 
-Cluster effort data:
+Median cluster values today:
+{json.dumps(medians, indent=2)}
+
+Borderline clusters (unusually high for this depot, but under 1.5x the median):
 {json.dumps(summary, indent=2)}
 
 Driver context:
 {state["context_notes"]}
 
-Flag clusters that are outliers (>1.5x the median) in ANY dimension.
+Flag the borderline clusters that are demanding enough to be treated as
+outliers anyway.
 
 Return ONLY valid JSON. No markdown. No explanations.
 {{
@@ -109,30 +181,57 @@ Return ONLY valid JSON. No markdown. No explanations.
   "reasoning": "one short sentence"
 }}
 """
-    resp   = llm.invoke(prompt)
-    parsed = _parse_json(resp.content, {"anomaly_clusters": [], "reasoning": "parse failed"})
+        resp   = llm.invoke(prompt)
+        parsed = _parse_json(resp.content, {"anomaly_clusters": [], "reasoning": "parse failed"})
+        chosen = set(parsed.get("anomaly_clusters", []))
+        flagged   = flagged + [k for k in borderline if k in chosen]
+        reasoning = f"{reasoning}; borderline review: {parsed.get('reasoning', '')}"
 
     updated_notes = (
         state["context_notes"]
-        + f"\nAnomalies: {parsed.get('reasoning', '')}"
+        + f"\nAnomalies: {reasoning}"
     )
     return {
-        "anomalies":     parsed.get("anomaly_clusters", []),
+        "anomalies":     flagged,
         "context_notes": updated_notes,
     }
 
 
-# ─── Node 3: LLM Weight Tuner ────────────────────────────────────────────────
+# ─── Node 3: Weight Tuner (sweep + optional LLM tie-break) ────────────────────
 
-def llm_weight_tuner_node(state: ContextState, llm: ChatGroq) -> dict:
+def llm_weight_tuner_node(state: ContextState, llm: "ChatGroq") -> dict:
     """
-    LLM adjusts DIM_WEIGHTS based on today's anomaly profile and
-    driver fatigue. Values are clamped to ±40% of defaults so the
-    algorithm remains stable.
+    Picks today's dimension weights with agents.weightSweep: hundreds of
+    candidates in the ±40% box around the defaults are allocated and
+    scored for equity in one batched pass.  The LLM is consulted only to
+    break a tie — when several Pareto-front candidates score within
+    SWEEP_TIE_TOLERANCE of the best — and only if LLM_TIE_BREAK is set.
     """
-    prompt = f"""
+    inputs = resolve(state["inputs"])
+    sweep  = sweep_weights(inputs.effort_vectors, inputs.drivers,
+                           n_candidates=SWEEP_CANDIDATES)
+    front = sweep["front"]
+    if not front:
+        return {"tuned_weights": dict(DEFAULT_WEIGHTS)}
+
+    chosen = front[0]
+    note   = (f"\nWeight tuning: sweep of {sweep['evaluated']} candidates, equity "
+              f"{sweep['default_equity']:.3f} (defaults) → {chosen['equity']:.3f}")
+
+    ties = [c for c in front if c["equity"] >= chosen["equity"] - SWEEP_TIE_TOLERANCE]
+    ties = ties[:SWEEP_TIE_CHOICES]
+    if LLM_TIE_BREAK and len(ties) > 1:
+        options = "\n".join(
+            f"{i}: weights={json.dumps(c['weights'])} equity={c['equity']} "
+            f"fatigued_drivers={c['fatigued']}"
+            for i, c in enumerate(ties)
+        )
+        prompt = f"""
 You are a logistics weight tuner.
 
+A weight sweep found these near-equal options for today's dimension weights:
+{options}
+
 Default dimension weights:
 {json.dumps(DEFAULT_WEIGHTS, indent=2)}
 
@@ -141,46 +240,35 @@ Context today:
 
 Anomaly clusters (need careful handling): {state["anomalies"]}
 
-Adjust weights to reflect today's conditions. For example, if anomalies
-are mostly stair-related, increase stair_load weight.
-
-Rules:
-- Adjust each weight by at most ±40% from its default.
-- If no change is needed, return the default.
+Pick the option that best fits today's conditions. For example, if
+anomalies are mostly stair-related, prefer a higher stair_load weight.
 
 Return ONLY valid JSON. No markdown.
-{{
-  "tuned_weights": {{
-    "physical_load": <float>,
-    "stair_load": <float>,
-    "traffic_stress": <float>,
-    "route_distance": <float>,
-    "cognitive_density": <float>
-  }},
-  "reasons": {{ "<dim>": "one sentence", ... }}
-}}
+{{"choice": <option number>, "reason": "one sentence"}}
 """
-    resp   = llm.invoke(prompt)
-    parsed = _parse_json(resp.content, {"tuned_weights": DEFAULT_WEIGHTS, "reasons": {}})
+        resp   = llm.invoke(prompt)
+        parsed = _parse_json(resp.content, {})
+        try:
+            choice = int(parsed.get("choice", 0))
+        except (TypeError, ValueError):
+            choice = 0
+        if 0 <= choice < len(ties):
+            chosen = ties[choice]
+            note  += f"; tie-break → option {choice}: {parsed.get('reason', '')}"
 
-    raw     = parsed.get("tuned_weights", DEFAULT_WEIGHTS)
     clamped = {
-        dim: max(default * 0.60, min(default * 1.40, float(raw.get(dim, default))))
+        dim: max(default * 0.60, min(default * 1.40, float(chosen["weights"].get(dim, default))))
         for dim, default in DEFAULT_WEIGHTS.items()
     }
-
-    reason_str = "; ".join(
-        f"{k}: {v}" for k, v in parsed.get("reasons", {}).items()
-    )
     return {
         "tuned_weights": clamped,
-        "context_notes": state["context_notes"] + f"\nWeight tuning: {reason_str}",
+        "context_notes": state["context_notes"] + note,
     }
 
 
 # ─── Node 4: Constraint Generator (LLM) ──────────────────────────────────────
 
-def constraint_generator_node(state: ContextState, llm: ChatGroq) -> dict:
+def constraint_generator_node(state: ContextState, llm: "ChatGroq") -> dict:
     """
     LLM generates soft rules for the allocator:
       avoid     — driver should skip a cluster today
@@ -216,14 +304,16 @@ Return ONLY valid JSON. No markdown.
 
 from langgraph.graph import StateGraph, END as LGEND
 
+from telemetry import traced_node
+
 
-def build_context_subgraph(llm: ChatGroq):
+def build_context_subgraph(llm: "ChatGroq"):
     builder = StateGraph(ContextState)
 
-    builder.add_node("history_loader",   history_loader_node)
-    builder.add_node("anomaly_detector", lambda s: anomaly_detector_node(s, llm))
-    builder.add_node("llm_weight_tuner", lambda s: llm_weight_tuner_node(s, llm))
-    builder.add_node("constraint_gen",   lambda s: constraint_generator_node(s, llm))
+    builder.add_node("history_loader",   traced_node("history_loader", history_loader_node))
+    builder.add_node("anomaly_detector", traced_node("anomaly_detector", lambda s: anomaly_detector_node(s, llm)))
+    builder.add_node("llm_weight_tuner", traced_node("llm_weight_tuner", lambda s: llm_weight_tuner_node(s, llm)))
+    builder.add_node("constraint_gen",   traced_node("constraint_gen", lambda s: constraint_generator_node(s, llm)))
 
     builder.set_entry_point("history_loader")
     builder.add_edge("history_loader",   "anomaly_detector")
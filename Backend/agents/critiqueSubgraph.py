@@ -4,25 +4,34 @@ agents/critiqueSubgraph.py
 Critique sub-graph — audits the allocation after it is produced.
 
 Nodes (in order):
-  1. critic_agent    — LLM: holistic fairness score + issues
-  2. policy_checker  — deterministic: hard rule violations pull score down
+  1. pre_critic_gate — deterministic: equity score minus policy penalty;
+                       decisive scores end the sub-graph here (an accept
+                       also needs zero policy violations)
+  2. critic_agent    — LLM: holistic fairness score + issues (ambiguous band only)
+  3. policy_checker  — deterministic: hard rule violations pull score down
 """
 
 import json
-from typing import TypedDict, Dict, Any, List
+import os
+from typing import TypedDict, Dict, Any, List, TYPE_CHECKING
 
-from langchain_groq import ChatGroq
+from agents.dispatchStore import resolve
+from agents.nodeBudgets import is_degraded
+
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
 
 
 # ─── State ───────────────────────────────────────────────────────────────────
 
 class CritiqueState(TypedDict):
+    inputs:            str              # agents.dispatchStore handle
     allocation:        Dict[str, str]
-    drivers:           Dict[str, Any]
     fairness_report:   Dict[str, Any]
     soft_constraints:  List[Dict]
     anomalies:         List[str]
     context_notes:     str
+    gate_score:        float
     critique:          Dict[str, Any]
     policy_violations: List[str]
 
@@ -43,9 +52,74 @@ def _parse_json(text: str, fallback: Any) -> Any:
         return fallback
 
 
+# ─── Node 0: Pre-critic Gate (deterministic) ──────────────────────────────────
+
+# Scores below this trigger a reallocation in the supervisor.
+REALLOCATION_THRESHOLD = 0.60
+
+# The gate's score is the fairness scorer's equity (1 − CV of driver
+# workloads) minus the same capped policy deduction the critic's score
+# gets, so both live on one scale.  Outside (REJECT, ACCEPT) the outcome
+# is already decided and the LLM critic is skipped.  ACCEPT sits well
+# above REALLOCATION_THRESHOLD so the critic cannot plausibly pull a
+# gate-accepted allocation under it; REJECT sits well below it so the
+# critic cannot plausibly lift a rejected one over it.  Widen the band
+# (CRITIC_GATE_ACCEPT / CRITIC_GATE_REJECT) to send more to the LLM.
+GATE_ACCEPT_SCORE = float(os.getenv("CRITIC_GATE_ACCEPT", "0.80"))
+GATE_REJECT_SCORE = float(os.getenv("CRITIC_GATE_REJECT", "0.40"))
+
+
+def pre_critic_gate_node(state: CritiqueState) -> dict:
+    """
+    Scores the allocation without the LLM.  A decisive score becomes the
+    critique itself (source="gate"); an ambiguous one is handed on to the
+    critic agent.  Only an allocation with no policy violations is
+    accepted here — a high score with violations still goes to the critic.
+    """
+    violations = _policy_violations(state)
+    equity     = float(state["fairness_report"].get("fairness_score", 0.0))
+    score      = round(max(0.0, equity - _policy_deduction(violations)), 4)
+
+    if not _gate_decides(score, violations):
+        print(f"[PreCriticGate] score={score:.3f} violations={len(violations)} "
+              f"ambiguous → LLM critic")
+        return {"gate_score": score, "policy_violations": violations}
+
+    accepted = score >= GATE_ACCEPT_SCORE
+    print(f"[PreCriticGate] score={score:.3f} → {'accept' if accepted else 'reject'} "
+          f"(LLM critic skipped)")
+    issues = list(violations)
+    if not accepted:
+        issues.append(f"workload equity {equity:.3f} is far below target")
+    return {
+        "gate_score":        score,
+        "policy_violations": violations,
+        "critique": {
+            "score":              score,
+            "issues":             issues,
+            "suggestion":         "" if accepted else
+                                  "rebalance the heaviest drivers' clusters",
+            "driver_assessments": {},
+            "policy_violations":  violations,
+            "source":             "gate",
+        },
+    }
+
+
+def _gate_decides(score: float, violations: List[str]) -> bool:
+    if score >= GATE_ACCEPT_SCORE:
+        return not violations
+    return score <= GATE_REJECT_SCORE
+
+
+def _route_after_gate(state: CritiqueState) -> str:
+    decided = _gate_decides(state["gate_score"], state["policy_violations"])
+    return "decided" if decided else "llm"
+
+
 # ─── Node 1: Critic Agent (LLM) ──────────────────────────────────────────────
 
-def critic_agent_node(state: CritiqueState, llm: ChatGroq) -> dict:
+def critic_agent_node(state: CritiqueState, llm: "ChatGroq") -> dict:
     """
     LLM audits the allocation holistically and emits a 0–1 score.
     Score < 0.60 triggers automatic reallocation in the supervisor.
@@ -86,13 +160,28 @@ Return ONLY valid JSON. No markdown.
   }}
 }}
 """
-    resp   = llm.invoke(prompt)
+    resp = llm.invoke(prompt)
+    if is_degraded(resp):
+        # Out of time: fall back to the equity score (policy_checker applies
+        # the same deduction the gate did, so the final score is gate_score).
+        equity = float(state["fairness_report"].get("fairness_score", 0.0))
+        return {"critique": {
+            "score":               equity,
+            "issues":              ["critic_timeout"],
+            "suggestion":          "",
+            "driver_assessments":  {},
+            "source":              "fallback",
+            "deterministic_score": state.get("gate_score"),
+        }}
+
     parsed = _parse_json(resp.content, {
         "score":              0.5,
         "issues":             ["llm_parse_failure"],
         "suggestion":         "rerun with default weights",
         "driver_assessments": {},
     })
+    parsed["source"]              = "llm"
+    parsed["deterministic_score"] = state.get("gate_score")
     return {"critique": parsed}
 
 
@@ -105,7 +194,7 @@ Return ONLY valid JSON. No markdown.
 _PENALTY_PER_VIOLATION = 0.05
 _MAX_PENALTY           = 0.40
 
-def policy_checker_node(state: CritiqueState) -> dict:
+def _policy_violations(state: CritiqueState) -> List[str]:
     """
     Three hard rules the LLM cannot override:
 
@@ -117,7 +206,7 @@ def policy_checker_node(state: CritiqueState) -> dict:
     RULE-3  Every cluster in the allocation must have a non-empty driver.
     """
     allocation = state["allocation"]
-    drivers    = state["drivers"]
+    drivers    = resolve(state["inputs"]).allocated_drivers()
     anomalies  = set(state.get("anomalies", []))
     violations = []
 
@@ -151,6 +240,17 @@ def policy_checker_node(state: CritiqueState) -> dict:
         if not driver:
             violations.append(f"RULE-3: cluster '{cluster}' has no assigned driver")
 
+    return violations
+
+
+def _policy_deduction(violations: List[str]) -> float:
+    return min(_MAX_PENALTY, _PENALTY_PER_VIOLATION * len(violations))
+
+
+def policy_checker_node(state: CritiqueState) -> dict:
+    """Applies the _policy_violations rules to the LLM critic's score."""
+    violations = _policy_violations(state)
+
     if violations:
         print(f"[PolicyChecker] {len(violations)} violation(s):")
         for v in violations:
@@ -161,10 +261,7 @@ def policy_checker_node(state: CritiqueState) -> dict:
     critique      = dict(state.get("critique", {}))
     current_score = float(critique.get("score", 0.5))
 
-    # FIX Bug 2: cap total deduction so a handful of real violations
-    # can't by themselves tank the score below the 0.60 retry threshold.
-    deduction = min(_MAX_PENALTY, _PENALTY_PER_VIOLATION * len(violations))
-    adjusted  = max(0.0, current_score - deduction)
+    adjusted = max(0.0, current_score - _policy_deduction(violations))
 
     critique["score"]             = round(adjusted, 4)
     critique["policy_violations"] = violations
@@ -179,14 +276,22 @@ def policy_checker_node(state: CritiqueState) -> dict:
 
 from langgraph.graph import StateGraph, END as LGEND
 
+from telemetry import traced_node
+
 
-def build_critique_subgraph(llm: ChatGroq):
+def build_critique_subgraph(llm: "ChatGroq"):
     builder = StateGraph(CritiqueState)
 
-    builder.add_node("critic_agent",   lambda s: critic_agent_node(s, llm))
-    builder.add_node("policy_checker", policy_checker_node)
+    builder.add_node("pre_critic_gate", traced_node("pre_critic_gate", pre_critic_gate_node))
+    builder.add_node("critic_agent",    traced_node("critic_agent", lambda s: critic_agent_node(s, llm)))
+    builder.add_node("policy_checker",  traced_node("policy_checker", policy_checker_node))
 
-    builder.set_entry_point("critic_agent")
+    builder.set_entry_point("pre_critic_gate")
+    builder.add_conditional_edges(
+        "pre_critic_gate",
+        _route_after_gate,
+        {"llm": "critic_agent", "decided": LGEND},
+    )
     builder.add_edge("critic_agent",   "policy_checker")
     builder.add_edge("policy_checker", LGEND)
 
@@ -0,0 +1,115 @@
+"""
+agents/dispatchCheckpoints.py
+──────────────────────────────
+LangGraph checkpointing for the supervisor graph, so a dispatch that
+fails part-way resumes from its last completed node instead of paying
+for every LLM call again.
+
+Public API:
+    from agents.dispatchCheckpoints import get_checkpointer, dispatch_key, resumable
+
+    graph = _build_graph(llm, checkpointer=get_checkpointer())
+    dispatch_id = dispatch_key(effort_vectors, driver_data, cluster_locations)
+    with resumable(graph, dispatch_id) as (config, snapshot):
+        ...   # snapshot.next non-empty → resume with graph.invoke(None, config)
+
+Checkpoints live in a local SQLite file (DISPATCH_CHECKPOINT_DB) through
+langgraph-checkpoint-sqlite; without that package they are kept in
+memory, which still covers retries within the same process.
+
+The thread id is the dispatch id, by default a hash of the dispatch
+inputs, so retrying the same depot/day after a transient failure picks
+up the saved thread.  Sub-graphs inherit the checkpointer, so a phase
+that failed half-way resumes inside the sub-graph as well.  A thread is
+deleted once its dispatch completes: checkpoints are for recovery, not a
+result cache.  Dispatches of the same id run one at a time.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+CHECKPOINT_DB = os.getenv("DISPATCH_CHECKPOINT_DB", "data/dispatch_checkpoints.sqlite")
+
+
+def sqlite_available() -> bool:
+    return importlib.util.find_spec("langgraph.checkpoint.sqlite") is not None
+
+
+def make_checkpointer(path: str = CHECKPOINT_DB):
+    """SqliteSaver on `path` when available, InMemorySaver otherwise."""
+    if sqlite_available():
+        from langgraph.checkpoint.sqlite import SqliteSaver
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        print(f"[Checkpoints] SQLite at {path}")
+        return SqliteSaver(conn)
+
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    print("[Checkpoints] langgraph-checkpoint-sqlite not installed → in-memory")
+    return InMemorySaver()
+
+
+_CHECKPOINTER = None
+_CHECKPOINTER_LOCK = threading.Lock()
+
+
+def get_checkpointer():
+    """The process-wide checkpointer, shared by every compiled graph."""
+    global _CHECKPOINTER
+    if _CHECKPOINTER is None:
+        with _CHECKPOINTER_LOCK:
+            if _CHECKPOINTER is None:
+                _CHECKPOINTER = make_checkpointer()
+    return _CHECKPOINTER
+
+
+def dispatch_key(effort_vectors:    Dict[str, Any],
+                 driver_data:       Dict[str, Any],
+                 cluster_locations: Optional[Dict[str, Any]] = None) -> str:
+    """Stable dispatch id for a set of inputs (32 hex chars)."""
+    payload = json.dumps([effort_vectors, driver_data, cluster_locations or {}],
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+_THREAD_LOCKS: Dict[str, list] = {}       # thread id → [lock, users]
+_THREAD_LOCKS_GUARD = threading.Lock()
+
+
+@contextmanager
+def _serialised(thread_id: str):
+    with _THREAD_LOCKS_GUARD:
+        entry = _THREAD_LOCKS.setdefault(thread_id, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _THREAD_LOCKS_GUARD:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _THREAD_LOCKS[thread_id]
+
+
+@contextmanager
+def resumable(graph, thread_id: str):
+    """
+    Yields (config, snapshot) for running `graph` on `thread_id`;
+    snapshot.next is non-empty when an earlier run stopped part-way.
+    The thread is deleted when the block completes without error.
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    with _serialised(thread_id):
+        snapshot = graph.get_state(config)
+        if snapshot.next:
+            print(f"[Checkpoints] resuming dispatch {thread_id} at {list(snapshot.next)}")
+        yield config, snapshot
+        graph.checkpointer.delete_thread(thread_id)
@@ -0,0 +1,157 @@
+"""
+agents/dispatchRuntime.py
+──────────────────────────
+Process-level dispatch runtime — owns the LLM client and the compiled
+supervisor graph so requests never rebuild them.
+
+Public API:
+    from agents.dispatchRuntime import get_runtime
+
+    runtime = get_runtime()                 # built once per process
+    runtime.warm_up()                       # optional: pay cold-start now
+    result  = runtime.dispatch(effort_vectors, driver_data)
+    runtime.explanations.wait(result["dispatch_id"])    # briefing, async
+    runtime.configure(model="llama-3.3-70b-versatile")   # hot swap
+
+Hot swapping builds the new client + graph off to the side and then
+replaces the reference atomically; requests already running keep the
+graph they started with.  Every client is wrapped by the process-wide
+agents.llmGateway, so rate limits and concurrency survive swaps, and
+every graph shares the process checkpointer (agents/dispatchCheckpoints.py),
+so a dispatch interrupted before a swap resumes on the new graph.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace, asdict
+from typing import Any, Dict, Optional
+
+from agents.supervisorGraph import (
+    DEFAULT_MODEL,
+    _build_graph,
+    _make_llm,
+    run_dispatch,
+)
+from agents.dispatchCheckpoints import get_checkpointer
+from agents.explanationStore import ExplanationStore
+from agents.llmGateway import get_gateway
+from telemetry import TracedLLM
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    model:       str             = DEFAULT_MODEL
+    temperature: Optional[float] = None
+    api_key_env: str             = "groqAPI2"
+    # Provider endpoint override, e.g. a local stub model server; only
+    # settable from the environment, never through the HTTP API.
+    base_url:    Optional[str]   = field(default_factory=lambda: os.getenv("LLM_BASE_URL"))
+
+
+class DispatchRuntime:
+    def __init__(self, config: ModelConfig = ModelConfig()):
+        self._lock    = threading.Lock()
+        self._config  = config
+        self._llm     = get_gateway().wrap(_make_llm(**asdict(config)))
+        self._graph   = _build_graph(self._llm, checkpointer=get_checkpointer())
+        self._warmed  = False
+        # Briefings always use the current client, including after a swap.
+        self.explanations = ExplanationStore(lambda: TracedLLM(self._llm))
+
+    # ── Accessors ────────────────────────────────────────────────────────────
+
+    @property
+    def config(self) -> ModelConfig:
+        return self._config
+
+    @property
+    def llm(self):
+        return self._llm
+
+    @property
+    def graph(self):
+        return self._graph
+
+    # ── Operations ───────────────────────────────────────────────────────────
+
+    def configure(self, **changes) -> ModelConfig:
+        """Swap model settings; unknown keys raise TypeError."""
+        new_config = replace(self._config, **changes)
+        llm   = get_gateway().wrap(_make_llm(**asdict(new_config)))
+        graph = _build_graph(llm, checkpointer=get_checkpointer())
+        with self._lock:
+            self._config, self._llm, self._graph = new_config, llm, graph
+        print(f"[Runtime] model config → {new_config}")
+        return new_config
+
+    def warm_up(self, ping_llm: bool = False,
+                preload_stages: bool = False) -> Dict[str, Any]:
+        """
+        Runs the allocator code path once (compiling the Numba kernel when
+        it is installed).  Optionally imports every
+        preprocessing stage (normally loaded lazily on first use) and opens
+        the LLM connection with a one-token request.
+        """
+        timings = {}
+
+        start = time.perf_counter()
+        import agents.optimized_allocation as _oa
+        _oa.allocateDrivers_optimized(*_warm_up_inputs(), use_kernel=True)
+        timings["allocator"] = round(time.perf_counter() - start, 4)
+
+        if preload_stages:
+            start = time.perf_counter()
+            import runPreprocesses
+            runPreprocesses.preload_stages()
+            timings["stages"] = round(time.perf_counter() - start, 4)
+
+        if ping_llm:
+            start = time.perf_counter()
+            self._llm.invoke("Reply with OK.")
+            timings["llm"] = round(time.perf_counter() - start, 4)
+
+        self._warmed = True
+        return {"warmed": True, "model": asdict(self._config), "timings": timings}
+
+    def status(self) -> Dict[str, Any]:
+        return {"warmed": self._warmed, "model": asdict(self._config),
+                "llm_gateway": get_gateway().stats()}
+
+    def dispatch(self, effort_vectors: Dict[str, Any],
+                 driver_data: Dict[str, Any],
+                 cluster_locations: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return run_dispatch(effort_vectors, driver_data, graph=self._graph,
+                            cluster_locations=cluster_locations,
+                            explanations=self.explanations)
+
+
+def _warm_up_inputs():
+    vector = {
+        "physical_load":     {"total_weight": 1.0, "heavy_pkg_ratio": 0.1, "bulky_ratio": 0.1},
+        "stair_load":        {"stair_load_index": 1.0, "avg_floor": 1.0, "elevator_coverage": 0.5},
+        "traffic_stress":    {"traffic_index": 1.0, "parking_stress": 0.01, "stop_density": 0.01},
+        "route_distance":    {"total_distance": 1000.0, "total_duration": 300.0},
+        "cognitive_density": 0.01,
+    }
+    clusters = {f"Cluster {i}": vector for i in range(2)}
+    drivers  = {
+        f"D{i}": {"cumulative_effort_vector": vector, "consecutive_heavy_days": 0}
+        for i in range(2)
+    }
+    return clusters, drivers
+
+
+# ─── Process-level singleton ──────────────────────────────────────────────────
+
+_RUNTIME: Optional[DispatchRuntime] = None
+_RUNTIME_LOCK = threading.Lock()
+
+
+def get_runtime() -> DispatchRuntime:
+    global _RUNTIME
+    if _RUNTIME is None:
+        with _RUNTIME_LOCK:
+            if _RUNTIME is None:
+                _RUNTIME = DispatchRuntime()
+    return _RUNTIME
@@ -0,0 +1,115 @@
+"""
+agents/dispatchStore.py
+────────────────────────
+Per-dispatch side store for the inputs the graph reads but never
+changes, so graph state carries a handle instead of the data.
+
+Public API:
+    from agents.dispatchStore import open_inputs, resolve
+
+    with open_inputs(dispatch_id, effort_vectors, driver_data, cluster_locations) as handle:
+        graph.invoke({"inputs": handle, ...})
+
+    inputs = resolve(state["inputs"])       # inside a node
+    inputs.effort_vectors                   # cluster → effort vector
+    inputs.drivers                          # driver state before today
+    inputs.cluster_locations                # cluster → [lon, lat]
+    inputs.derived["speculative"]           # per-dispatch values nodes share
+    inputs.allocated_drivers()              # driver state after the last allocation
+
+LangGraph copies and merges every state key at each step and a
+checkpointer serialises them; the handle is one short string however
+large the fleet.  Everything reachable from a handle is read-only by
+convention — nodes that need to mutate driver state deep-copy it first,
+as core_allocator always has.
+
+The handle is the dispatch id, so a dispatch resumed from a checkpoint
+(agents/dispatchCheckpoints.py) finds its inputs again once run_dispatch
+re-opens them.  Opening an id that is already open shares its entry and
+must pass the same inputs; different inputs raise ValueError rather
+than run against the other dispatch's data.  `derived` values are not
+checkpointed: a resumed dispatch recomputes or does without them.
+
+The driver state an allocation produces (today's cumulative efforts and
+heavy days, one entry per driver) is one of them: core_allocator leaves
+it under derived["allocated_drivers"] and graph state carries only the
+allocation mapping.  allocated_drivers() falls back to the pre-dispatch
+drivers until an allocation has run, and after a resume.
+
+The inputs are kept as the name-keyed dicts the pipeline produces, not
+flattened into arrays: every consumer (allocateDrivers_optimized, the
+weight sweep, the fairness scorer, the LLM prompts) takes these dicts
+and the allocator already flattens them once per run, so a second array
+copy here would only be converted back.  What the side store removes —
+copying and serialising the inputs at every graph step — does not
+depend on their layout.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+class DispatchInputs:
+    __slots__ = ("effort_vectors", "drivers", "cluster_locations", "derived")
+
+    def __init__(self, effort_vectors:    Dict[str, Any],
+                 drivers:           Dict[str, Any],
+                 cluster_locations: Optional[Dict[str, List[float]]]):
+        self.effort_vectors    = effort_vectors
+        self.drivers           = drivers
+        self.cluster_locations = cluster_locations or {}
+        self.derived: Dict[str, Any] = {}
+
+    def allocated_drivers(self) -> Dict[str, Any]:
+        """Driver state after the latest core_allocator run, else before today."""
+        return self.derived.get("allocated_drivers", self.drivers)
+
+    def matches(self, effort_vectors:    Dict[str, Any],
+                drivers:           Dict[str, Any],
+                cluster_locations: Optional[Dict[str, List[float]]]) -> bool:
+        return all(
+            mine is theirs or mine == theirs
+            for mine, theirs in ((self.effort_vectors,    effort_vectors),
+                                 (self.drivers,           drivers),
+                                 (self.cluster_locations, cluster_locations or {}))
+        )
+
+
+_STORE: Dict[str, list] = {}        # handle → [DispatchInputs, users]
+_STORE_LOCK = threading.Lock()
+
+
+@contextmanager
+def open_inputs(dispatch_id:       str,
+                effort_vectors:    Dict[str, Any],
+                driver_data:       Dict[str, Any],
+                cluster_locations: Optional[Dict[str, List[float]]] = None):
+    """
+    Registers the inputs for the duration of the block; yields the handle.
+    Raises ValueError if `dispatch_id` is already open with other inputs.
+    """
+    with _STORE_LOCK:
+        entry = _STORE.get(dispatch_id)
+        if entry is None:
+            entry = _STORE[dispatch_id] = [
+                DispatchInputs(effort_vectors, driver_data, cluster_locations), 0
+            ]
+        elif not entry[0].matches(effort_vectors, driver_data, cluster_locations):
+            raise ValueError(f"dispatch {dispatch_id!r} is already open with different inputs")
+        entry[1] += 1
+    try:
+        yield dispatch_id
+    finally:
+        with _STORE_LOCK:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _STORE[dispatch_id]
+
+
+def resolve(handle: str) -> DispatchInputs:
+    with _STORE_LOCK:
+        entry = _STORE.get(handle)
+    if entry is None:
+        raise KeyError(f"dispatch inputs {handle!r} are not open")
+    return entry[0]
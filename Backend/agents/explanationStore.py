@@ -0,0 +1,181 @@
+"""
+agents/explanationStore.py
+───────────────────────────
+Daily-briefing explanations, written off the dispatch critical path.
+
+Public API:
+    from agents.explanationStore import ExplanationStore
+
+    store = ExplanationStore(lambda: runtime.llm)
+    dispatch_id = store.submit(final_state)     # returns immediately
+    store.get(dispatch_id)                      # {"dispatch_id", "status", "explanation", "error"}
+    store.wait(dispatch_id, timeout=30)         # same, blocking until done
+    for text in store.stream(dispatch_id):      # token chunks as they arrive
+        ...
+
+status is "pending" → "ready" | "failed".  Generation runs on a small
+thread pool and streams tokens from the LLM, so stream() readers see the
+briefing while it is being written; late readers get the chunks written
+so far replayed first.  Finished entries are evicted oldest-first beyond
+`max_entries`.
+"""
+
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from agents.llmGateway import llm_priority
+from telemetry import span
+
+
+def build_explainer_prompt(state: Dict[str, Any]) -> str:
+    return f"""
+You are a logistics dispatch coordinator writing a daily briefing.
+
+Final allocation (cluster → driver):
+{json.dumps(state["allocation"], indent=2)}
+
+Fairness report:
+{json.dumps(state["fairness_report"], indent=2)}
+
+Critique score: {state["critique"].get("score", "N/A")}
+Critique issues: {state["critique"].get("issues", [])}
+
+AI-suggested swaps applied: {state.get("swap_log", [])}
+Policy violations found: {state.get("policy_violations", [])}
+
+Write a clear 3–5 paragraph briefing:
+  1. Who is assigned where and why
+  2. Special considerations (anomalies, fatigued drivers)
+  3. Overall fairness assessment
+  4. Any remaining concerns or suggestions for tomorrow
+
+Plain English only. No JSON. No markdown headers.
+"""
+
+
+class _Entry:
+    def __init__(self):
+        self.status: str           = "pending"
+        self.chunks: List[str]     = []
+        self.error:  Optional[str] = None
+        self.cond = threading.Condition()
+
+    def snapshot(self, dispatch_id: str) -> Dict[str, Any]:
+        with self.cond:
+            return {
+                "dispatch_id": dispatch_id,
+                "status":      self.status,
+                "explanation": "".join(self.chunks) if self.status == "ready" else None,
+                "error":       self.error,
+            }
+
+
+class ExplanationStore:
+    def __init__(self, llm_provider: Callable[[], Any],
+                 max_workers: int = 4, max_entries: int = 1024):
+        self._llm_provider = llm_provider
+        self._max_entries  = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="explainer")
+
+    # ── Writing ──────────────────────────────────────────────────────────────
+
+    def submit(self, state: Dict[str, Any], dispatch_id: Optional[str] = None) -> str:
+        """
+        Schedules the briefing for a finished dispatch state.  A given
+        `dispatch_id` replaces any earlier briefing under that id.
+        """
+        dispatch_id = dispatch_id or uuid.uuid4().hex
+        entry = _Entry()
+        with self._lock:
+            self._entries.pop(dispatch_id, None)
+            self._entries[dispatch_id] = entry
+            self._evict()
+        self._pool.submit(self._generate, entry, build_explainer_prompt(state))
+        return dispatch_id
+
+    def _generate(self, entry: _Entry, prompt: str):
+        print("\n══ [Explainer] writing briefing ══")
+        try:
+            llm = self._llm_provider()
+            # Off the critical path: never ahead of a waiting dispatch.
+            with llm_priority("batch"), span("explainer", kind="node"):
+                if hasattr(llm, "stream"):
+                    for chunk in llm.stream(prompt):
+                        self._append(entry, chunk.content)
+                else:
+                    self._append(entry, llm.invoke(prompt).content)
+            status, error = "ready", None
+        except Exception as e:
+            print(f"[Explainer] failed: {e}")
+            status, error = "failed", str(e)
+        with entry.cond:
+            entry.status, entry.error = status, error
+            entry.cond.notify_all()
+
+    @staticmethod
+    def _append(entry: _Entry, text: str):
+        if not text:
+            return
+        with entry.cond:
+            entry.chunks.append(text)
+            entry.cond.notify_all()
+
+    def _evict(self):
+        # Caller holds self._lock.  Pending entries are never evicted.
+        excess = len(self._entries) - self._max_entries
+        for dispatch_id in list(self._entries):
+            if excess <= 0:
+                break
+            if self._entries[dispatch_id].status != "pending":
+                del self._entries[dispatch_id]
+                excess -= 1
+
+    # ── Reading ──────────────────────────────────────────────────────────────
+
+    def _entry(self, dispatch_id: str) -> Optional[_Entry]:
+        with self._lock:
+            return self._entries.get(dispatch_id)
+
+    def get(self, dispatch_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entry(dispatch_id)
+        return entry.snapshot(dispatch_id) if entry is not None else None
+
+    def wait(self, dispatch_id: str,
+             timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        entry = self._entry(dispatch_id)
+        if entry is None:
+            return None
+        with entry.cond:
+            entry.cond.wait_for(lambda: entry.status != "pending", timeout)
+        return entry.snapshot(dispatch_id)
+
+    def stream(self, dispatch_id: str,
+               timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Yields token chunks until the briefing is finished (or `timeout`
+        seconds pass without progress).  Raises KeyError for unknown ids.
+        """
+        entry = self._entry(dispatch_id)
+        if entry is None:
+            raise KeyError(dispatch_id)
+        sent = 0
+        while True:
+            with entry.cond:
+                entry.cond.wait_for(
+                    lambda: len(entry.chunks) > sent or entry.status != "pending",
+                    timeout,
+                )
+                chunks = entry.chunks[sent:]
+                done   = entry.status != "pending"
+            for text in chunks:
+                yield text
+            sent += len(chunks)
+            if done or not chunks:
+                return
@@ -0,0 +1,394 @@
+"""
+agents/llmGateway.py
+─────────────────────
+Process-wide scheduler for every LLM call the agents make.
+
+Public API:
+    from agents.llmGateway import get_gateway, llm_priority, llm_deadline
+
+    llm = get_gateway().wrap(chat_model)     # drop-in: .invoke / .stream
+    with llm_priority("batch"):              # default "interactive"
+        llm.invoke(prompt)
+    with llm_deadline(time.monotonic() + 5): # LLMDeadlineExceeded once past it
+        llm.invoke(prompt)
+    get_gateway().stats()                    # in_flight, waiting, coalesced, retries, ..
+
+Every call, from any dispatch or thread, goes through one gateway:
+
+    priority slots   at most `max_concurrency` calls in flight; waiters are
+                     admitted interactive-first, then in arrival order
+    token bucket     `rate_per_s` calls per second with bursts of `burst`
+    coalescing       an .invoke identical (model, priority, prompt,
+                     arguments) to one already in flight waits for that
+                     call's result instead of sending a second request
+    backoff          HTTP 429 and 5xx responses are retried up to
+                     `max_retries` times, honouring Retry-After when given
+                     and otherwise backing off exponentially with jitter; the
+                     bucket is paused for the same delay so other callers
+                     slow down too.  The gateway is the only retry layer —
+                     chat models are built with max_retries=0
+    deadlines        under llm_deadline a call gives up — raising
+                     LLMDeadlineExceeded — instead of waiting for a slot,
+                     a token, a coalesced result or a retry past the
+                     deadline; a queued call leaves the queue at once.  The
+                     request itself is sent with timeout= the time left,
+                     which the chat model's HTTP client enforces
+
+Limits come from LLM_MAX_CONCURRENCY, LLM_RATE_PER_S (0 = unlimited),
+LLM_BURST and LLM_MAX_RETRIES.  Point the model at a local stub server
+(ModelConfig.base_url) to exercise the gateway without the provider.
+"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Dict, Optional
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+_PRIORITY: contextvars.ContextVar[str] = \
+    contextvars.ContextVar("llm_priority", default="interactive")
+_DEADLINE: contextvars.ContextVar[Optional[float]] = \
+    contextvars.ContextVar("llm_deadline", default=None)
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """The call's llm_deadline passed before it could be (re)sent or answered."""
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """LLM calls made in this context are scheduled at `priority`."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"unknown priority {priority!r}; expected one of {list(PRIORITIES)}")
+    token = _PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def current_priority() -> str:
+    return _PRIORITY.get()
+
+
+@contextmanager
+def llm_deadline(deadline: Optional[float]):
+    """LLM calls made in this context give up at `deadline` (time.monotonic())."""
+    token = _DEADLINE.set(deadline)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def _time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until `deadline` (None without one); raises once it has passed."""
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise LLMDeadlineExceeded("LLM call deadline passed")
+    return left
+
+
+# ─── Limiters ────────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    def __init__(self, rate_per_s: float, burst: int):
+        self.rate    = rate_per_s
+        self.burst   = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last   = time.monotonic()
+        self._paused_until = 0.0
+        self._lock   = threading.Lock()
+
+    def acquire(self, deadline: Optional[float] = None):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last   = now
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            left = _time_left(deadline)
+            if left is not None and wait > left:
+                raise LLMDeadlineExceeded("no rate-limit token before the deadline")
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class _PrioritySlots:
+    """Counting semaphore that admits waiters by (priority, arrival)."""
+
+    def __init__(self, limit: int):
+        self.limit   = max(1, limit)
+        self.active  = 0
+        self.waiting = []
+        self._seq    = itertools.count()
+        self._cond   = threading.Condition()
+
+    def acquire(self, rank: int, deadline: Optional[float] = None):
+        """Raises LLMDeadlineExceeded, leaving the queue, if `deadline` passes first."""
+        with self._cond:
+            entry = (rank, next(self._seq))
+            heapq.heappush(self.waiting, entry)
+            admitted = self._cond.wait_for(
+                lambda: self.active < self.limit and self.waiting[0] == entry,
+                timeout=None if deadline is None else max(0.0, deadline - time.monotonic()),
+            )
+            if not admitted:
+                self.waiting.remove(entry)
+                heapq.heapify(self.waiting)
+                self._cond.notify_all()
+                raise LLMDeadlineExceeded("no gateway slot before the deadline")
+            heapq.heappop(self.waiting)
+            self.active += 1
+            self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+
+# ─── Gateway ─────────────────────────────────────────────────────────────────
+
+def _status(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    return _status(error) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def _is_retryable(error: Exception) -> bool:
+    status = _status(error)
+    return _is_rate_limited(error) or (status is not None and 500 <= status < 600)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _coalesce_key(llm, prompt, args, kwargs):
+    if not isinstance(prompt, str):
+        return None
+    try:
+        extra = repr((args, sorted(kwargs.items())))
+    except TypeError:
+        return None
+    return (id(llm), current_priority(), prompt, extra)
+
+
+class LLMGateway:
+    def __init__(self, max_concurrency: int = 8, rate_per_s: float = 0.0,
+                 burst: int = 8, max_retries: int = 4,
+                 base_backoff: float = 1.0, max_backoff: float = 30.0):
+        self.bucket       = TokenBucket(rate_per_s, burst)
+        self.slots        = _PrioritySlots(max_concurrency)
+        self.max_retries  = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff  = max_backoff
+        self._inflight: Dict[Any, Future] = {}
+        self._lock  = threading.Lock()
+        self._stats = {"calls": 0, "coalesced": 0, "retries": 0,
+                       "rate_limited": 0, "expired": 0}
+
+    def wrap(self, llm) -> "GatewayLLM":
+        return GatewayLLM(self, llm)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["in_flight"] = self.slots.active
+        stats["waiting"]   = len(self.slots.waiting)
+        return stats
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _backoff(self, error: Exception, attempt: int) -> float:
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(self.max_backoff, self.base_backoff * 2 ** attempt)
+            delay *= 0.5 + random.random() / 2
+        self.bucket.pause(delay)
+        return delay
+
+    def _retry_allowed(self, delay: float, deadline: Optional[float]) -> bool:
+        try:
+            left = _time_left(deadline)
+        except LLMDeadlineExceeded:
+            return False
+        return left is None or delay < left
+
+    # ── Calls ────────────────────────────────────────────────────────────────
+
+    def invoke(self, llm, prompt, *args, **kwargs):
+        try:
+            return self._invoke_coalesced(llm, prompt, *args, **kwargs)
+        except LLMDeadlineExceeded:
+            self._count("expired")
+            raise
+
+    def _invoke_coalesced(self, llm, prompt, *args, **kwargs):
+        deadline = _DEADLINE.get()
+        key = _coalesce_key(llm, prompt, args, kwargs)
+        while True:
+            shared = None
+            if key is not None:
+                with self._lock:
+                    shared = self._inflight.get(key)
+                    if shared is None:
+                        future = self._inflight[key] = Future()
+            if shared is None:
+                break
+            self._count("coalesced")
+            left = _time_left(deadline)     # raises once this call's own deadline passed
+            try:
+                return shared.result(timeout=left)
+            except LLMDeadlineExceeded:
+                continue    # the leading call ran out of time; this one still has some
+            except FutureTimeout:
+                # Checked second: LLMDeadlineExceeded is a TimeoutError, which
+                # FutureTimeout aliases.
+                raise LLMDeadlineExceeded("coalesced call not answered before the deadline")
+
+        try:
+            result = self._invoke(llm, prompt, deadline, *args, **kwargs)
+        except BaseException as e:
+            if key is not None:
+                self._settle(key, future, error=e)
+            raise
+        if key is not None:
+            self._settle(key, future, result=result)
+        return result
+
+    def _settle(self, key, future: Future, result=None, error=None):
+        # Unpublish first, so a waiter that retries after a deadline error
+        # starts a fresh call instead of finding this one again.
+        with self._lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _invoke(self, llm, prompt, deadline, *args, **kwargs):
+        rank = PRIORITIES[current_priority()]
+        for attempt in range(self.max_retries + 1):
+            self.slots.acquire(rank, deadline)
+            try:
+                self.bucket.acquire(deadline)
+                left = _time_left(deadline)
+                self._count("calls")
+                if left is not None:
+                    return llm.invoke(prompt, *args, timeout=left, **kwargs)
+                return llm.invoke(prompt, *args, **kwargs)
+            except Exception as e:
+                if not _is_retryable(e):
+                    raise
+                if _is_rate_limited(e):
+                    self._count("rate_limited")
+                if attempt == self.max_retries:
+                    raise
+                delay  = self._backoff(e, attempt)
+                status = _status(e) or 429
+                if not self._retry_allowed(delay, deadline):
+                    raise LLMDeadlineExceeded("retry backoff would pass the deadline") from e
+            finally:
+                self.slots.release()
+            self._count("retries")
+            print(f"[LLMGateway] {status} — retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+    def stream(self, llm, prompt, *args, **kwargs):
+        """Holds a slot while chunks flow; 429/5xx are retried before the first chunk."""
+        rank     = PRIORITIES[current_priority()]
+        deadline = _DEADLINE.get()
+        for attempt in range(self.max_retries + 1):
+            started = False
+            self.slots.acquire(rank, deadline)
+            try:
+                self.bucket.acquire(deadline)
+                self._count("calls")
+                for chunk in llm.stream(prompt, *args, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started or not _is_retryable(e):
+                    raise
+                if _is_rate_limited(e):
+                    self._count("rate_limited")
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(e, attempt)
+                if not self._retry_allowed(delay, deadline):
+                    raise LLMDeadlineExceeded("retry backoff would pass the deadline") from e
+            finally:
+                self.slots.release()
+            self._count("retries")
+            time.sleep(delay)
+
+
+class GatewayLLM:
+    """Chat-model proxy whose .invoke / .stream go through an LLMGateway."""
+
+    def __init__(self, gateway: LLMGateway, llm):
+        self._gateway = gateway
+        self._llm     = llm
+
+    def invoke(self, prompt, *args, **kwargs):
+        return self._gateway.invoke(self._llm, prompt, *args, **kwargs)
+
+    def stream(self, prompt, *args, **kwargs):
+        return self._gateway.stream(self._llm, prompt, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
+
+
+_GATEWAY: Optional[LLMGateway] = None
+_GATEWAY_LOCK = threading.Lock()
+
+
+def get_gateway() -> LLMGateway:
+    """The process-wide gateway, built from the LLM_* environment once."""
+    global _GATEWAY
+    if _GATEWAY is None:
+        with _GATEWAY_LOCK:
+            if _GATEWAY is None:
+                _GATEWAY = LLMGateway(
+                    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+                    rate_per_s=float(os.getenv("LLM_RATE_PER_S", "0")),
+                    burst=int(os.getenv("LLM_BURST", "8")),
+                    max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+                )
+    return _GATEWAY
@@ -0,0 +1,141 @@
+"""
+agents/nodeBudgets.py
+──────────────────────
+Per-node time budgets for LLM calls under a dispatch-level deadline.
+
+Public API:
+    from agents.nodeBudgets import BudgetedLLM, dispatch_budget, is_degraded
+
+    llm = BudgetedLLM(llm)                     # in _build_graph
+    with dispatch_budget() as degraded:        # one per dispatch
+        graph.invoke(state)
+    degraded                                   # ["critic_agent", ..] in order
+
+    resp = llm.invoke(prompt)                  # inside a node
+    is_degraded(resp)                          # True → over budget, content ""
+
+An LLM call may take the calling node's budget (NODE_BUDGETS_S, else
+DEFAULT_NODE_BUDGET_S) or whatever is left of the dispatch deadline,
+whichever is shorter.  A call that runs over gets an empty reply, which
+the node's _parse_json fallback turns into the deterministic default.
+Once the deadline has passed, LLM calls are skipped outright.  Every
+degraded node is recorded once, and its span is tagged degraded=True.
+
+The call's deadline is handed to the LLM gateway (llm_deadline), which
+drops it from the slot queue, skips rate-limit waits and 429 retries and
+bounds the HTTP request's timeout by it — time spent queueing counts
+against the budget, and nothing reaches the provider after it.  The
+worker pool is sized from the gateway's concurrency: anything beyond
+that would only be queueing inside the gateway anyway.
+"""
+
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage
+
+from agents.llmGateway import LLMDeadlineExceeded, get_gateway, llm_deadline
+from telemetry import current_span
+
+DISPATCH_BUDGET_S     = float(os.getenv("DISPATCH_SLO_S", "60"))
+DEFAULT_NODE_BUDGET_S = 10.0
+NODE_BUDGETS_S = {
+    "anomaly_detector": 8.0,
+    "llm_weight_tuner": 6.0,
+    "constraint_gen":   8.0,
+    "llm_swap_agent":   10.0,
+    "critic_agent":     10.0,
+}
+
+_DEADLINE: contextvars.ContextVar[Optional[float]] = \
+    contextvars.ContextVar("dispatch_deadline", default=None)
+_DEGRADED: contextvars.ContextVar[Optional[List[str]]] = \
+    contextvars.ContextVar("degraded_nodes", default=None)
+
+_POOL_PER_SLOT = 2      # workers per gateway slot: one calling, one queued behind it
+_POOL = ThreadPoolExecutor(max_workers=_POOL_PER_SLOT * get_gateway().slots.limit,
+                           thread_name_prefix="llm-budget")
+
+
+@contextmanager
+def dispatch_budget(seconds: Optional[float] = None):
+    """Sets the dispatch deadline; yields the list of degraded nodes."""
+    degraded: List[str] = []
+    deadline = time.monotonic() + (DISPATCH_BUDGET_S if seconds is None else seconds)
+    tokens = (_DEADLINE.set(deadline), _DEGRADED.set(degraded))
+    try:
+        yield degraded
+    finally:
+        _DEADLINE.reset(tokens[0])
+        _DEGRADED.reset(tokens[1])
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the dispatch deadline (None outside a dispatch)."""
+    deadline = _DEADLINE.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def deadline_expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def is_degraded(resp) -> bool:
+    return bool(getattr(resp, "response_metadata", {}).get("degraded"))
+
+
+def _degrade(node: str, reason: str) -> AIMessage:
+    print(f"[NodeBudget] {node} degraded ({reason}) → deterministic fallback")
+    degraded = _DEGRADED.get()
+    if degraded is not None and node not in degraded:
+        degraded.append(node)
+    span_ = current_span()
+    if span_ is not None:
+        span_.set(degraded=True, degraded_reason=reason)
+    return AIMessage(content="", response_metadata={"degraded": True, "reason": reason})
+
+
+class BudgetedLLM:
+    """Chat-model proxy that enforces the node budget on .invoke()."""
+
+    def __init__(self, llm):
+        self._llm = llm
+
+    def invoke(self, prompt, *args, **kwargs):
+        span_  = current_span()
+        node   = span_.name if span_ is not None else "direct"
+        budget = NODE_BUDGETS_S.get(node, DEFAULT_NODE_BUDGET_S)
+        left   = remaining()
+        if left is not None:
+            if left <= 0:
+                return _degrade(node, "dispatch deadline passed")
+            budget = min(budget, left)
+
+        deadline = time.monotonic() + budget
+        context  = contextvars.copy_context()
+        future   = _POOL.submit(context.run, self._call, deadline, prompt, *args, **kwargs)
+        try:
+            return future.result(timeout=budget)
+        except FutureTimeout:
+            future.cancel()     # never started: the pool was saturated
+            return _degrade(node, f"over {budget:.1f}s budget")
+        except LLMDeadlineExceeded:
+            return _degrade(node, f"over {budget:.1f}s budget")
+        except Exception:
+            if time.monotonic() < deadline:
+                raise
+            return _degrade(node, f"over {budget:.1f}s budget")   # HTTP timeout
+
+    def _call(self, deadline: float, prompt, *args, **kwargs):
+        if time.monotonic() >= deadline:
+            raise LLMDeadlineExceeded("queued past the node budget")
+        with llm_deadline(deadline):
+            return self._llm.invoke(prompt, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
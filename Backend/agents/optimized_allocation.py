@@ -1,18 +1,22 @@
+import heapq
 import numpy as np
 import random
 import time
-
-from sklearn.preprocessing import normalize
+from dataclasses import dataclass, field, replace
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 HEAVY_PERCENTILE = 0.75
 
-DECAY_FACTORS = {
+# Module defaults, read-only: per-call overrides go in an AllocationConfig.
+DECAY_FACTORS = MappingProxyType({
     "physical_load":    0.85,
     "stair_load":       0.85,
     "traffic_stress":   0.95,
     "route_distance":   0.92,
     "cognitive_density": 0.90
-}
+})
 
 DIMENSIONS = [
     "physical_load",
@@ -22,13 +26,104 @@ DIMENSIONS = [
     "cognitive_density"
 ]
 
-DIM_WEIGHTS = {
+DIM_WEIGHTS = MappingProxyType({
     "physical_load":    1.5,
     "stair_load":       1.3,
     "traffic_stress":   1.0,
     "route_distance":   1.2,
     "cognitive_density": 0.8
-}
+})
+
+SPATIAL_PENALTY_PER_KM = 0.05
+
+# ─── Configuration ────────────────────────────────────────────────────────────
+
+FEATURE_INDICES = MappingProxyType({
+    "physical_load":    (0, 1, 2),
+    "stair_load":       (3, 4, 5),
+    "traffic_stress":   (6, 7, 8),
+    "route_distance":   (9, 10),
+    "cognitive_density": (11,),
+})
+
+
+@dataclass(frozen=True)
+class AllocationConfig:
+    """
+    Everything allocateDrivers_optimized tunes, as one immutable value.
+    Pass it per call instead of patching module globals, so concurrent
+    dispatches with different weights can share a process.  The derived
+    weight / decay arrays are computed once per config and are read-only.
+    """
+    dim_weights:       Mapping[str, float] = field(default_factory=lambda: DIM_WEIGHTS)
+    decay_factors:     Mapping[str, float] = field(default_factory=lambda: DECAY_FACTORS)
+    heavy_percentile:  float = HEAVY_PERCENTILE
+    spatial_penalty_per_km: float = SPATIAL_PENALTY_PER_KM
+    imbalance_weight:  float = 1.5    # driver-total variance in the penalty
+    fatigue_penalty:   float = 0.5    # per driver at ≥ 3 consecutive heavy days
+    fatigue_surcharge: float = 0.3    # candidate already at ≥ 2 heavy days
+    heavy_day_limit:   int   = 2      # heavy clusters only below this many days
+    avoid_cost:        float = 1e6    # soft "avoid" rule; finite, so never strands
+    prefer_bonus:      float = 0.3    # soft "prefer" rule
+
+    def __post_init__(self):
+        object.__setattr__(self, "dim_weights",
+                           MappingProxyType({d: float(w) for d, w in self.dim_weights.items()}))
+        object.__setattr__(self, "decay_factors",
+                           MappingProxyType({d: float(f) for d, f in self.decay_factors.items()}))
+
+    def __hash__(self):
+        return hash((tuple(sorted(self.dim_weights.items())),
+                     tuple(sorted(self.decay_factors.items())),
+                     self.heavy_percentile, self.spatial_penalty_per_km,
+                     self.imbalance_weight, self.fatigue_penalty,
+                     self.fatigue_surcharge, self.heavy_day_limit,
+                     self.avoid_cost, self.prefer_bonus))
+
+    def with_weights(self, overrides: Mapping[str, float]) -> "AllocationConfig":
+        """Copy with some dimension weights replaced (unknown dims ignored)."""
+        weights = dict(self.dim_weights)
+        weights.update({d: float(w) for d, w in overrides.items() if d in weights})
+        return replace(self, dim_weights=weights)
+
+    @cached_property
+    def feature_meta(self):
+        """(indices, per-feature decay, per-feature weight), as get_feature_meta."""
+        decay   = np.zeros(12)
+        weights = np.zeros(12)
+        for dim, idxs in FEATURE_INDICES.items():
+            for i in idxs:
+                decay[i]   = self.decay_factors.get(dim, 0.9)
+                weights[i] = self.dim_weights.get(dim, 1.0)
+        decay.flags.writeable   = False
+        weights.flags.writeable = False
+        indices = {dim: list(idxs) for dim, idxs in FEATURE_INDICES.items()}
+        return indices, decay, weights
+
+    @cached_property
+    def dim_weight_vec(self) -> np.ndarray:
+        """Dimension weights in FEATURE_INDICES order."""
+        vec = np.array([self.dim_weights.get(dim, 1.0) for dim in FEATURE_INDICES])
+        vec.flags.writeable = False
+        return vec
+
+
+DEFAULT_CONFIG = AllocationConfig()
+
+
+@lru_cache(maxsize=256)
+def _tuned_config(overrides) -> AllocationConfig:
+    return DEFAULT_CONFIG.with_weights(dict(overrides))
+
+
+def config_for(tuned_weights: Optional[Mapping[str, float]] = None) -> AllocationConfig:
+    """
+    DEFAULT_CONFIG with LLM-tuned weights applied.  Configs are cached by
+    their weights, so repeated tunings reuse the precomputed arrays.
+    """
+    if not tuned_weights:
+        return DEFAULT_CONFIG
+    return _tuned_config(tuple(sorted((d, float(w)) for d, w in tuned_weights.items())))
 
 # ─── Flattening ───────────────────────────────────────────────────────────────
 
@@ -52,36 +147,189 @@ def flatten_effort_vector(vector):
     return np.array(flat, dtype=float)
 
 
-def get_feature_meta():
-    indices = {
-        "physical_load":    [0, 1, 2],
-        "stair_load":       [3, 4, 5],
-        "traffic_stress":   [6, 7, 8],
-        "route_distance":   [9, 10],
-        "cognitive_density": [11]
+def effort_vector_dict(vec):
+    """Inverse of flatten_effort_vector, with plain floats (state is checkpointed)."""
+    vec = [float(x) for x in vec]
+    return {
+        "physical_load":  {"total_weight": vec[0], "heavy_pkg_ratio": vec[1], "bulky_ratio": vec[2]},
+        "stair_load":     {"stair_load_index": vec[3], "avg_floor": vec[4], "elevator_coverage": vec[5]},
+        "traffic_stress": {"traffic_index": vec[6], "parking_stress": vec[7], "stop_density": vec[8]},
+        "route_distance": {"total_distance": vec[9], "total_duration": vec[10]},
+        "cognitive_density": vec[11]
     }
 
-    decay   = np.zeros(12)
-    weights = np.zeros(12)
-
-    for dim, idxs in indices.items():
-        for i in idxs:
-            decay[i]   = DECAY_FACTORS.get(dim, 0.9)
-            weights[i] = DIM_WEIGHTS.get(dim, 1.0)
 
-    return indices, decay, weights
+def get_feature_meta(config: AllocationConfig = DEFAULT_CONFIG):
+    return config.feature_meta
+
+
+def dimension_loads(normed, indices_map):
+    """Per-dimension mean of normalised features → (rows × dims)."""
+    return np.stack(
+        [np.mean(normed[:, idxs], axis=1) for idxs in indices_map.values()],
+        axis=1,
+    )
+
+
+# ─── Candidate pruning ────────────────────────────────────────────────────────
+
+class ShortlistPruner:
+    """
+    Top-K driver shortlist for one greedy trial.
+
+    With V[d, k] the normalised per-dimension load of driver d, adding a
+    cluster whose per-dimension increment is a raises the trial penalty by
+
+        Δ_d = Σ_k β_k · V[d, k] + const,   β_k = (2/n)(w_k·a_k + λ·mean(a)/dims)
+
+    (variance-update identity applied to every dim variance and to the
+    imbalance term, λ = AllocationConfig.imbalance_weight).  Cluster
+    features are non-negative, so β ≥ 0 and for any driver with total
+    load L_d = Σ_k V[d, k] ≥ L:
+
+        Σ_k β_k · V[d, k]  ≥  Σ_k β_k · lo_k + min(β) · (L − Σ_k lo_k)
+
+    where lo_k lower-bounds column k (V only grows, so the initial column
+    minimum stays valid).  Drivers sit in two heaps keyed by L_d — rested
+    and tired (at their heavy_limit, the bitmask for heavy-cluster
+    eligibility) — so the K lightest eligible drivers come out in
+    O(K log D).  They are scored exactly; if the winner beats the bound of
+    the next-lightest eligible driver nobody outside the shortlist can win,
+    otherwise every eligible driver is scored (the exhaustive fallback).
+    """
+
+    def __init__(self, dim_loads, dim_weights, tired, k, imbalance_weight=1.5):
+        self.loads   = dim_loads.copy()
+        self.imbalance_weight = imbalance_weight
+        self.weights = dim_weights
+        self.tired   = tired.copy()
+        self.k       = k
+        self.n       = len(dim_loads)
+        self.lo      = dim_loads.min(axis=0)
+        self.totals  = self.loads.sum(axis=1)
+        self.heaps   = ([], [])   # (rested, tired)
+        for d in range(self.n):
+            self.heaps[int(self.tired[d])].append((self.totals[d], d))
+        for heap in self.heaps:
+            heapq.heapify(heap)
+        self.fallbacks = 0
+
+    def _valid(self, entry, heap_id):
+        total, d = entry
+        return total == self.totals[d] and int(self.tired[d]) == heap_id
+
+    def _peek(self, heap_id):
+        heap = self.heaps[heap_id]
+        while heap and not self._valid(heap[0], heap_id):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def select(self, increment, heavy, extra_cost, extra_floor=0.0):
+        """
+        Best driver index for a cluster (-1 if none is eligible).
+        `extra_cost(drivers)` adds the per-driver penalties (fatigue
+        surcharge, spatial distance, soft-constraint bias) for an index
+        array; `extra_floor` (≤ 0) lower-bounds it for unscored drivers.
+        """
+        beta     = (2.0 / self.n) * (self.weights * increment
+                                     + self.imbalance_weight * increment.mean() / len(increment))
+        heap_ids = (0,) if heavy else (0, 1)
+
+        popped, shortlist, next_total = [], [], None
+        while True:
+            tops = [(self._peek(h), h) for h in heap_ids]
+            tops = [(entry, h) for entry, h in tops if entry is not None]
+            if not tops:
+                break
+            entry, h = min(tops)
+            if len(shortlist) == self.k:
+                next_total = entry[0]
+                break
+            popped.append((heapq.heappop(self.heaps[h]), h))
+            shortlist.append(entry[1])
+        for entry, h in popped:
+            heapq.heappush(self.heaps[h], entry)
+
+        if not shortlist:
+            return -1
+
+        candidates = np.sort(np.array(shortlist))
+        costs      = self.loads[candidates] @ beta + extra_cost(candidates)
+        best       = int(np.argmin(costs))
+
+        if next_total is not None:
+            bound = (beta @ self.lo + beta.min() * (next_total - self.lo.sum())
+                     + min(0.0, extra_floor))
+            if not costs[best] < bound - 1e-12 * max(1.0, abs(bound)):
+                self.fallbacks += 1
+                candidates = np.flatnonzero(~self.tired) if heavy else np.arange(self.n)
+                costs      = self.loads[candidates] @ beta + extra_cost(candidates)
+                best       = int(np.argmin(costs))
+
+        return int(candidates[best])
+
+    def assign(self, d, increment, tired):
+        self.loads[d]  += increment
+        self.totals[d]  = self.loads[d].sum()
+        self.tired[d]   = tired
+        heapq.heappush(self.heaps[int(tired)], (self.totals[d], d))
 
 
 # ─── Core algorithm ───────────────────────────────────────────────────────────
 
 def allocateDrivers_optimized(effortVectors, driverData,
-                               driver_locations=None, cluster_locations=None):
+                               driver_locations=None, cluster_locations=None,
+                               spatial_index=None, nearest_k=None,
+                               shortlist_k=None, use_kernel=False,
+                               fixed_assignment=None, config=None,
+                               constraints=None, trials=3):
+    """
+    Greedy multi-trial allocation of clusters to drivers.
+
+    Location-aware mode: pass a prebuilt `spatial_index`
+    (agents.spatialIndex) or positional `driver_locations` /
+    `cluster_locations` ([lon, lat]) to add config.spatial_penalty_per_km per km
+    of driver→cluster distance.  `nearest_k` then restricts each cluster
+    to its k nearest eligible drivers (all eligible drivers if none of the
+    k is eligible).
+
+    `shortlist_k` scores only the k least-loaded eligible drivers per
+    cluster, falling back to all of them whenever the shortlist cannot be
+    proven to contain the best driver (see ShortlistPruner).  It speeds
+    up the Python candidate loop only; the allocation sub-graph runs the
+    kernel and does not pass it.
+
+    `use_kernel` runs each trial as one call into agents.allocationKernel
+    (Numba-compiled when available, vectorised NumPy otherwise) instead
+    of the Python candidate loop; `shortlist_k` is then unused.
+
+    `fixed_assignment` (cluster → driver) repairs an earlier allocation:
+    those clusters keep their driver and are loaded onto them up front
+    (in greedy order), and the trials only place the remaining clusters.
+    Heavy thresholds and normalisation still use every cluster, so the
+    result is comparable with a full run.
+
+    `config` (an AllocationConfig, DEFAULT_CONFIG when omitted) supplies
+    the weights, decay, heavy percentile and penalties.  No module state
+    is read or written, so calls may run concurrently.
+
+    `constraints` (agents.softConstraints.compile_soft_constraints over
+    these drivers and clusters) adds the avoid/prefer bias to every
+    candidate cost and sets each driver's heavy-cluster limit.
+
+    `trials` greedy passes are run and the lowest-penalty one is kept.
+    The first pass follows the magnitude order exactly; the others
+    perturb it at random, so trials=1 is fully deterministic.
+    """
+    if config is None:
+        config = DEFAULT_CONFIG
+
     start_time = time.time()
 
     driver_names  = list(driverData.keys())
     cluster_names = list(effortVectors.keys())
 
-    indices_map, decay_arr, dim_weights_arr = get_feature_meta()
+    indices_map, decay_arr, dim_weights_arr = get_feature_meta(config)
 
     driver_efforts = np.array([
         flatten_effort_vector(d["cumulative_effort_vector"])
@@ -108,8 +356,8 @@ def allocateDrivers_optimized(effortVectors, driverData,
 
     physical_weights   = cluster_vectors[:, 0]
     durations          = cluster_vectors[:, 10]
-    physical_threshold = np.percentile(physical_weights, HEAVY_PERCENTILE * 100)
-    duration_threshold = np.percentile(durations,        HEAVY_PERCENTILE * 100)
+    physical_threshold = np.percentile(physical_weights, config.heavy_percentile * 100)
+    duration_threshold = np.percentile(durations,        config.heavy_percentile * 100)
     is_heavy_cluster   = (physical_weights >= physical_threshold) | (durations >= duration_threshold)
 
     def compute_weighted_magnitude(vectors):
@@ -117,18 +365,58 @@ def allocateDrivers_optimized(effortVectors, driverData,
         mags   = []
         for dim, idxs in indices_map.items():
             dim_val = np.mean(normed[:, idxs], axis=1)
-            mags.append(DIM_WEIGHTS[dim] * dim_val)
+            mags.append(config.dim_weights[dim] * dim_val)
         return np.sum(np.array(mags), axis=0)
 
     cluster_mags   = compute_weighted_magnitude(cluster_vectors)
     base_order     = list(np.argsort(cluster_mags)[::-1])
 
-    def spatial_penalty(d_idx, c_idx):
-        if driver_locations is None or cluster_locations is None:
-            return 0
-        d = np.array(driver_locations[d_idx])
-        c = np.array(cluster_locations[c_idx])
-        return np.linalg.norm(d - c) * 0.05
+    fixed_assign = {}
+    if fixed_assignment:
+        driver_index = {name: i for i, name in enumerate(driver_names)}
+        kept = [idx for idx in base_order
+                if driver_index.get(fixed_assignment.get(cluster_names[idx])) is not None]
+        for idx in kept:
+            d_idx = driver_index[fixed_assignment[cluster_names[idx]]]
+            driver_efforts[d_idx] += cluster_vectors[idx]
+            if is_heavy_cluster[idx]:
+                consecutive_heavy[d_idx] += 1
+            else:
+                consecutive_heavy[d_idx] = 0
+            fixed_assign[cluster_names[idx]] = driver_names[d_idx]
+        kept = set(kept)
+        base_order = [idx for idx in base_order if idx not in kept]
+
+    if spatial_index is None and driver_locations is not None and cluster_locations is not None:
+        from agents.spatialIndex import build_spatial_index
+        spatial_index = build_spatial_index(driver_locations, cluster_locations)
+
+    # Driver × cluster penalty matrix, computed once for every trial.
+    spatial_cost = (
+        spatial_index.distance_km * config.spatial_penalty_per_km
+        if spatial_index is not None else None
+    )
+    nearest = (
+        spatial_index.nearest_drivers(nearest_k)
+        if spatial_index is not None and nearest_k else None
+    )
+    all_drivers = range(len(driver_names))
+
+    if constraints is not None:
+        heavy_limit = constraints.heavy_limit
+        bias_column = constraints.column if constraints.has_bias else (lambda idx: None)
+    else:
+        heavy_limit = np.full(len(driver_names), config.heavy_day_limit)
+        bias_column = lambda idx: None
+
+    dim_weight_vec  = config.dim_weight_vec
+    cluster_dim_inc = dimension_loads(cluster_vectors / bounds_range, indices_map)
+    use_pruner = (
+        shortlist_k is not None
+        and nearest is None
+        and shortlist_k < len(driver_names)
+        and np.all(cluster_dim_inc >= 0)
+    )
 
     def calculate_penalty(efforts, cons_heavy):
         normed        = _norm_vector(efforts)
@@ -136,19 +424,19 @@ def allocateDrivers_optimized(effortVectors, driverData,
         driver_totals = []
         for dim, idxs in indices_map.items():
             vals = np.mean(normed[:, idxs], axis=1)
-            dim_variances += DIM_WEIGHTS[dim] * np.var(vals)
+            dim_variances += config.dim_weights[dim] * np.var(vals)
             driver_totals.append(vals)
         driver_totals = np.mean(np.array(driver_totals), axis=0)
         imbalance     = np.var(driver_totals)
-        fatigue       = np.sum(cons_heavy >= 3) * 0.5
-        return dim_variances + 1.5 * imbalance + fatigue
+        fatigue       = np.sum(cons_heavy >= 3) * config.fatigue_penalty
+        return dim_variances + config.imbalance_weight * imbalance + fatigue
 
     best_global            = None
     best_score             = float("inf")
     best_local_efforts     = None 
     best_local_consecutive = None 
 
-    for trial in range(3):
+    for trial in range(trials):
         trial_order = base_order.copy()
         if trial > 0 and len(trial_order) > 1:
             for _ in range(max(1, len(trial_order) // 2)):
@@ -157,35 +445,100 @@ def allocateDrivers_optimized(effortVectors, driverData,
 
         local_efforts     = driver_efforts.copy()
         local_consecutive = consecutive_heavy.copy()
-        local_assign      = {}
-
-        for idx in trial_order:
-            cluster_vec  = cluster_vectors[idx]
-            is_heavy     = is_heavy_cluster[idx]
-            best_driver  = -1
-            best_penalty = float("inf")
-
-            for d_idx in range(len(driver_names)):
-                if is_heavy and local_consecutive[d_idx] >= 2:
+        local_assign      = dict(fixed_assign)
+
+        if use_kernel:
+            from agents.allocationKernel import greedy_trial
+
+            assigned, local_consecutive = greedy_trial(
+                np.array(trial_order, dtype=np.int64),
+                cluster_dim_inc,
+                dimension_loads(_norm_vector(local_efforts), indices_map),
+                dim_weight_vec,
+                is_heavy_cluster,
+                consecutive_heavy,
+                spatial_cost,
+                nearest,
+                imbalance_weight=config.imbalance_weight,
+                fatigue_surcharge=config.fatigue_surcharge,
+                heavy_limit=heavy_limit,
+                constraints=constraints,
+            )
+            for idx in trial_order:
+                d_idx = assigned[idx]
+                if d_idx != -1:
+                    local_efforts[d_idx] += cluster_vectors[idx]
+                    local_assign[cluster_names[idx]] = driver_names[d_idx]
+        else:
+            pruner = None
+            if use_pruner:
+                pruner = ShortlistPruner(
+                    dimension_loads(_norm_vector(local_efforts), indices_map),
+                    dim_weight_vec, local_consecutive >= heavy_limit, shortlist_k,
+                    imbalance_weight=config.imbalance_weight,
+                )
+
+            for idx in trial_order:
+                cluster_vec  = cluster_vectors[idx]
+                is_heavy     = is_heavy_cluster[idx]
+                best_driver  = -1
+                best_penalty = float("inf")
+                bias         = bias_column(idx)
+
+                if pruner is not None:
+                    def extra_cost(drivers, idx=idx, bias=bias):
+                        extra = config.fatigue_surcharge * (local_consecutive[drivers] >= 2)
+                        if spatial_cost is not None:
+                            extra = extra + spatial_cost[drivers, idx]
+                        if bias is not None:
+                            extra = extra + bias[drivers]
+                        return extra
+
+                    best_driver = pruner.select(
+                        cluster_dim_inc[idx], is_heavy, extra_cost,
+                        constraints.min_bias[idx] if bias is not None else 0.0,
+                    )
+                    if best_driver != -1:
+                        local_efforts[best_driver] += cluster_vec
+                        if is_heavy:
+                            local_consecutive[best_driver] += 1
+                        else:
+                            local_consecutive[best_driver] = 0
+                        pruner.assign(best_driver, cluster_dim_inc[idx],
+                                      local_consecutive[best_driver] >= heavy_limit[best_driver])
+                        local_assign[cluster_names[idx]] = driver_names[best_driver]
                     continue
 
-                local_efforts[d_idx] += cluster_vec
-                penalty = calculate_penalty(local_efforts, local_consecutive)
-                penalty += spatial_penalty(d_idx, idx)
-                if local_consecutive[d_idx] >= 2:
-                    penalty += 0.3
-                if penalty < best_penalty:
-                    best_penalty = penalty
-                    best_driver  = d_idx
-                local_efforts[d_idx] -= cluster_vec
-
-            if best_driver != -1:
-                local_efforts[best_driver] += cluster_vec
-                if is_heavy:
-                    local_consecutive[best_driver] += 1
-                else:
-                    local_consecutive[best_driver] = 0
-                local_assign[cluster_names[idx]] = driver_names[best_driver]
+                candidates = all_drivers
+                if nearest is not None:
+                    candidates = nearest[idx]
+                    if is_heavy and not np.any(local_consecutive[candidates] < heavy_limit[candidates]):
+                        candidates = all_drivers
+
+                for d_idx in candidates:
+                    if is_heavy and local_consecutive[d_idx] >= heavy_limit[d_idx]:
+                        continue
+
+                    local_efforts[d_idx] += cluster_vec
+                    penalty = calculate_penalty(local_efforts, local_consecutive)
+                    if spatial_cost is not None:
+                        penalty += spatial_cost[d_idx, idx]
+                    if local_consecutive[d_idx] >= 2:
+                        penalty += config.fatigue_surcharge
+                    if bias is not None:
+                        penalty += bias[d_idx]
+                    if penalty < best_penalty:
+                        best_penalty = penalty
+                        best_driver  = d_idx
+                    local_efforts[d_idx] -= cluster_vec
+
+                if best_driver != -1:
+                    local_efforts[best_driver] += cluster_vec
+                    if is_heavy:
+                        local_consecutive[best_driver] += 1
+                    else:
+                        local_consecutive[best_driver] = 0
+                    local_assign[cluster_names[idx]] = driver_names[best_driver]
 
         final_penalty = calculate_penalty(local_efforts, local_consecutive)
         if final_penalty < best_score:
@@ -197,15 +550,23 @@ def allocateDrivers_optimized(effortVectors, driverData,
     # FIX Bug 7: write back the arrays that correspond to the WINNING trial,
     # not the last trial's arrays (which may not be the best).
     for i, name in enumerate(driver_names):
-        vec = best_local_efforts[i]
-        driverData[name]["cumulative_effort_vector"] = {
-            "physical_load":  {"total_weight": vec[0], "heavy_pkg_ratio": vec[1], "bulky_ratio": vec[2]},
-            "stair_load":     {"stair_load_index": vec[3], "avg_floor": vec[4], "elevator_coverage": vec[5]},
-            "traffic_stress": {"traffic_index": vec[6], "parking_stress": vec[7], "stop_density": vec[8]},
-            "route_distance": {"total_distance": vec[9], "total_duration": vec[10]},
-            "cognitive_density": vec[11]
-        }
-        driverData[name]["consecutive_heavy_days"] = int(best_local_consecutive[i])
+        driverData[name]["cumulative_effort_vector"] = effort_vector_dict(best_local_efforts[i])
+        driverData[name]["consecutive_heavy_days"]   = int(best_local_consecutive[i])
 
     print(f"Optimized Allocation Complete. Time: {time.time() - start_time:.4f}s")
-    return best_global
\ No newline at end of file
+    return best_global
+
+
+if __name__ == "__main__":
+    # Allocation-only CLI: python -m agents.optimized_allocation <data_id>
+    import json
+    import sys
+
+    data_id   = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    data_path = f"data/jsonFiles{data_id}/"
+    with open(f"{data_path}finalFeatures.json") as f:
+        effort_vectors = json.load(f)
+    with open(f"{data_path}driversdata.json") as f:
+        driver_data = json.load(f)
+
+    print(json.dumps(allocateDrivers_optimized(effort_vectors, driver_data), indent=2))
@@ -0,0 +1,112 @@
+"""
+agents/softConstraints.py
+──────────────────────────
+constraint_gen's soft rules, compiled into arrays the allocator scores
+with.
+
+Public API:
+    from agents.softConstraints import compile_soft_constraints
+
+    compiled = compile_soft_constraints(rules, driver_names, cluster_names)
+    allocateDrivers_optimized(..., constraints=compiled)
+
+Rules → arrays (n drivers, c clusters):
+    avoid     {"driver", "cluster"}          +config.avoid_cost in (driver, cluster)
+    prefer    {"driver", "cluster"}          −config.prefer_bonus in (driver, cluster)
+    cap_heavy {"driver", "max_consecutive"}  heavy_limit[driver] lowered to the cap
+
+The driver × cluster bias is stored column-compressed (bias_ptr /
+bias_rows / bias_vals, like scipy's CSC), so thousands of rules cost
+O(rules) memory and one scatter-add into the candidate costs per
+cluster step.  avoid_cost is finite: an avoided driver is only chosen
+when every other driver is avoided or ineligible, so no cluster is left
+unassigned.  A driver may take a heavy cluster only while its
+consecutive_heavy_days is below heavy_limit (config.heavy_day_limit
+unless capped).  Rules naming unknown drivers or clusters are ignored.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+from agents.optimized_allocation import AllocationConfig, DEFAULT_CONFIG
+
+
+class SoftConstraints:
+    __slots__ = ("n_drivers", "n_clusters", "bias_ptr", "bias_rows",
+                 "bias_vals", "heavy_limit", "min_bias", "applied")
+
+    def __init__(self, n_drivers: int, n_clusters: int,
+                 entries: Dict[tuple, float], heavy_limit: np.ndarray,
+                 applied: int):
+        self.n_drivers   = n_drivers
+        self.n_clusters  = n_clusters
+        self.heavy_limit = heavy_limit
+        self.applied     = applied
+
+        keys  = sorted(entries, key=lambda k: (k[1], k[0]))    # by cluster, then driver
+        rows  = np.array([d for d, _ in keys], dtype=np.int64)
+        cols  = np.array([c for _, c in keys], dtype=np.int64)
+        self.bias_rows = rows
+        self.bias_vals = np.array([entries[k] for k in keys], dtype=np.float64)
+        self.bias_ptr  = np.zeros(n_clusters + 1, dtype=np.int64)
+        np.add.at(self.bias_ptr, cols + 1, 1)
+        self.bias_ptr  = np.cumsum(self.bias_ptr)
+
+        # Most negative bias per cluster (0 when none): the shortlist bound
+        # must allow for an unscored driver with a prefer bonus.
+        self.min_bias = np.zeros(n_clusters)
+        np.minimum.at(self.min_bias, cols, self.bias_vals)
+
+    @property
+    def has_bias(self) -> bool:
+        return len(self.bias_vals) > 0
+
+    def column(self, cluster: int) -> Optional[np.ndarray]:
+        """Dense bias over all drivers for one cluster (None when empty)."""
+        lo, hi = self.bias_ptr[cluster], self.bias_ptr[cluster + 1]
+        if lo == hi:
+            return None
+        col = np.zeros(self.n_drivers)
+        col[self.bias_rows[lo:hi]] = self.bias_vals[lo:hi]
+        return col
+
+
+def compile_soft_constraints(rules:         Iterable[Dict[str, Any]],
+                             driver_names:  Sequence[str],
+                             cluster_names: Sequence[str],
+                             config:        Optional[AllocationConfig] = None
+                             ) -> SoftConstraints:
+    if config is None:
+        config = DEFAULT_CONFIG
+    driver_index  = {name: i for i, name in enumerate(driver_names)}
+    cluster_index = {name: i for i, name in enumerate(cluster_names)}
+
+    entries: Dict[tuple, float] = {}
+    heavy_limit = np.full(len(driver_names), config.heavy_day_limit, dtype=np.int64)
+    applied = 0
+
+    for rule in rules or []:
+        kind = rule.get("type")
+        d    = driver_index.get(rule.get("driver", ""))
+        if d is None:
+            continue
+        if kind == "cap_heavy":
+            try:
+                cap = int(rule.get("max_consecutive", config.heavy_day_limit))
+            except (TypeError, ValueError):
+                continue
+            # A cap only ever tightens the global limit.
+            heavy_limit[d] = max(0, min(heavy_limit[d], cap))
+            applied += 1
+        elif kind in ("avoid", "prefer"):
+            c = cluster_index.get(rule.get("cluster", ""))
+            if c is None:
+                continue
+            value = config.avoid_cost if kind == "avoid" else -config.prefer_bonus
+            entries[(d, c)] = entries.get((d, c), 0.0) + value
+            applied += 1
+
+    return SoftConstraints(len(driver_names), len(cluster_names),
+                           entries, heavy_limit, applied)
+
@@ -0,0 +1,100 @@
+"""
+agents/spatialIndex.py
+───────────────────────
+Driver ↔ cluster proximity for the allocator.
+
+Public API:
+    from agents.spatialIndex import cluster_centroids, spatial_index_for
+
+    cluster_locations = cluster_centroids(clustered_stoppings)   # name → [lon, lat]
+    index = spatial_index_for(driver_data, effort_vectors, cluster_locations)
+    index.distance_km            # (drivers × clusters), computed once
+    index.nearest_drivers(k)     # (clusters × k) driver indices, KD-tree query
+
+Coordinates are [lon, lat] and are projected to local metres (same
+equirectangular projection as prePreocess.cluster) before indexing, so
+plain Euclidean distances are metres.  Drivers carry an optional
+"location": [lon, lat]; without any located drivers there is no index
+and the allocator stays location-blind.
+
+The bundled depots (data/jsonFiles*/driversdata.json) predate driver
+locations, so dispatches on them are location-blind.  Depots from
+prePreocess/generate_complex_data.py and benchmarks/synthetic_depot.py
+carry driver start points and exercise the index, as do the
+allocator's tests and the "spatial" benchmark variant.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from prePreocess.cluster import project_to_local_metres
+
+
+def cluster_centroids(clustered_stoppings: Dict[str, Dict[str, List[float]]]
+                      ) -> Dict[str, List[float]]:
+    """Mean [lon, lat] of every cluster in clustered_stoppings.json."""
+    return {
+        name: np.mean(np.asarray(list(stops.values()), dtype=float), axis=0).tolist()
+        for name, stops in clustered_stoppings.items()
+        if stops
+    }
+
+
+class SpatialIndex:
+    def __init__(self, driver_points: np.ndarray, cluster_points: np.ndarray):
+        from scipy.spatial import cKDTree
+
+        self.driver_points  = driver_points
+        self.cluster_points = cluster_points
+        self._tree          = cKDTree(driver_points)
+        self._distance_km: Optional[np.ndarray] = None
+
+    @property
+    def distance_km(self) -> np.ndarray:
+        if self._distance_km is None:
+            diff = self.driver_points[:, None, :] - self.cluster_points[None, :, :]
+            self._distance_km = np.sqrt(np.sum(diff * diff, axis=2)) / 1000.0
+        return self._distance_km
+
+    def nearest_drivers(self, k: int) -> np.ndarray:
+        """Driver indices of the k nearest drivers per cluster, ascending index."""
+        k = min(k, len(self.driver_points))
+        _, idx = self._tree.query(self.cluster_points, k=k)
+        idx = np.asarray(idx).reshape(len(self.cluster_points), k)
+        return np.sort(idx, axis=1)
+
+
+def build_spatial_index(driver_locations:  Sequence[Optional[Sequence[float]]],
+                        cluster_locations: Sequence[Sequence[float]]
+                        ) -> Optional[SpatialIndex]:
+    """
+    Positional inputs (same order as the allocator's driver / cluster
+    lists).  Returns None unless every driver and cluster has a location.
+    """
+    if not len(driver_locations) or not len(cluster_locations):
+        return None
+    if any(loc is None for loc in driver_locations) \
+            or any(loc is None for loc in cluster_locations):
+        return None
+
+    clusters = np.asarray(cluster_locations, dtype=float)
+    drivers  = np.asarray(driver_locations,  dtype=float)
+    origin   = clusters.mean(axis=0)
+    return SpatialIndex(
+        project_to_local_metres(drivers,  origin),
+        project_to_local_metres(clusters, origin),
+    )
+
+
+def spatial_index_for(driver_data:       Dict[str, Any],
+                      effort_vectors:    Dict[str, Any],
+                      cluster_locations: Optional[Dict[str, List[float]]]
+                      ) -> Optional[SpatialIndex]:
+    """Convenience wrapper keyed by driver / cluster name."""
+    if not cluster_locations:
+        return None
+    return build_spatial_index(
+        [d.get("location") for d in driver_data.values()],
+        [cluster_locations.get(name) for name in effort_vectors],
+    )
@@ -4,56 +4,133 @@ agents/supervisorGraph.py
 Supervisor graph — called from main.py after preprocessing.
 
 Public API:
-    from agents.supervisorGraph import run_dispatch
+    from agents.supervisorGraph import run_dispatch, stream_dispatch
 
     result = run_dispatch(effort_vectors, driver_data)
-    # result keys: allocation, fairness_report, critique, explanation
+    # result keys: allocation, fairness_report, critique, degraded_nodes,
+    #              dispatch_id, explanation_status ("pending")
+
+    for event in stream_dispatch(effort_vectors, driver_data):
+        ...   # node / allocation / fairness / critique events, then result
+
+    # Without an explicit graph the process-level runtime's compiled
+    # graph is reused (see agents/dispatchRuntime.py).
 
 Internal flow:
     context_phase → allocation_phase → critique_phase
                                             ↓
                           score < 0.60 → reallocator → allocation_phase (retry)
-                          score ≥ 0.60 → explainer → END
+                          score ≥ 0.60 → END
+
+    Retries are repairs: the reallocator keeps the previous allocation
+    and frees only the clusters named in the critique / policy
+    violations plus those of flagged or overloaded drivers.  The
+    allocation phase then re-places just those (no planner, no LLM swap).
+
+    The first allocation is speculative: it starts with the default
+    weights while the context phase runs.  It is reused as is when the
+    tuned inputs are the defaults; otherwise the clusters the tuned
+    inputs would place the same way are kept and the rest re-placed.
+
+    The critique score comes from a deterministic gate (equity − policy
+    penalty) when that is decisive, and from the LLM critic otherwise.
+
+    Every LLM call runs under a per-node time budget inside the dispatch
+    deadline (agents/nodeBudgets.py).  A call over budget is abandoned
+    and its node takes its deterministic fallback; once the deadline has
+    passed no further retry is started.  The result lists those nodes
+    under "degraded_nodes".
+
+    The dispatch inputs (effort vectors, pre-dispatch drivers, cluster
+    locations) never change during a run, so they live in a per-dispatch
+    side store (agents/dispatchStore.py); graph and sub-graph state carry
+    its handle plus the values nodes actually produce.  The driver state
+    each allocation produces is kept there too, next to the inputs, and
+    graph state carries only the allocation mapping.
+
+    Compiled with a checkpointer (agents/dispatchCheckpoints.py), the
+    graph saves its state after every node under the dispatch id; a
+    dispatch that failed part-way resumes from there when retried.
+
+    The explainer briefing is written afterwards, off the critical path,
+    by agents/explanationStore.py (fetch it by dispatch_id).
 
 LLM-influenced nodes (★):
-    ★ anomaly_detector   — flags outlier clusters
-    ★ llm_weight_tuner   — adjusts DIM_WEIGHTS dynamically
+    ★ anomaly_detector   — statistical outliers; LLM reviews borderline ones
+    ★ llm_weight_tuner   — weight sweep; LLM breaks near-ties only
     ★ constraint_gen     — injects soft avoid/prefer/cap rules
     ★ llm_swap_agent     — post-allocation cluster swaps
-    ★ critic_agent       — holistic fairness scoring
-    ★ explainer          — plain-English daily briefing
+    ★ critic_agent       — holistic fairness scoring (ambiguous cases only)
+    ★ explainer          — plain-English daily briefing (asynchronous)
 """
 
-import copy
+import contextvars
 import os
-import json
-from typing import TypedDict, Dict, Any, List
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TypedDict, Dict, Any, Iterator, List, Optional, TYPE_CHECKING
 
+import numpy as np
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+if TYPE_CHECKING:  # langchain_groq is only needed once a client is built
+    from langchain_groq import ChatGroq
 from langgraph.graph import StateGraph, END
 
 from agents.contextSubgraph    import build_context_subgraph,    ContextState
-from agents.allocationSubgraph import build_allocation_subgraph, AllocationState
-from agents.critiqueSubgraph   import build_critique_subgraph,   CritiqueState
+from agents.allocationSubgraph import (
+    build_allocation_subgraph, AllocationState, speculative_allocation,
+)
+from agents.critiqueSubgraph   import (
+    build_critique_subgraph, CritiqueState, REALLOCATION_THRESHOLD,
+)
+from agents.dispatchCheckpoints import dispatch_key, resumable
+from agents.dispatchStore import open_inputs, resolve
+from agents.nodeBudgets import BudgetedLLM, dispatch_budget, deadline_expired
+from telemetry import TracedLLM, traced_node
 
 load_dotenv()
 
 # ─── LLM setup ───────────────────────────────────────────────────────────────
 
-def _make_llm() -> ChatGroq:
+DEFAULT_MODEL = "openai/gpt-oss-120b"
+
+# HTTP timeout on the client itself, for calls made outside a dispatch;
+# inside one the gateway sends the node budget's time left instead.
+LLM_REQUEST_TIMEOUT_S = float(os.getenv("LLM_REQUEST_TIMEOUT_S", "60"))
+
+
+def _make_llm(model: str = DEFAULT_MODEL,
+              temperature: Optional[float] = None,
+              api_key_env: str = "groqAPI2",
+              base_url: Optional[str] = None) -> "ChatGroq":
+    from langchain_groq import ChatGroq
+
+    kwargs = {"temperature": temperature} if temperature is not None else {}
+    if base_url:
+        kwargs["base_url"] = base_url
     return ChatGroq(
-        model="openai/gpt-oss-120b",
-        api_key=os.getenv("groqAPI2"),
+        model=model,
+        api_key=os.getenv(api_key_env),
+        request_timeout=LLM_REQUEST_TIMEOUT_S,
+        max_retries=0,      # agents/llmGateway.py retries, within the call's deadline
+        **kwargs,
     )
 
 MAX_REALLOCATION_ATTEMPTS = 2
 
+# Start the default-weight allocation alongside the context phase; the
+# allocation phase then reuses or repairs it (see core_allocator_node).
+SPECULATIVE_ALLOCATION = True
+
+_SPECULATION_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative-alloc")
 
 
 class DispatchState(TypedDict):
-    effort_vectors:          Dict[str, Any]
-    drivers:                 Dict[str, Any]
+    # Handle into agents.dispatchStore: effort_vectors, the driver state
+    # before today and cluster_locations (name → [lon, lat]).
+    inputs:                  str
+    heavy_day_caps:          Dict[str, int]   # reallocator's consecutive-day caps
 
     # ── Context sub-graph outputs ────────────────────────────────────────────
     anomalies:               List[str]
@@ -74,23 +151,34 @@ class DispatchState(TypedDict):
 
     # ── Supervisor bookkeeping ───────────────────────────────────────────────
     reallocation_attempts:   int
-
-    # ── Terminal output ──────────────────────────────────────────────────────
-    explanation:             str
+    repair_clusters:         List[str]   # clusters the next retry re-places
 
 
 # ─── Phase wrappers ───────────────────────────────────────────────────────────
 
 def _run_context(state: DispatchState, graphs: dict) -> dict:
     print("\n══ [Supervisor] Context phase ══")
+    inputs = resolve(state["inputs"])
+    future = None
+    if SPECULATIVE_ALLOCATION:
+        future = _SPECULATION_POOL.submit(
+            contextvars.copy_context().run, speculative_allocation,
+            inputs.effort_vectors, inputs.drivers, inputs.cluster_locations,
+        )
+
     result = graphs["context"].invoke({
-        "effort_vectors":   state["effort_vectors"],
-        "drivers":          state["drivers"],
+        "inputs":           state["inputs"],
         "anomalies":        [],
         "tuned_weights":    {},
         "soft_constraints": [],
         "context_notes":    "",
     })
+
+    if future is not None:
+        try:
+            inputs.derived["speculative"] = future.result()
+        except Exception as e:
+            print(f"[Supervisor] speculative allocation failed ({e}) → regular run")
     return {
         "anomalies":        result["anomalies"],
         "tuned_weights":    result["tuned_weights"],
@@ -101,18 +189,26 @@ def _run_context(state: DispatchState, graphs: dict) -> dict:
 
 def _run_allocation(state: DispatchState, graphs: dict) -> dict:
     print("\n══ [Supervisor] Allocation phase ══")
-    drivers_snapshot = copy.deepcopy(state["drivers"])
+    repair = set(state.get("repair_clusters") or [])
+    fixed  = {
+        cluster: driver
+        for cluster, driver in state.get("allocation", {}).items()
+        if cluster not in repair
+    } if repair else {}
+    if fixed:
+        print(f"[Supervisor] repairing {len(repair)} cluster(s), keeping {len(fixed)}")
 
     result = graphs["allocation"].invoke({
-        "effort_vectors":   state["effort_vectors"],
-        "drivers":          drivers_snapshot,
+        "inputs":           state["inputs"],
+        "heavy_day_caps":   state.get("heavy_day_caps",   {}),
         "tuned_weights":    state.get("tuned_weights",    {}),
         "soft_constraints": state.get("soft_constraints", []),
         "anomalies":        state.get("anomalies",        []),
         "context_notes":    state.get("context_notes",    ""),
-        "strategy":         "",
+        "fixed_assignment": fixed,
+        "strategy":         state.get("strategy", "") if fixed else "",
         "allocation":       {},
-        "swap_log":         [],
+        "swap_log":         state.get("swap_log", []) if fixed else [],
         "fairness_score":   0.0,
         "fairness_report":  {},
     })
@@ -122,19 +218,19 @@ def _run_allocation(state: DispatchState, graphs: dict) -> dict:
         "swap_log":        result.get("swap_log", []),
         "fairness_score":  result["fairness_score"],
         "fairness_report": result["fairness_report"],
-        "drivers":         result["drivers"],   # updated cumulative effort
     }
 
 
 def _run_critique(state: DispatchState, graphs: dict) -> dict:
     print("\n══ [Supervisor] Critique phase ══")
     result = graphs["critique"].invoke({
+        "inputs":            state["inputs"],
         "allocation":        state["allocation"],
-        "drivers":           state["drivers"],
         "fairness_report":   state["fairness_report"],
         "soft_constraints":  state.get("soft_constraints", []),
         "anomalies":         state.get("anomalies",        []),
         "context_notes":     state.get("context_notes",    ""),
+        "gate_score":        0.0,
         "critique":          {},
         "policy_violations": [],
     })
@@ -159,55 +255,69 @@ def make_critique_node(graphs):
     return node
 
 
-def reallocator_node(state: DispatchState) -> dict:
+def _names_in(texts: List[str], names) -> set:
+    """Names that appear as whole tokens in any of `texts`."""
+    names = sorted(names, key=len, reverse=True)
+    if not names or not texts:
+        return set()
+    pattern = re.compile(
+        r"(?<!\w)(" + "|".join(re.escape(n) for n in names) + r")(?!\w)"
+    )
+    return {m for text in texts for m in pattern.findall(str(text))}
 
-    attempt = state.get("reallocation_attempts", 0) + 1
-    print(f"\n══ [Supervisor] Reallocation attempt {attempt} ══")
 
-    assigned_today = set(state.get("allocation", {}).values())
+def _repair_clusters(state: DispatchState) -> List[str]:
+    """
+    Clusters the critique holds against the current allocation: those
+    named in its issues or the policy violations, plus every cluster of
+    a driver named there or loaded more than one standard deviation
+    above the mean.  Empty when nothing would be kept (full recompute).
+    """
+    allocation = state.get("allocation", {})
+    texts      = (list(state.get("critique", {}).get("issues", []))
+                  + list(state.get("policy_violations", [])))
 
-    drivers_reset = copy.deepcopy(state["drivers"])
-    for name, data in drivers_reset.items():
-        if name in assigned_today:
-            data["consecutive_heavy_days"] = min(
-                data.get("consecutive_heavy_days", 0), 3
-            )
+    clusters = _names_in(texts, allocation)
+    drivers  = _names_in(texts, resolve(state["inputs"]).drivers)
 
-    return {
-        "drivers":               drivers_reset,
-        "reallocation_attempts": attempt,
-    }
+    loads = state.get("fairness_report", {}).get("driver_workloads", {})
+    if loads:
+        vals    = np.array(list(loads.values()), dtype=float)
+        cut_off = vals.mean() + vals.std()
+        drivers |= {d for d, v in loads.items() if v > cut_off}
 
+    clusters |= {c for c, d in allocation.items() if d in drivers}
+    if not clusters or len(clusters) >= len(allocation):
+        return []
+    return sorted(clusters)
 
-def make_explainer_node(llm: ChatGroq):
-    def explainer_node(state: DispatchState) -> dict:
-        print("\n══ [Supervisor] Explainer ══")
-        prompt = f"""
-You are a logistics dispatch coordinator writing a daily briefing.
 
-Final allocation (cluster → driver):
-{json.dumps(state["allocation"], indent=2)}
+def reallocator_node(state: DispatchState) -> dict:
 
-Fairness report:
-{json.dumps(state["fairness_report"], indent=2)}
+    attempt = state.get("reallocation_attempts", 0) + 1
+    print(f"\n══ [Supervisor] Reallocation attempt {attempt} ══")
 
-Critique score: {state["critique"].get("score", "N/A")}
-Critique issues: {state["critique"].get("issues", [])}
+    assigned_today = set(state.get("allocation", {}).values())
 
-AI-suggested swaps applied: {state.get("swap_log", [])}
-Policy violations found: {state.get("policy_violations", [])}
+    # The next allocation starts again from the pre-dispatch drivers
+    # (the allocated drivers already carry today's allocation), with today's
+    # drivers' consecutive heavy days capped at 3.
+    baseline = resolve(state["inputs"]).drivers
+    caps = {
+        name: 3
+        for name in assigned_today
+        if baseline.get(name, {}).get("consecutive_heavy_days", 0) > 3
+    }
 
-Write a clear 3–5 paragraph briefing:
-  1. Who is assigned where and why
-  2. Special considerations (anomalies, fatigued drivers)
-  3. Overall fairness assessment
-  4. Any remaining concerns or suggestions for tomorrow
+    repair = _repair_clusters(state)
+    print(f"[Reallocator] repairing {len(repair)}/{len(state.get('allocation', {}))} "
+          f"cluster(s)" if repair else "[Reallocator] no repair target → full recompute")
 
-Plain English only. No JSON. No markdown headers.
-"""
-        resp = llm.invoke(prompt)
-        return {"explanation": resp.content}
-    return explainer_node
+    return {
+        "heavy_day_caps":        caps,
+        "reallocation_attempts": attempt,
+        "repair_clusters":       repair,
+    }
 
 
 # ─── Routing ──────────────────────────────────────────────────────────────────
@@ -215,16 +325,20 @@ Plain English only. No JSON. No markdown headers.
 def _should_reallocate(state: DispatchState) -> str:
     score    = float(state["critique"].get("score", 1.0))
     attempts = state.get("reallocation_attempts", 0)
-    if score < 0.60 and attempts < MAX_REALLOCATION_ATTEMPTS:
-        print(f"[Supervisor] score={score:.3f} < 0.60 → reallocation")
+    if score < REALLOCATION_THRESHOLD and deadline_expired():
+        print(f"[Supervisor] score={score:.3f} but dispatch deadline passed → done")
+        return "done"
+    if score < REALLOCATION_THRESHOLD and attempts < MAX_REALLOCATION_ATTEMPTS:
+        print(f"[Supervisor] score={score:.3f} < {REALLOCATION_THRESHOLD:.2f} → reallocation")
         return "reallocate"
-    print(f"[Supervisor] score={score:.3f} → explain")
-    return "explain"
+    print(f"[Supervisor] score={score:.3f} → done")
+    return "done"
 
 
 # ─── Graph builder ────────────────────────────────────────────────────────────
 
-def _build_graph(llm: ChatGroq) -> "CompiledGraph":
+def _build_graph(llm: "ChatGroq", checkpointer=None) -> "CompiledGraph":
+    llm    = BudgetedLLM(TracedLLM(llm))
     graphs = {
         "context":    build_context_subgraph(llm),
         "allocation": build_allocation_subgraph(llm),
@@ -233,11 +347,10 @@ def _build_graph(llm: ChatGroq) -> "CompiledGraph":
 
     builder = StateGraph(DispatchState)
 
-    builder.add_node("context_phase",    make_context_node(graphs))
-    builder.add_node("allocation_phase", make_allocation_node(graphs))
-    builder.add_node("critique_phase",   make_critique_node(graphs))
-    builder.add_node("reallocator",      reallocator_node)
-    builder.add_node("explainer",        make_explainer_node(llm))
+    builder.add_node("context_phase",    traced_node("context_phase", make_context_node(graphs)))
+    builder.add_node("allocation_phase", traced_node("allocation_phase", make_allocation_node(graphs)))
+    builder.add_node("critique_phase",   traced_node("critique_phase", make_critique_node(graphs)))
+    builder.add_node("reallocator",      traced_node("reallocator", reallocator_node))
 
     builder.set_entry_point("context_phase")
     builder.add_edge("context_phase",    "allocation_phase")
@@ -246,35 +359,20 @@ def _build_graph(llm: ChatGroq) -> "CompiledGraph":
     builder.add_conditional_edges(
         "critique_phase",
         _should_reallocate,
-        {"reallocate": "reallocator", "explain": "explainer"},
+        {"reallocate": "reallocator", "done": END},
     )
 
     builder.add_edge("reallocator", "allocation_phase")   # retry loop
-    builder.add_edge("explainer",   END)
 
-    return builder.compile()
+    return builder.compile(checkpointer=checkpointer)
 
 
 # ─── Public API — called from main.py ────────────────────────────────────────
 
-def run_dispatch(effort_vectors: Dict[str, Any],
-                 driver_data:    Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Entry point for main.py.
-
-    Args:
-        effort_vectors: cluster-level effort feature vectors
-        driver_data:    per-driver cumulative effort + metadata
-
-    Returns:
-        dict with keys: allocation, fairness_report, critique, explanation
-    """
-    llm   = _make_llm()
-    graph = _build_graph(llm)
-
-    initial: DispatchState = {
-        "effort_vectors":        effort_vectors,
-        "drivers":               driver_data,
+def _initial_state(inputs: str) -> DispatchState:
+    return {
+        "inputs":                inputs,
+        "heavy_day_caps":        {},
         "anomalies":             [],
         "tuned_weights":         {},
         "soft_constraints":      [],
@@ -287,14 +385,145 @@ def run_dispatch(effort_vectors: Dict[str, Any],
         "critique":              {},
         "policy_violations":     [],
         "reallocation_attempts": 0,
-        "explanation":           "",
+        "repair_clusters":       [],
     }
 
-    result = graph.invoke(initial)
 
-    return {
-        "allocation":      result["allocation"],
-        "fairness_report": result["fairness_report"],
-        "critique":        result["critique"],
-        "explanation":     result["explanation"],
-    }
\ No newline at end of file
+@contextmanager
+def _dispatch_thread(graph, dispatch_id: str):
+    """(config, snapshot) of a checkpointed graph's thread, (None, None) otherwise."""
+    if getattr(graph, "checkpointer", None) is None:
+        yield None, None
+        return
+    with resumable(graph, dispatch_id) as thread:
+        yield thread
+
+
+def _dispatch_result(state: Dict[str, Any], degraded: List[str], dispatch_id: str,
+                     explanations, explain: bool) -> Dict[str, Any]:
+    result = {
+        "allocation":      state["allocation"],
+        "fairness_report": state["fairness_report"],
+        "critique":        state["critique"],
+        "degraded_nodes":  list(degraded),
+    }
+    if explain:
+        if explanations is None:
+            from agents.dispatchRuntime import get_runtime
+            explanations = get_runtime().explanations
+        result["dispatch_id"]        = explanations.submit(state, dispatch_id)
+        result["explanation_status"] = "pending"
+    return result
+
+
+def run_dispatch(effort_vectors:    Dict[str, Any],
+                 driver_data:       Dict[str, Any],
+                 graph=None,
+                 cluster_locations: Optional[Dict[str, List[float]]] = None,
+                 explanations=None,
+                 explain:           bool = True,
+                 budget_s:          Optional[float] = None,
+                 dispatch_id:       Optional[str] = None
+                 ) -> Dict[str, Any]:
+    """
+    Entry point for main.py.
+
+    Args:
+        effort_vectors:    cluster-level effort feature vectors
+        driver_data:       per-driver cumulative effort + metadata
+                           (optional "location": [lon, lat] per driver)
+        graph:             compiled supervisor graph to use; defaults to the
+                           process-level DispatchRuntime's graph
+        cluster_locations: cluster name → centroid [lon, lat]; enables
+                           location-aware allocation for located drivers
+        explanations:      ExplanationStore that writes the briefing;
+                           defaults to the runtime's store
+        explain:           False skips the briefing altogether
+        budget_s:          dispatch deadline in seconds; defaults to
+                           nodeBudgets.DISPATCH_BUDGET_S (DISPATCH_SLO_S)
+        dispatch_id:       checkpoint thread + briefing id; defaults to a
+                           hash of the inputs, so a retry after a failure
+                           resumes from the last completed node (when the
+                           graph has a checkpointer)
+
+    Returns:
+        dict with keys: allocation, fairness_report, critique,
+        degraded_nodes (LLM nodes that fell back) and, when
+        explaining, dispatch_id + explanation_status ("pending").  The
+        briefing is fetched later with explanations.get / wait / stream.
+    """
+    if graph is None:
+        from agents.dispatchRuntime import get_runtime
+        graph = get_runtime().graph
+
+    dispatch_id = dispatch_id or dispatch_key(effort_vectors, driver_data, cluster_locations)
+    with dispatch_budget(budget_s) as degraded, \
+         open_inputs(dispatch_id, effort_vectors, driver_data, cluster_locations) as inputs, \
+         _dispatch_thread(graph, dispatch_id) as (config, snapshot):
+        state  = _initial_state(inputs)
+        result = graph.invoke(None if snapshot and snapshot.next else state, config)
+    return _dispatch_result(result, degraded, dispatch_id, explanations, explain)
+
+
+def stream_dispatch(effort_vectors:    Dict[str, Any],
+                    driver_data:       Dict[str, Any],
+                    graph=None,
+                    cluster_locations: Optional[Dict[str, List[float]]] = None,
+                    explanations=None,
+                    explain:           bool = True,
+                    budget_s:          Optional[float] = None,
+                    dispatch_id:       Optional[str] = None
+                    ) -> Iterator[Dict[str, Any]]:
+    """
+    Same run as run_dispatch, but yields progress events while the graph
+    executes (LangGraph "updates" stream, sub-graphs included):
+
+        {"event": "node",       "data": {"node", "phase", "attempt"}}
+        {"event": "allocation", "data": {"allocation", "preview", "attempt"}}
+        {"event": "fairness",   "data": fairness_report}
+        {"event": "critique",   "data": {"critique", "policy_violations"}}
+        {"event": "result",     "data": <run_dispatch result>}      # last
+
+    The first "allocation" event is the deterministic allocator's output
+    (preview=True), sent before the LLM swap / critique calls.  A resumed
+    dispatch only streams the nodes that still had to run.
+    """
+    if graph is None:
+        from agents.dispatchRuntime import get_runtime
+        graph = get_runtime().graph
+
+    dispatch_id = dispatch_id or dispatch_key(effort_vectors, driver_data, cluster_locations)
+    with dispatch_budget(budget_s) as degraded, \
+         open_inputs(dispatch_id, effort_vectors, driver_data, cluster_locations) as inputs, \
+         _dispatch_thread(graph, dispatch_id) as (config, snapshot):
+        resume = bool(snapshot and snapshot.next)
+        state  = dict(snapshot.values) if resume else _initial_state(inputs)
+        attempt = state["reallocation_attempts"]
+        for namespace, update in graph.stream(None if resume else state, config,
+                                              stream_mode="updates", subgraphs=True):
+            phase = namespace[-1].split(":")[0] if namespace else None
+            for node, delta in update.items():
+                delta = delta or {}
+                if not namespace:
+                    state.update(delta)
+                    attempt = state["reallocation_attempts"]
+                yield {"event": "node",
+                       "data": {"node": node, "phase": phase, "attempt": attempt}}
+
+                if node == "core_allocator":
+                    yield {"event": "allocation",
+                           "data": {"allocation": delta["allocation"],
+                                    "preview": True, "attempt": attempt}}
+                elif node == "fairness_scorer":
+                    yield {"event": "fairness", "data": delta["fairness_report"]}
+                elif node == "allocation_phase":
+                    yield {"event": "allocation",
+                           "data": {"allocation": delta["allocation"],
+                                    "preview": False, "attempt": attempt}}
+                elif node == "critique_phase":
+                    yield {"event": "critique",
+                           "data": {"critique":          delta["critique"],
+                                    "policy_violations": delta["policy_violations"]}}
+
+    yield {"event": "result",
+           "data": _dispatch_result(state, degraded, dispatch_id, explanations, explain)}
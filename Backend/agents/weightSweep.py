@@ -0,0 +1,212 @@
+"""
+agents/weightSweep.py
+──────────────────────
+Batched search over the allocator's dimension weights.
+
+Public API:
+    from agents.weightSweep import sweep_weights
+
+    sweep = sweep_weights(effort_vectors, drivers, n_candidates=256)
+    sweep["best"]             # {dim: weight} — top of the Pareto front
+    sweep["front"]            # [{"weights", "equity", "fatigued", "shift"}, ..]
+    sweep["default_equity"]   # equity with the default weights
+    sweep["evaluated"]        # weight vectors scored
+
+Candidates fill the ±40% box around the default weights (the clamp
+llm_weight_tuner has always applied) by Latin-hypercube sampling; the
+defaults themselves are always candidate 0.  All candidates run one
+deterministic greedy pass together: at step t every candidate places
+the t-th cluster of its own magnitude order on its cheapest eligible
+driver, costed with the variance-update identity of
+agents.allocationKernel, so one step is a single (candidates × drivers)
+product.  Each result is scored with fairness_scorer's equity metric.
+
+The front is Pareto-optimal over equity (↑), drivers left at ≥ 3
+consecutive heavy days (↓) and mean relative shift from the defaults
+(↓), sorted best-equity first.
+"""
+
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+
+from agents.optimized_allocation import (
+    AllocationConfig,
+    DEFAULT_CONFIG,
+    FEATURE_INDICES,
+    dimension_loads,
+    flatten_effort_vector,
+)
+
+SWEEP_SPREAD       = 0.40
+DEFAULT_CANDIDATES = 256
+
+# Candidates evaluated at once are capped so that the batched driver
+# loads (candidates × drivers × dims) stay around this many floats.
+MAX_BATCH_ELEMENTS = 2_000_000
+
+
+# ─── Candidates ──────────────────────────────────────────────────────────────
+
+def candidate_weights(n: int,
+                      base: Mapping[str, float],
+                      spread: float = SWEEP_SPREAD,
+                      seed: int = 0) -> np.ndarray:
+    """
+    (n × dims) weight vectors: `base` first, then n − 1 Latin-hypercube
+    samples of [base·(1 − spread), base·(1 + spread)].
+    """
+    base_vec = np.array([base[dim] for dim in FEATURE_INDICES], dtype=float)
+    samples  = max(0, n - 1)
+    if samples == 0:
+        return base_vec[None, :]
+
+    rng    = np.random.default_rng(seed)
+    strata = rng.permuted(np.tile(np.arange(samples), (len(base_vec), 1)), axis=1).T
+    unit   = (strata + rng.random(strata.shape)) / samples
+    return np.vstack([base_vec, base_vec * (1.0 - spread + 2.0 * spread * unit)])
+
+
+# ─── Batched greedy ──────────────────────────────────────────────────────────
+
+def _batched_greedy(orders, increments, loads0, weights, is_heavy,
+                    consecutive, imbalance_weight, fatigue_surcharge,
+                    heavy_day_limit=2):
+    """
+    One greedy trial per row of `orders` / `weights`, stepped in lockstep.
+    Same costs and tie-breaking as allocationKernel.greedy_trial.
+    """
+    w, c_count = orders.shape
+    n, m       = loads0.shape
+    loads  = np.broadcast_to(loads0, (w, n, m)).copy()
+    cons   = np.broadcast_to(consecutive, (w, n)).copy()
+    assign = np.full((w, increments.shape[0]), -1, dtype=np.int64)
+    rows   = np.arange(w)
+
+    for t in range(c_count):
+        c     = orders[:, t]
+        inc   = increments[c]
+        heavy = is_heavy[c]
+        beta  = (2.0 / n) * (weights * inc
+                             + imbalance_weight * inc.mean(axis=1, keepdims=True) / m)
+
+        costs = np.einsum("wnm,wm->wn", loads, beta) + fatigue_surcharge * (cons >= 2)
+        costs = np.where(heavy[:, None] & (cons >= heavy_day_limit), np.inf, costs)
+
+        d  = np.argmin(costs, axis=1)
+        ok = np.isfinite(costs[rows, d])
+        r, d, c = rows[ok], d[ok], c[ok]
+        loads[r, d] += inc[ok]
+        cons[r, d]   = np.where(heavy[ok], cons[r, d] + 1, 0)
+        assign[r, c] = d
+
+    return assign, cons
+
+
+def _equity(assign, cluster_totals, n_drivers):
+    """fairness_scorer's equity (1 − CV over drivers with work) per row."""
+    w       = assign.shape[0]
+    placed  = assign >= 0
+    rows    = np.repeat(np.arange(w), assign.shape[1])[placed.ravel()]
+    drivers = assign[placed]
+    amounts = np.broadcast_to(cluster_totals, assign.shape)[placed]
+
+    totals = np.zeros((w, n_drivers))
+    counts = np.zeros((w, n_drivers))
+    np.add.at(totals, (rows, drivers), amounts)
+    np.add.at(counts, (rows, drivers), 1)
+
+    mask = counts > 0
+    k    = np.maximum(mask.sum(axis=1), 1)
+    mean = (totals * mask).sum(axis=1) / k
+    var  = (((totals - mean[:, None]) ** 2) * mask).sum(axis=1) / k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cv = np.where(mean > 0, np.sqrt(var) / mean, 0.0)
+    return np.maximum(0.0, 1.0 - cv)
+
+
+def _pareto_front(equity, fatigued, shift):
+    """Indices of non-dominated candidates, best equity first."""
+    objectives = np.stack([-equity, fatigued, shift], axis=1)
+    front = []
+    for i, obj in enumerate(objectives):
+        no_worse = np.all(objectives <= obj, axis=1)
+        better   = np.any(objectives < obj, axis=1)
+        if not np.any(no_worse & better):
+            front.append(i)
+    return sorted(front, key=lambda i: (-equity[i], fatigued[i], shift[i]))
+
+
+# ─── Sweep ───────────────────────────────────────────────────────────────────
+
+def sweep_weights(effort_vectors: Dict[str, Any],
+                  drivers:        Dict[str, Any],
+                  n_candidates:   int = DEFAULT_CANDIDATES,
+                  spread:         float = SWEEP_SPREAD,
+                  seed:           int = 0,
+                  config:         Optional[AllocationConfig] = None) -> Dict[str, Any]:
+    if config is None:
+        config = DEFAULT_CONFIG
+    defaults = {dim: config.dim_weights.get(dim, 1.0) for dim in FEATURE_INDICES}
+    if not effort_vectors or not drivers:
+        return {"best": defaults, "front": [], "default_equity": 1.0, "evaluated": 0}
+
+    indices_map, decay_arr, _ = config.feature_meta
+
+    cluster_vectors = np.array([flatten_effort_vector(v) for v in effort_vectors.values()])
+    driver_efforts  = np.array([
+        flatten_effort_vector(d["cumulative_effort_vector"]) for d in drivers.values()
+    ]) * decay_arr
+    consecutive = np.array([d.get("consecutive_heavy_days", 0) for d in drivers.values()],
+                           dtype=np.int64)
+
+    bounds_min   = cluster_vectors.min(axis=0)
+    bounds_range = cluster_vectors.max(axis=0) - bounds_min
+    bounds_range[bounds_range == 0] = 1.0
+
+    heavy_q  = config.heavy_percentile * 100
+    is_heavy = ((cluster_vectors[:, 0]  >= np.percentile(cluster_vectors[:, 0],  heavy_q))
+                | (cluster_vectors[:, 10] >= np.percentile(cluster_vectors[:, 10], heavy_q)))
+
+    magnitudes = dimension_loads((cluster_vectors - bounds_min) / bounds_range, indices_map)
+    increments = dimension_loads(cluster_vectors / bounds_range, indices_map)
+    loads0     = dimension_loads((driver_efforts - bounds_min) / bounds_range, indices_map)
+    totals     = cluster_vectors.sum(axis=1)
+
+    weights = candidate_weights(n_candidates, defaults, spread, seed)
+    batch   = max(1, MAX_BATCH_ELEMENTS // (len(drivers) * len(indices_map)))
+
+    equity   = np.empty(len(weights))
+    fatigued = np.empty(len(weights))
+    for start in range(0, len(weights), batch):
+        chunk  = weights[start:start + batch]
+        orders = np.argsort(magnitudes @ chunk.T, axis=0)[::-1].T
+        assign, cons = _batched_greedy(
+            np.ascontiguousarray(orders), increments, loads0, chunk, is_heavy,
+            consecutive, config.imbalance_weight, config.fatigue_surcharge,
+            config.heavy_day_limit,
+        )
+        equity[start:start + batch]   = _equity(assign, totals, len(drivers))
+        fatigued[start:start + batch] = (cons >= 3).sum(axis=1)
+
+    base_vec = weights[0]
+    shift    = np.abs(weights / base_vec - 1.0).mean(axis=1)
+    names    = list(FEATURE_INDICES)
+
+    front = [
+        {
+            "weights":  {dim: round(float(v), 3) for dim, v in zip(names, weights[i])},
+            "equity":   round(float(equity[i]), 4),
+            "fatigued": int(fatigued[i]),
+            "shift":    round(float(shift[i]), 3),
+        }
+        for i in _pareto_front(equity, fatigued, shift)
+    ]
+    print(f"[WeightSweep] {len(weights)} candidates  equity "
+          f"{equity[0]:.4f} (defaults) → {front[0]['equity']:.4f}  front={len(front)}")
+    return {
+        "best":           front[0]["weights"],
+        "front":          front,
+        "default_equity": round(float(equity[0]), 4),
+        "evaluated":      len(weights),
+    }
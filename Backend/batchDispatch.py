@@ -0,0 +1,193 @@
+"""
+batchDispatch.py
+────────────────
+Multi-depot batch dispatch — many depot/day ids in one call.
+
+Public API:
+    from batchDispatch import run_batch
+
+    for item in run_batch([1, 2, 3], max_workers=8):
+        # item keys: data_id, status ("ok" | "not_found" | "error"),
+        #            result (on success) or detail (on failure)
+        ...
+
+Every depot runs preprocessing → run_dispatch on a worker thread.  All
+workers share the runtime's compiled supervisor graph (and therefore one
+LLM client) plus the process-wide ORS route cache in prePreocess.getRoute,
+so nothing is rebuilt per depot.  Results are yielded as soon as each
+depot finishes, not in submission order.  Batch LLM calls run at "batch"
+priority in agents.llmGateway, behind interactive dispatches.
+"""
+
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from runPreprocesses import DATA_DIR_TEMPLATE, iter_stages, main as runPreprocessesMain
+from agents.supervisorGraph import run_dispatch, stream_dispatch
+from agents.dispatchRuntime import get_runtime
+from agents.llmGateway import llm_priority
+from agents.spatialIndex import cluster_centroids
+from telemetry import collect, span
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def load_dispatch_inputs(data_id: int):
+    data_path = DATA_DIR_TEMPLATE.format(data_id)
+    with open(f"{data_path}finalFeatures.json") as f:
+        effort_vectors = json.load(f)
+    with open(f"{data_path}driversdata.json") as f:
+        driver_data = json.load(f)
+    with open(f"{data_path}clustered_stoppings.json") as f:
+        cluster_locations = cluster_centroids(json.load(f))
+    return effort_vectors, driver_data, cluster_locations
+
+
+def dispatch_depot(data_id: int, graph=None, explanations=None) -> Dict[str, Any]:
+    """
+    Preprocess one depot/day and run the supervisor graph on it.  The
+    result carries a "timings" breakdown of every stage, node, allocator
+    run and LLM / ORS call (see telemetry.py), and the dispatch_id under
+    which the briefing appears in `explanations` once written.
+    """
+    with collect() as trace, span("dispatch", kind="dispatch", data_id=data_id):
+        runPreprocessesMain(data_id)
+        effort_vectors, driver_data, cluster_locations = load_dispatch_inputs(data_id)
+        result = run_dispatch(effort_vectors, driver_data, graph=graph,
+                              cluster_locations=cluster_locations,
+                              explanations=explanations)
+    result["timings"] = trace.breakdown()
+    return result
+
+
+class _StreamClosed(Exception):
+    """The consumer of stream_depot went away."""
+
+
+def stream_depot(data_id: int, graph=None, explanations=None,
+                 cancelled: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+    """
+    dispatch_depot as a stream of progress events: one "stage" event per
+    preprocessing stage, then the supervisor graph's events (see
+    agents.supervisorGraph.stream_dispatch), then "result" (with timings).
+    The briefing follows as "explanation_token" events ({"text"}) and a
+    final "explanation" event ({"dispatch_id", "status", "explanation"}).
+    Failures end the stream with "error" ({"status": "not_found" | "error",
+    "detail"}).
+
+    The dispatch runs on its own thread and hands events over a queue, so
+    the consumer may iterate from any thread (e.g. a Starlette threadpool
+    that resumes the generator on a different worker each time).
+
+    Closing the generator — or setting `cancelled`, for a consumer that
+    cannot close it — stops the dispatch at its next event: the graph
+    stops after the running node, leaving its checkpoint for a retry,
+    and the briefing is still written to `explanations`, just not sent.
+    """
+    events: "queue.Queue[Dict[str, Any] | None]" = queue.Queue()
+    cancelled = cancelled or threading.Event()
+
+    def emit(event: Dict[str, Any]):
+        if cancelled.is_set():
+            raise _StreamClosed()
+        events.put(event)
+
+    if explanations is None:
+        explanations = get_runtime().explanations
+
+    def work():
+        try:
+            with collect() as trace, span("dispatch", kind="dispatch", data_id=data_id):
+                for name, seconds in iter_stages(data_id):
+                    emit({"event": "stage",
+                          "data": {"stage": name, "seconds": round(seconds, 4)}})
+                effort_vectors, driver_data, cluster_locations = load_dispatch_inputs(data_id)
+                with closing(stream_dispatch(effort_vectors, driver_data, graph=graph,
+                                             cluster_locations=cluster_locations,
+                                             explanations=explanations)) as progress:
+                    for event in progress:
+                        if event["event"] == "result":
+                            result = event["data"]
+                        else:
+                            emit(event)
+            result["timings"] = trace.breakdown()
+            emit({"event": "result", "data": result})
+
+            dispatch_id = result["dispatch_id"]
+            for text in explanations.stream(dispatch_id):
+                emit({"event": "explanation_token", "data": {"text": text}})
+            emit({"event": "explanation", "data": explanations.wait(dispatch_id)})
+        except _StreamClosed:
+            print(f"[Dispatch] stream for dataset {data_id} closed by the client → stopped")
+        except FileNotFoundError as e:
+            events.put({"event": "error",
+                        "data": {"status": "not_found", "detail": f"Data not found: {str(e)}"}})
+        except Exception as e:
+            events.put({"event": "error", "data": {"status": "error", "detail": str(e)}})
+        finally:
+            events.put(None)
+
+    threading.Thread(target=work, name=f"dispatch-stream-{data_id}", daemon=True).start()
+    try:
+        while (event := events.get()) is not None:
+            yield event
+    finally:
+        cancelled.set()
+
+
+def _dispatch_item(data_id: int, graph, explanations) -> Dict[str, Any]:
+    try:
+        with llm_priority("batch"):
+            result = dispatch_depot(data_id, graph, explanations)
+        return {"data_id": data_id, "status": "ok", "result": result}
+    except FileNotFoundError as e:
+        return {"data_id": data_id, "status": "not_found",
+                "detail": f"Data not found: {str(e)}"}
+    except Exception as e:
+        return {"data_id": data_id, "status": "error", "detail": str(e)}
+
+
+def run_batch(data_ids: Iterable[int],
+              max_workers: int = DEFAULT_MAX_WORKERS,
+              graph=None,
+              explanations=None) -> Iterator[Dict[str, Any]]:
+    """
+    Dispatch every id in `data_ids` across a thread pool.
+
+    One failing depot never aborts the batch — its item carries
+    status "not_found" / "error" instead of a result.
+    """
+    data_ids = list(dict.fromkeys(data_ids))
+    if not data_ids:
+        return
+
+    if graph is None:
+        graph = get_runtime().graph
+    if explanations is None:
+        explanations = get_runtime().explanations
+
+    workers = max(1, min(max_workers, len(data_ids)))
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix="dispatch") as pool:
+        futures = [pool.submit(_dispatch_item, data_id, graph, explanations)
+                   for data_id in data_ids]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+if __name__ == "__main__":
+    import sys
+    ids = [int(arg) for arg in sys.argv[1:]] or [1]
+    items = []
+    for item in run_batch(ids):
+        print(json.dumps(item, default=str))
+        items.append(item)
+    # Briefings finish after their dispatch; print them as they complete.
+    store = get_runtime().explanations
+    for item in items:
+        if item["status"] == "ok":
+            print(json.dumps(store.wait(item["result"]["dispatch_id"])))
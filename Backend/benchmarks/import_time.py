@@ -0,0 +1,92 @@
+"""
+benchmarks/import_time.py
+──────────────────────────
+Import-time audit for the service entry points.
+
+Runs `python -X importtime -c "import <target>"` in a fresh interpreter
+for each target and reports the cumulative import time plus the heaviest
+modules pulled in.
+
+Usage (from Backend/):
+    python benchmarks/import_time.py                 # default targets
+    python benchmarks/import_time.py main --top 15
+    python benchmarks/import_time.py --json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TARGETS = [
+    "main",                          # API process
+    "agents.optimized_allocation",   # allocation-only CLI
+    "runPreprocesses",               # preprocessing CLI (stages load lazily)
+]
+
+
+def parse_importtime(stderr):
+    """Returns [(module, self_us, cumulative_us)] in import order."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def audit(target, top=10):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {target} failed:\n{proc.stderr[-2000:]}")
+
+    rows  = parse_importtime(proc.stderr)
+    total = next((cum for mod, _, cum in rows if mod == target), 0)
+    roots = {}
+    for module, _, cumulative in rows:
+        root = module.split(".")[0]
+        roots[root] = max(roots.get(root, 0), cumulative)
+
+    heaviest = sorted(roots.items(), key=lambda kv: kv[1], reverse=True)
+    return {
+        "target":       target,
+        "total_ms":     round(total / 1000, 1),
+        "modules":      len(rows),
+        "heaviest_ms":  [
+            {"package": pkg, "cumulative_ms": round(us / 1000, 1)}
+            for pkg, us in heaviest if pkg != target.split(".")[0]
+        ][:top],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    reports = [audit(target, args.top) for target in args.targets]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+
+    for report in reports:
+        print(f"{report['target']}: {report['total_ms']} ms "
+              f"({report['modules']} modules)")
+        for entry in report["heaviest_ms"]:
+            print(f"    {entry['cumulative_ms']:>9.1f} ms  {entry['package']}")
+
+
+if __name__ == "__main__":
+    main()
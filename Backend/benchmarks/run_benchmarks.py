@@ -0,0 +1,307 @@
+"""
+benchmarks/run_benchmarks.py
+─────────────────────────────
+Pipeline and allocator benchmark suite.
+
+For each requested size a synthetic depot is generated
+(benchmarks/synthetic_depot.py), then every offline pipeline stage and
+every allocator variant is timed on it.  Each measurement records wall
+time, throughput, tracemalloc peak memory and — for allocators — the
+fairness of the result, so runs can be compared over time.
+
+Allocator variants:
+    baseline     dummy/driverAllocation.allocateDrivers (deepcopy per candidate)
+    exhaustive   allocateDrivers_optimized, calculate_penalty loop
+    shortlist    allocateDrivers_optimized(shortlist_k=8), the Python loop's
+                 pruned alternative to the kernel (not used by the graph)
+    kernel       allocateDrivers_optimized(use_kernel=True), numba or numpy
+    spatial      allocateDrivers_optimized with the driver/cluster spatial
+                 index and nearest_k=8, index build included
+
+Speculation: core_allocator with and without the speculative allocation
+(agents/allocationSubgraph.py) for the default weights, the weight
+sweep's pick, and the sweep's pick plus soft constraints.
+
+Usage (from Backend/):
+    python benchmarks/run_benchmarks.py                        # default sizes
+    python benchmarks/run_benchmarks.py --sizes 300x50 5000x500 --repeat 3
+    python benchmarks/run_benchmarks.py --output bench.json
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic_depot import generate_depot, write_routes  # noqa: E402
+
+DEFAULT_SIZES = ["300x50", "2000x200", "10000x1000"]
+
+# Stop/driver counts above which a stage or variant is skipped: the
+# capacity-constrained assignment in prePreocess.cluster is O(n²) memory,
+# and the two reference allocators are O(C·D²) / O(C·D) Python loops.
+CLUSTER_MAX_STOPS     = 5_000
+BASELINE_MAX_WORK     = 50 * 60 * 20      # clusters × drivers × drivers
+EXHAUSTIVE_MAX_WORK   = 10_000            # clusters × drivers
+
+
+def parse_size(size):
+    stops, drivers = size.lower().split("x")
+    return int(stops), int(drivers)
+
+
+@contextlib.contextmanager
+def _quiet():
+    # The pipeline and allocators print per-step progress.
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def measure(fn, repeat=1):
+    """Best-of-`repeat` wall time and the peak traced allocation."""
+    best, peak, result = float("inf"), 0, None
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        with _quiet():
+            result = fn()
+        elapsed = time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = min(best, elapsed)
+    return result, {"seconds": round(best, 4), "peak_mb": round(peak / 2**20, 2)}
+
+
+# ─── Pipeline stages ─────────────────────────────────────────────────────────
+
+def bench_pipeline(path, n_stops, repeat):
+    from prePreocess import finalFeatures, packageFeatures, routeFeatures
+
+    results = {}
+    if n_stops <= CLUSTER_MAX_STOPS:
+        from prePreocess import cluster
+        _, results["cluster"] = measure(lambda: cluster.main(path), repeat)
+        # Re-clustering renames clusters; keep the synthetic routes in step.
+        with open(os.path.join(path, "clustered_stoppings.json")) as f:
+            clustered = json.load(f)
+        for name in os.listdir(path):
+            if name.startswith("routes_Cluster "):
+                os.remove(os.path.join(path, name))
+        write_routes(path, clustered)
+    else:
+        results["cluster"] = {"skipped": f"more than {CLUSTER_MAX_STOPS} stops"}
+
+    for name, module in (("routeFeatures",   routeFeatures),
+                         ("packageFeatures", packageFeatures),
+                         ("finalFeatures",   finalFeatures)):
+        _, results[name] = measure(lambda: module.main(path), repeat)
+        results[name]["stops_per_s"] = round(n_stops / max(results[name]["seconds"], 1e-9))
+    return results
+
+
+# ─── Allocators ──────────────────────────────────────────────────────────────
+
+def fairness(allocation, effort_vectors, driver_count):
+    from agents.allocationSubgraph import _driver_workloads, _equity_score
+
+    totals = _driver_workloads(allocation, effort_vectors)
+    loads  = list(totals.values())
+    return {
+        "equity_score": round(_equity_score(totals), 4),
+        "unassigned":   len(effort_vectors) - len(allocation),
+        "drivers_used": f"{len(totals)}/{driver_count}",
+        "max_load":     round(max(loads), 3) if loads else 0.0,
+        "min_load":     round(min(loads), 3) if loads else 0.0,
+    }
+
+
+def allocator_variants(cluster_locations=None):
+    from agents.allocationKernel import kernel_backend
+    from agents.optimized_allocation import allocateDrivers_optimized
+    from agents.spatialIndex import spatial_index_for
+    from dummy.driverAllocation import allocateDrivers
+
+    def spatial(ev, dd):
+        index = spatial_index_for(dd, ev, cluster_locations)
+        return allocateDrivers_optimized(ev, dd, spatial_index=index, nearest_k=8)
+
+    return [
+        ("baseline",   BASELINE_MAX_WORK,   lambda c, d: c * d * d, allocateDrivers),
+        ("exhaustive", EXHAUSTIVE_MAX_WORK, lambda c, d: c * d,     allocateDrivers_optimized),
+        ("shortlist",  None, None,
+         lambda ev, dd: allocateDrivers_optimized(ev, dd, shortlist_k=8)),
+        (f"kernel_{kernel_backend()}", None, None,
+         lambda ev, dd: allocateDrivers_optimized(ev, dd, use_kernel=True)),
+        ("spatial",    None, None, spatial),
+    ]
+
+
+def bench_allocators(path, repeat):
+    from agents.spatialIndex import cluster_centroids
+
+    with open(os.path.join(path, "finalFeatures.json")) as f:
+        effort_vectors = json.load(f)
+    with open(os.path.join(path, "driversdata.json")) as f:
+        driver_data = json.load(f)
+    with open(os.path.join(path, "clustered_stoppings.json")) as f:
+        cluster_locations = cluster_centroids(json.load(f))
+    n_clusters, n_drivers = len(effort_vectors), len(driver_data)
+
+    results = {}
+    for name, max_work, work, allocate in allocator_variants(cluster_locations):
+        if max_work is not None and work(n_clusters, n_drivers) > max_work:
+            results[name] = {"skipped": "too slow at this size"}
+            continue
+        if name.startswith("kernel"):
+            # Exclude one-time JIT compilation from the timing.
+            with _quiet():
+                allocate(effort_vectors, copy.deepcopy(driver_data))
+
+        allocation, stats = measure(
+            lambda: allocate(effort_vectors, copy.deepcopy(driver_data)), repeat)
+        stats["clusters_per_s"] = round(n_clusters / max(stats["seconds"], 1e-9))
+        stats["fairness"] = fairness(allocation, effort_vectors, n_drivers)
+        results[name] = stats
+    return results
+
+
+# ─── Speculative allocation ──────────────────────────────────────────────────
+
+def speculation_scenarios(effort_vectors, driver_data):
+    """(name, tuned_weights, soft_constraints) as the context phase emits them."""
+    from agents.weightSweep import sweep_weights
+
+    with _quiet():
+        front = sweep_weights(effort_vectors, driver_data)["front"]
+    swept    = front[0]["weights"] if front else None
+    clusters = list(effort_vectors)
+    drivers  = list(driver_data)
+    rules = [{"type": "avoid",     "driver": drivers[i % len(drivers)], "cluster": clusters[i]}
+             for i in range(0, len(clusters), max(1, len(clusters) // 4))]
+    rules.append({"type": "cap_heavy", "driver": drivers[0], "max_consecutive": 0})
+    return [
+        ("defaults",    None,  []),
+        ("sweep",       swept, []),
+        ("sweep_rules", swept, rules),
+    ]
+
+
+def bench_speculation(path, repeat):
+    """
+    core_allocator's critical-path time with and without a speculative
+    allocation waiting (its own cost is off the path and not timed), and
+    the path it took: reused, repaired or full.
+    """
+    from agents.allocationSubgraph import core_allocator_node, speculative_allocation
+    from agents.dispatchStore import open_inputs, resolve
+    from agents.spatialIndex import cluster_centroids
+    from telemetry import span
+
+    with open(os.path.join(path, "finalFeatures.json")) as f:
+        effort_vectors = json.load(f)
+    with open(os.path.join(path, "driversdata.json")) as f:
+        driver_data = json.load(f)
+    with open(os.path.join(path, "clustered_stoppings.json")) as f:
+        cluster_locations = cluster_centroids(json.load(f))
+
+    results = {}
+    with open_inputs(f"bench-{os.path.basename(path)}", effort_vectors,
+                     driver_data, cluster_locations) as handle:
+        inputs = resolve(handle)
+        with _quiet():
+            speculative = speculative_allocation(effort_vectors, driver_data, cluster_locations)
+            core_allocator_node({"inputs": handle})          # JIT warm-up
+
+        for name, weights, rules in speculation_scenarios(effort_vectors, driver_data):
+            state = {"inputs": handle, "tuned_weights": weights, "soft_constraints": rules}
+            timings = {}
+            for mode in ("no_speculation", "speculation"):
+                best = float("inf")
+                for _ in range(repeat):
+                    if mode == "speculation":
+                        inputs.derived["speculative"] = copy.deepcopy(speculative)
+                    with _quiet(), span("core_allocator", kind="node") as node:
+                        start = time.perf_counter()
+                        core_allocator_node(state)
+                        best = min(best, time.perf_counter() - start)
+                timings[f"{mode}_s"] = round(best, 4)
+            timings["path"] = node.attributes.get("speculative")
+            results[name] = timings
+    return results
+
+
+# ─── Runner ──────────────────────────────────────────────────────────────────
+
+def run_size(size, repeat, seed):
+    n_stops, n_drivers = parse_size(size)
+    path = tempfile.mkdtemp(prefix=f"bench_{size}_")
+    try:
+        start = time.perf_counter()
+        depot = generate_depot(path, n_stops, n_drivers, seed)
+        depot["generate_seconds"] = round(time.perf_counter() - start, 3)
+
+        pipeline = bench_pipeline(path, n_stops, repeat)
+        with open(os.path.join(path, "finalFeatures.json")) as f:
+            depot["clusters"] = len(json.load(f))
+        return {
+            "size":       size,
+            "depot":      depot,
+            "pipeline":   pipeline,
+            "allocators": bench_allocators(path, repeat),
+            "speculation": bench_speculation(path, repeat),
+        }
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def metadata(repeat, seed):
+    import numpy as np
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python":    platform.python_version(),
+        "numpy":     np.__version__,
+        "platform":  platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat":    repeat,
+        "seed":      seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES,
+                        help="STOPSxDRIVERS, e.g. 100000x10000")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    # Stages and allocators resolve data paths relative to Backend/.
+    os.chdir(BACKEND_DIR)
+    report = {"metadata": metadata(args.repeat, args.seed), "runs": []}
+    for size in args.sizes:
+        print(f"[Benchmark] {size} ...", file=sys.stderr)
+        report["runs"].append(run_size(size, args.repeat, args.seed))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+benchmarks/synthetic_depot.py
+──────────────────────────────
+Parametric synthetic depot generator for benchmarks.
+
+Writes the same files the pipeline reads for one depot/day —
+stoppingandpackage.json, driversdata.json, clustered_stoppings.json and
+one ORS-shaped routes_Cluster N.json per cluster — so every stage after
+getRoute can run offline.  Generation is vectorised with a seeded NumPy
+Generator and scales to 100k stops / 10k drivers.
+
+Usage (from Backend/):
+    python benchmarks/synthetic_depot.py out/dir --stops 5000 --drivers 500
+"""
+
+import json
+import os
+
+import numpy as np
+
+BASE_LNG, BASE_LAT = 78.16, 11.68        # Salem, as in generate_complex_data
+STOPS_PER_CLUSTER  = 50                  # prePreocess.cluster.MAX_CLUSTER_SIZE
+FLOORS             = np.array([0, 1, 2, 3, 4, 5, 8, 10, 15, 20, 25])
+DEPOT              = [78.17611956533857, 11.683720337350456]
+SPEED_MPS          = 8.33                # ~30 km/h urban
+SERVICE_S          = 60.0                # per stop
+
+
+def _spread_deg(n_stops):
+    # Keep stop density roughly constant as depots grow (8 km at 300 stops).
+    return 0.08 * max(1.0, np.sqrt(n_stops / 300))
+
+
+def generate_stops(rng, n_stops, max_packages=10):
+    n_clusters = max(1, -(-n_stops // STOPS_PER_CLUSTER))
+    spread     = _spread_deg(n_stops)
+    hotspots   = np.column_stack([
+        BASE_LNG + rng.uniform(-spread / 2, spread / 2, n_clusters),
+        BASE_LAT + rng.uniform(-spread / 2, spread / 2, n_clusters),
+    ])
+    hotspot    = rng.integers(0, n_clusters, n_stops)
+    locations  = hotspots[hotspot] + rng.normal(0, 0.01, (n_stops, 2))
+
+    n_pkgs = rng.integers(1, max_packages + 1, n_stops)
+    total  = int(n_pkgs.sum())
+    floors   = rng.choice(FLOORS, total)
+    elevator = (rng.random(total) < 0.5) | ((floors > 5) & (rng.random(total) > 0.2))
+    dims     = np.column_stack([
+        rng.integers(5, 101, total),    # height_cm
+        rng.integers(10, 101, total),   # length_cm
+        rng.integers(5, 81, total),     # breadth_cm
+    ])
+    weights  = np.round(rng.uniform(0.5, 40.0, total), 2)
+
+    stops, p = [], 0
+    for i in range(n_stops):
+        stop_id  = f"STOP_{i + 1:06d}"
+        packages = []
+        for j in range(n_pkgs[i]):
+            packages.append({
+                "package_id":   f"PKG_{stop_id}_{j}",
+                "floor":        int(floors[p]),
+                "height_cm":    int(dims[p, 0]),
+                "length_cm":    int(dims[p, 1]),
+                "breadth_cm":   int(dims[p, 2]),
+                "weight_kg":    float(weights[p]),
+                "has_elevator": bool(elevator[p]),
+            })
+            p += 1
+        stops.append({
+            "stop_id":  stop_id,
+            "location": locations[i].tolist(),
+            "packages": packages,
+        })
+    return stops, hotspot
+
+
+def generate_drivers(rng, n_drivers, spread=0.08):
+    def draw(lo, hi):
+        return rng.uniform(lo, hi, n_drivers)
+
+    recent = {
+        "physical_load":  {"total_weight": draw(50, 350), "heavy_pkg_ratio": draw(0.05, 0.5),
+                           "bulky_ratio": draw(0.05, 0.4)},
+        "stair_load":     {"stair_load_index": draw(10, 100), "avg_floor": draw(1, 10),
+                           "elevator_coverage": draw(0.1, 0.95)},
+        "traffic_stress": {"traffic_index": draw(1, 6), "parking_stress": draw(0.002, 0.08),
+                           "stop_density": draw(0.001, 0.02)},
+        "route_distance": {"total_distance": draw(1500, 15000), "total_duration": draw(300, 720)},
+    }
+    drift      = rng.uniform(0.8, 1.2, (n_drivers, 11))
+    cognitive  = draw(0.002, 0.02)
+    heavy_days = rng.integers(0, 5, n_drivers)
+    # Start points over the stop area; drawn last so the effort draws
+    # above match depots generated before drivers had locations.
+    locations  = np.column_stack([
+        BASE_LNG + rng.uniform(-spread / 2, spread / 2, n_drivers),
+        BASE_LAT + rng.uniform(-spread / 2, spread / 2, n_drivers),
+    ])
+
+    drivers = {}
+    for d in range(n_drivers):
+        cumulative, last3, col = {}, {}, 0
+        for dim, features in recent.items():
+            cumulative[dim], last3[dim] = {}, {}
+            for feature, values in features.items():
+                last3[dim][feature]      = float(values[d])
+                cumulative[dim][feature] = float(values[d] * drift[d, col])
+                col += 1
+        cumulative["cognitive_density"] = last3["cognitive_density"] = float(cognitive[d])
+        drivers[f"D{d + 1}"] = {
+            "cumulative_effort_vector": cumulative,
+            "last_3_days_vector":       last3,
+            "consecutive_heavy_days":   int(heavy_days[d]),
+            "location":                 locations[d].tolist(),
+        }
+    return drivers
+
+
+def cluster_by_hotspot(stops, hotspot):
+    """Hotspot order chunked into STOPS_PER_CLUSTER — a cheap stand-in for
+    prePreocess.cluster when that stage is skipped at large sizes."""
+    order = np.argsort(hotspot, kind="stable")
+    clustered = {}
+    for c, start in enumerate(range(0, len(order), STOPS_PER_CLUSTER)):
+        chunk = order[start:start + STOPS_PER_CLUSTER]
+        clustered[f"Cluster {c}"] = {
+            stops[i]["stop_id"]: stops[i]["location"] for i in chunk
+        }
+    return clustered
+
+
+def synthetic_route(stops):
+    """ORS optimisation response shape consumed by routeFeatures."""
+    coords   = np.asarray(list(stops.values()), dtype=float)
+    centre   = coords.mean(axis=0)
+    order    = np.argsort(np.arctan2(coords[:, 1] - centre[1], coords[:, 0] - centre[0]))
+    path     = np.vstack([DEPOT, coords[order], DEPOT])
+    metres   = np.radians(np.diff(path, axis=0)) * 6371000.0
+    metres[:, 0] *= np.cos(np.radians(BASE_LAT))
+    distance = float(np.sum(np.hypot(metres[:, 0], metres[:, 1])))
+    duration = distance / SPEED_MPS + SERVICE_S * len(coords)
+
+    steps = [{"type": "start", "location": DEPOT}]
+    steps += [{"type": "job", "location": coords[i].tolist()} for i in order]
+    steps.append({"type": "end", "location": DEPOT})
+    return {
+        "summary": {"duration": duration, "distance": distance},
+        "routes":  [{"steps": steps, "duration": duration, "distance": distance}],
+    }
+
+
+def write_routes(out_dir, clustered):
+    for cluster_name, stops in clustered.items():
+        with open(os.path.join(out_dir, f"routes_{cluster_name}.json"), "w") as f:
+            json.dump(synthetic_route(stops), f)
+
+
+def generate_depot(out_dir, n_stops, n_drivers, seed=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    stops, hotspot = generate_stops(rng, n_stops)
+    drivers        = generate_drivers(rng, n_drivers, _spread_deg(n_stops))
+    clustered      = cluster_by_hotspot(stops, hotspot)
+
+    with open(os.path.join(out_dir, "stoppingandpackage.json"), "w") as f:
+        json.dump(stops, f)
+    with open(os.path.join(out_dir, "driversdata.json"), "w") as f:
+        json.dump(drivers, f)
+    with open(os.path.join(out_dir, "clustered_stoppings.json"), "w") as f:
+        json.dump(clustered, f)
+    write_routes(out_dir, clustered)
+
+    return {"stops": n_stops, "drivers": n_drivers, "clusters": len(clustered)}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic depot.")
+    parser.add_argument("output")
+    parser.add_argument("--stops", type=int, default=300)
+    parser.add_argument("--drivers", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(generate_depot(args.output, args.stops, args.drivers, args.seed))
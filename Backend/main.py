@@ -1,29 +1,216 @@
-from fastapi import FastAPI, HTTPException
-from runPreprocesses import main as runPreprocessesMain
-from agents.supervisorGraph import run_dispatch
+from contextlib import asynccontextmanager
+from pathlib import Path
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import iterate_in_threadpool
+from typing import List, Optional
+from batchDispatch import dispatch_depot, run_batch, stream_depot, DEFAULT_MAX_WORKERS
+from runPreprocesses import DATA_DIR_TEMPLATE
+from agents.dispatchRuntime import get_runtime
+import metrics
 import uvicorn
 import json
+import os
+import threading
+import time
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile the graphs + LLM client once, before the first request.
+    app.state.runtime = get_runtime()
+    app.state.runtime.warm_up()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+metrics.install()
+
+# The frontend's dev server (Vite) calls the API from another origin.
+FRONTEND_ORIGINS = os.getenv("FRONTEND_ORIGINS", "http://localhost:5173").split(",")
+app.add_middleware(CORSMiddleware, allow_origins=FRONTEND_ORIGINS,
+                   allow_methods=["*"], allow_headers=["*"])
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start  = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status   = response.status_code
+        return response
+    finally:
+        # Route template, not the raw path, keeps label cardinality bounded.
+        route = request.scope.get("route")
+        metrics.observe_request(request.method,
+                                getattr(route, "path", "unmatched"),
+                                status, time.perf_counter() - start)
+
+
+class BatchDispatchRequest(BaseModel):
+    data_ids:    List[int] = Field(..., min_length=1)
+    max_workers: int       = Field(DEFAULT_MAX_WORKERS, ge=1, le=64)
+
+
+class ModelConfigRequest(BaseModel):
+    model:       Optional[str]   = None
+    temperature: Optional[float] = None
+
+
+@app.post("/runtime/warmup")
+def warmup(request: Request, ping_llm: bool = False, preload_stages: bool = False):
+    try:
+        return request.app.state.runtime.warm_up(ping_llm=ping_llm,
+                                                 preload_stages=preload_stages)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@app.get("/metrics")
+def scrape_metrics():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/runtime")
+def runtime_status(request: Request):
+    return request.app.state.runtime.status()
+
+
+@app.put("/runtime/model")
+def configure_model(request: Request, config: ModelConfigRequest):
+    changes = config.model_dump(exclude_none=True)
+    if not changes:
+        raise HTTPException(status_code=422, detail="No model settings given")
+    try:
+        request.app.state.runtime.configure(**changes)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return request.app.state.runtime.status()
+
+
+# Declared before /dispatch/{data_id} so "batch" is not parsed as an id.
+@app.post("/dispatch/batch")
+def dispatch_batch(request: Request, body: BatchDispatchRequest):
+    """Streams one NDJSON line per depot as soon as it finishes."""
+    runtime = request.app.state.runtime
+
+    def lines():
+        for item in run_batch(body.data_ids, body.max_workers, graph=runtime.graph,
+                              explanations=runtime.explanations):
+            yield json.dumps(item, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
-app = FastAPI()
 
 @app.post("/dispatch/{data_id}")
-async def dispatch(data_id: int):
+def dispatch(request: Request, data_id: int):
     try:
-        runPreprocessesMain(data_id)
-        
-        data_path = f"data/jsonFiles{data_id}/"
-        with open(f"{data_path}finalFeatures.json") as f:
-            effort_vectors = json.load(f)
-        with open(f"{data_path}driversdata.json") as f:
-            driver_data = json.load(f)
-        
-        result = run_dispatch(effort_vectors, driver_data)
+        runtime = request.app.state.runtime
+        result  = dispatch_depot(data_id, graph=runtime.graph,
+                                 explanations=runtime.explanations)
         return result
-        
+
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=f"Data not found: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/dispatch/{data_id}/stream")
+def dispatch_stream(request: Request, data_id: int):
+    """
+    Server-Sent Events: stage / node / allocation / fairness / critique
+    events as the dispatch progresses, then one result (or error) event.
+    The first allocation event (preview=true) arrives before any of the
+    post-allocation LLM calls; the briefing streams after the result.
+    POST, like /dispatch/{data_id}: opening the stream runs the dispatch.
+    A client that disconnects stops it.
+    """
+    runtime   = request.app.state.runtime
+    cancelled = threading.Event()
+
+    async def events():
+        try:
+            async for item in iterate_in_threadpool(
+                    stream_depot(data_id, graph=runtime.graph,
+                                 explanations=runtime.explanations, cancelled=cancelled)):
+                if await request.is_disconnected():
+                    break
+                yield f"event: {item['event']}\ndata: {json.dumps(item['data'], default=str)}\n\n"
+        finally:
+            cancelled.set()
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache",
+                                      "X-Accel-Buffering": "no"})
+
+@app.get("/explanations/{dispatch_id}")
+def get_explanation(request: Request, dispatch_id: str, wait: float = Query(0, ge=0, le=120)):
+    """Briefing for a dispatch; `wait` long-polls up to that many seconds."""
+    store = request.app.state.runtime.explanations
+    entry = store.wait(dispatch_id, wait) if wait else store.get(dispatch_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown dispatch id {dispatch_id}")
+    return entry
+
+
+@app.get("/explanations/{dispatch_id}/stream")
+def stream_explanation(request: Request, dispatch_id: str):
+    """Server-Sent Events: "token" events as the briefing is written, then "done"."""
+    store = request.app.state.runtime.explanations
+    if store.get(dispatch_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown dispatch id {dispatch_id}")
+
+    def events():
+        for text in store.stream(dispatch_id):
+            yield f"event: token\ndata: {json.dumps({'text': text})}\n\n"
+        yield f"event: done\ndata: {json.dumps(store.wait(dispatch_id))}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache",
+                                      "X-Accel-Buffering": "no"})
+
+
+def _render_plot(data_path: str, max_points: int):
+    from prePreocess.cluster import render_cluster_plot
+    try:
+        clustered = Path(data_path) / "clustered_stoppings.json"
+        rendered_from = clustered.stat().st_mtime
+        render_cluster_plot(data_path, max_points)
+        # Stamp the plot with the clustering it was drawn from, so a
+        # re-clustering that lands mid-render still reads as stale.
+        os.utime(Path(data_path) / "cluster_plot.png", (rendered_from, rendered_from))
+    except Exception as e:
+        print(f"[Plot] rendering failed for {data_path}: {e}")
+
+
+@app.post("/dispatch/{data_id}/plot", status_code=202)
+def request_cluster_plot(data_id: int, background_tasks: BackgroundTasks,
+                         max_points: int = 5000):
+    """Renders cluster_plot.png after the response is sent."""
+    data_path = DATA_DIR_TEMPLATE.format(data_id)
+    if not Path(f"{data_path}clustered_stoppings.json").exists():
+        raise HTTPException(status_code=404,
+                            detail=f"No clustered stoppings for dataset {data_id}")
+    background_tasks.add_task(_render_plot, data_path, max_points)
+    return {"status": "scheduled", "url": f"/dispatch/{data_id}/plot"}
+
+
+@app.get("/dispatch/{data_id}/plot")
+def get_cluster_plot(data_id: int):
+    """404 until POST has rendered the plot for the current clustering."""
+    data_path    = Path(DATA_DIR_TEMPLATE.format(data_id))
+    plot_path    = data_path / "cluster_plot.png"
+    cluster_path = data_path / "clustered_stoppings.json"
+    if not plot_path.exists():
+        raise HTTPException(status_code=404, detail="Plot not rendered yet")
+    # A plot older than the clustering it shows is stale (re-clustered since).
+    if cluster_path.exists() and plot_path.stat().st_mtime < cluster_path.stat().st_mtime:
+        raise HTTPException(status_code=404,
+                            detail="Plot is out of date; POST to re-render it")
+    return FileResponse(plot_path, media_type="image/png")
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
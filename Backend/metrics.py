@@ -0,0 +1,316 @@
+"""
+metrics.py
+──────────
+Prometheus metrics for the dispatch service, rendered in the text
+exposition format (0.0.4) by GET /metrics.
+
+Public API:
+    import metrics
+
+    metrics.install()              # feed telemetry spans into the metrics
+    metrics.observe_request("POST", "/dispatch/{data_id}", 200, 1.25)
+    metrics.render()               # exposition text for a scrape
+
+Most series come from telemetry spans (see telemetry.py), so the
+pipeline code carries no metric calls of its own:
+
+    dispatch_stage_duration_seconds{stage}            preprocessing stages
+    dispatch_node_duration_seconds{node}              LangGraph nodes
+    dispatch_allocator_duration_seconds{backend,fleet}
+    dispatch_llm_calls_total{node,status}, dispatch_llm_duration_seconds{node},
+    dispatch_llm_tokens_total{node,type}
+    dispatch_ors_requests_total{cache,status}, dispatch_ors_duration_seconds{cache}
+    dispatch_reallocations_total                      _should_reallocate retries
+    dispatch_active_jobs                              dispatches in flight
+    dispatch_route_cache_hit_ratio                    read at scrape time
+    dispatch_llm_gateway_in_flight / _waiting         read at scrape time
+
+Each observation is one dict lookup and a few additions under a
+per-metric lock; nothing is formatted until a scrape.
+"""
+
+import bisect
+import math
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+FLEET_BUCKETS   = (50, 200, 1000, 5000)
+
+
+# ─── Metric types ─────────────────────────────────────────────────────────────
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name          = name
+        self.documentation = documentation
+        self.labelnames    = tuple(labelnames)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}",
+                f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        if not self.labelnames:
+            self._values[()] = 0.0
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name}_total {self.documentation}",
+                f"# TYPE {self.name}_total {self.kind}"]
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(v)}"
+                for key, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(),
+                 callback: Optional[Callable[[], Optional[float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self._callback = callback
+        if not self.labelnames:
+            self._values[()] = 0.0
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def samples(self) -> List[str]:
+        if self._callback is not None:
+            value = self._callback()
+            return [] if value is None else [f"{self.name} {_format_value(value)}"]
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+                for key, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (+Inf last), sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][idx] += 1
+            state[1]      += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.header())
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# ─── Service metrics ──────────────────────────────────────────────────────────
+
+def _route_cache_hit_ratio() -> Optional[float]:
+    # Only once the getRoute stage has been loaded; never import it here.
+    get_route = sys.modules.get("prePreocess.getRoute")
+    if get_route is None:
+        return None
+    cache = get_route.ROUTE_CACHE
+    lookups = cache.hits + cache.misses
+    return cache.hits / lookups if lookups else 0.0
+
+
+def _llm_gateway_stat(key: str) -> Callable[[], Optional[float]]:
+    def read() -> Optional[float]:
+        gateway = sys.modules.get("agents.llmGateway")
+        if gateway is None or gateway._GATEWAY is None:
+            return None
+        return float(gateway._GATEWAY.stats()[key])
+    return read
+
+
+REQUEST_LATENCY = Histogram(
+    "dispatch_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"))
+STAGE_DURATION = Histogram(
+    "dispatch_stage_duration_seconds",
+    "Preprocessing stage duration.", ("stage",))
+NODE_DURATION = Histogram(
+    "dispatch_node_duration_seconds",
+    "LangGraph node duration.", ("node",))
+ALLOCATOR_DURATION = Histogram(
+    "dispatch_allocator_duration_seconds",
+    "allocateDrivers_optimized runtime by backend and fleet size.",
+    ("backend", "fleet"))
+LLM_CALLS = Counter(
+    "dispatch_llm_calls",
+    "LLM calls by calling node.", ("node", "status"))
+LLM_LATENCY = Histogram(
+    "dispatch_llm_duration_seconds",
+    "LLM call latency by calling node.", ("node",))
+LLM_TOKENS = Counter(
+    "dispatch_llm_tokens",
+    "LLM tokens by calling node.", ("node", "type"))
+ORS_REQUESTS = Counter(
+    "dispatch_ors_requests",
+    "ORS optimisation requests by route-cache result.", ("cache", "status"))
+ORS_LATENCY = Histogram(
+    "dispatch_ors_duration_seconds",
+    "ORS optimisation latency, including cache lookups.", ("cache",))
+DEGRADED_NODES = Counter(
+    "dispatch_degraded_nodes",
+    "Nodes that fell back after running out of time budget.", ("node",))
+REALLOCATIONS = Counter(
+    "dispatch_reallocations",
+    "Reallocation retries triggered by the critique.")
+ACTIVE_JOBS = Gauge(
+    "dispatch_active_jobs",
+    "Dispatches currently in flight.")
+ROUTE_CACHE_HIT_RATIO = Gauge(
+    "dispatch_route_cache_hit_ratio",
+    "Hit ratio of the process-wide ORS route cache.",
+    callback=_route_cache_hit_ratio)
+LLM_GATEWAY_IN_FLIGHT = Gauge(
+    "dispatch_llm_gateway_in_flight",
+    "LLM calls currently holding a gateway slot.",
+    callback=_llm_gateway_stat("in_flight"))
+LLM_GATEWAY_WAITING = Gauge(
+    "dispatch_llm_gateway_waiting",
+    "LLM calls queued for a gateway slot.",
+    callback=_llm_gateway_stat("waiting"))
+
+
+def fleet_bucket(drivers: int) -> str:
+    for bound in FLEET_BUCKETS:
+        if drivers <= bound:
+            return f"le_{bound}"
+    return f"gt_{FLEET_BUCKETS[-1]}"
+
+
+def observe_request(method: str, route: str, status: int, seconds: float):
+    REQUEST_LATENCY.observe(seconds, method=method, route=route, status=status)
+
+
+class MetricsExporter:
+    """telemetry exporter that turns finished spans into metric samples."""
+
+    def on_start(self, span):
+        if span.kind == "dispatch":
+            ACTIVE_JOBS.inc()
+
+    def on_end(self, span):
+        seconds = span.duration_ms / 1000.0
+        attrs   = span.attributes
+
+        if span.kind == "dispatch":
+            ACTIVE_JOBS.dec()
+        elif span.kind == "stage":
+            STAGE_DURATION.observe(seconds, stage=span.name)
+        elif span.kind == "node":
+            NODE_DURATION.observe(seconds, node=span.name)
+            if attrs.get("degraded"):
+                DEGRADED_NODES.inc(node=span.name)
+            if span.name == "reallocator":
+                REALLOCATIONS.inc()
+        elif span.kind == "allocator":
+            ALLOCATOR_DURATION.observe(seconds, backend=attrs.get("backend", "python"),
+                                       fleet=fleet_bucket(attrs.get("drivers", 0)))
+        elif span.kind == "llm":
+            node = attrs.get("node", "direct")
+            LLM_CALLS.inc(node=node, status=span.status)
+            LLM_LATENCY.observe(seconds, node=node)
+            LLM_TOKENS.inc(attrs.get("input_tokens", 0),  node=node, type="input")
+            LLM_TOKENS.inc(attrs.get("output_tokens", 0), node=node, type="output")
+        elif span.kind == "ors":
+            cache = attrs.get("cache", "off")
+            ORS_REQUESTS.inc(cache=cache, status=span.status)
+            ORS_LATENCY.observe(seconds, cache=cache)
+
+
+_INSTALLED = False
+_INSTALL_LOCK = threading.Lock()
+
+
+def install():
+    """Registers the span → metrics exporter once per process."""
+    global _INSTALLED
+    from telemetry import add_exporter
+
+    with _INSTALL_LOCK:
+        if not _INSTALLED:
+            add_exporter(MetricsExporter())
+            _INSTALLED = True
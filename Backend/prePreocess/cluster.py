@@ -1,95 +1,245 @@
-import json
-import pickle as pkl
-from tracemalloc import stop
-import requests as req
-import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from scipy.spatial import distance_matrix
-from scipy.optimize import linear_sum_assignment
-
-def fit_and_save_scaler(data, path):
-    scaler = StandardScaler()
-    scaled = scaler.fit_transform(data)
-    with open(path, "wb") as f:
-        pkl.dump(scaler, f)
-    return scaled
-
-
-def load_scaler(path):
-    with open(path, "rb") as f:
-        return pkl.load(f)
-
-
-def normalize_stoppings(stoppings, scaler):
-    return scaler.transform(stoppings)
-
-
-def denormalize_stoppings(stoppings, scaler):
-    return scaler.inverse_transform(stoppings)
-
-
-def cluster_stoppings(normalized_stoppings, max_size=50):
-    n_points = len(normalized_stoppings)
-    n_clusters = (n_points + max_size - 1) // max_size
-    
-    if n_clusters == 0:
-        return np.array([])
-        
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init='auto')
-    kmeans.fit(normalized_stoppings)
-    centers = kmeans.cluster_centers_
-    
-    dist = distance_matrix(normalized_stoppings, centers)
-    cost_matrix = np.repeat(dist, max_size, axis=1)
-    
-    row_ind, col_ind = linear_sum_assignment(cost_matrix)
-    labels = col_ind // max_size
-    
-    return labels[np.argsort(row_ind)]
-
-def plot_clusters(data, labels , path):
-    plt.figure(figsize=(6,6))
-    unique_labels = np.unique(labels)
-    for label in unique_labels:
-        mask = labels == label
-        plt.scatter(data[mask, 0], data[mask, 1], label=f"Cluster {label}")
-    plt.title("DBSCAN Clustering of Stoppings")
-    plt.xlabel("Feature 1")
-    plt.ylabel("Feature 2")
-    plt.legend()
-    plt.savefig(f"{path}/cluster_plot.png")
-
-
-def main(path):
-    with open(f"{path}/stoppingandpackage.json") as f:
-        data = json.load(f)
-    stop_location_dict = {
-        stop["stop_id"]: stop["location"]
-        for stop in data
-    }
-    stoppings = list(stop_location_dict.values())
-    stoppings = np.array(stoppings, dtype=float)
-
-    scaler_path = f"{path}/stopping_scaler.pkl"
-    normalized_stoppings = fit_and_save_scaler(stoppings, scaler_path)
-    scaler = load_scaler(scaler_path)
-
-    labels = cluster_stoppings(normalized_stoppings)
-
-    clustered_stoppings = {}
-    stop_ids = list(stop_location_dict.keys())
-    for label in np.unique(labels):
-        mask = labels == label
-        cluster_stops = {}
-        masked_stop_ids = [stop_ids[i] for i in range(len(stop_ids)) if mask[i]]
-        denormalized_coords = denormalize_stoppings(normalized_stoppings[mask], scaler).tolist()
-        for stop_id, coords in zip(masked_stop_ids, denormalized_coords):
-            cluster_stops[stop_id] = coords
-        clustered_stoppings[f"Cluster {label}"] = cluster_stops
-    
-    plot_clusters(normalized_stoppings, labels , path)
-
-    with open(f"{path}/clustered_stoppings.json", "w") as f:
-        json.dump(clustered_stoppings, f, indent=1)
+import json
+import os
+import numpy as np
+
+# scikit-learn, scipy and matplotlib are imported inside the functions that
+# use them so importing this module (e.g. from the API) stays cheap.
+
+EARTH_RADIUS_M = 6371000.0
+MAX_CLUSTER_SIZE = 50       # stops per cluster (one route)
+
+
+def standardize_stoppings(stoppings):
+    """In-memory z-scoring (what StandardScaler did, without the pickle)."""
+    mean = stoppings.mean(axis=0)
+    std = stoppings.std(axis=0)
+    std[std == 0] = 1.0
+    return (stoppings - mean) / std
+
+
+def project_to_local_metres(stoppings, origin):
+    """
+    Equirectangular projection of [lon, lat] pairs to metres east/north of
+    `origin`.  The projection depends only on the origin (the depot), so
+    coordinates — and centroids — are comparable from one day to the next.
+    """
+    stoppings = np.asarray(stoppings, dtype=float)
+    lon0, lat0 = origin
+    x = np.radians(stoppings[:, 0] - lon0) * EARTH_RADIUS_M * np.cos(np.radians(lat0))
+    y = np.radians(stoppings[:, 1] - lat0) * EARTH_RADIUS_M
+    return np.column_stack([x, y])
+
+
+def load_cluster_state(state_path):
+    if not state_path or not os.path.exists(state_path):
+        return None
+    with open(state_path) as f:
+        return json.load(f)
+
+
+def save_cluster_state(state_path, state):
+    with open(state_path, "w") as f:
+        json.dump(state, f, indent=1)
+
+
+def cluster_centroids(points, labels, n_clusters, previous=None):
+    """
+    Row `label` is that cluster's centroid, for labels 0..n_clusters-1 —
+    indexed by label, not by rank among the labels present, so the rows
+    line up with the stored assignments.  A cluster left empty keeps its
+    previous centroid (the mean of all points without one).
+    """
+    centroids = np.empty((n_clusters, points.shape[1]))
+    for label in range(n_clusters):
+        mask = labels == label
+        if mask.any():
+            centroids[label] = points[mask].mean(axis=0)
+        elif previous is not None and label < len(previous):
+            centroids[label] = previous[label]
+        else:
+            centroids[label] = points.mean(axis=0)
+    return centroids
+
+
+def cluster_stoppings(normalized_stoppings, max_size=MAX_CLUSTER_SIZE, init_centers=None):
+    from sklearn.cluster import KMeans
+    from scipy.spatial import distance_matrix
+    from scipy.optimize import linear_sum_assignment
+
+    n_points = len(normalized_stoppings)
+    n_clusters = (n_points + max_size - 1) // max_size
+    
+    if n_clusters == 0:
+        return np.array([])
+
+    if init_centers is not None and len(init_centers) == n_clusters:
+        # Warm start from yesterday's centroids: one seeded run converges
+        # in a few iterations when most stops recur.
+        kmeans = KMeans(n_clusters=n_clusters, init=np.asarray(init_centers), n_init=1)
+    else:
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init='auto')
+    kmeans.fit(normalized_stoppings)
+    centers = kmeans.cluster_centers_
+    
+    dist = distance_matrix(normalized_stoppings, centers)
+    cost_matrix = np.repeat(dist, max_size, axis=1)
+    
+    row_ind, col_ind = linear_sum_assignment(cost_matrix)
+    labels = col_ind // max_size
+    
+    return labels[np.argsort(row_ind)]
+
+# Above this share of never-seen stops the previous day's clusters are a
+# poor fit and a full (warm-started) KMeans run is used instead.
+INCREMENTAL_MAX_NEW_FRACTION = 0.5
+
+
+def incremental_cluster_stoppings(stop_ids, points, previous_labels, centroids,
+                                  max_size=MAX_CLUSTER_SIZE):
+    """
+    Day-over-day clustering: every stop seen yesterday keeps its cluster
+    (while that cluster has room); only new stops — and stops displaced
+    by a full cluster — are placed, on the nearest centroid with spare
+    capacity.  Returns None when the previous state does not fit today
+    (different cluster count or too many new stops).
+    """
+    from scipy.spatial import distance_matrix
+    from scipy.optimize import linear_sum_assignment
+
+    n_points = len(points)
+    n_clusters = (n_points + max_size - 1) // max_size
+    if n_clusters == 0 or centroids is None or len(centroids) != n_clusters:
+        return None
+
+    new_stops = sum(1 for stop_id in stop_ids if stop_id not in previous_labels)
+    if new_stops > INCREMENTAL_MAX_NEW_FRACTION * n_points:
+        return None
+
+    labels = np.full(n_points, -1)
+    counts = np.zeros(n_clusters, dtype=int)
+    for i, stop_id in enumerate(stop_ids):
+        label = previous_labels.get(stop_id)
+        if label is not None and label < n_clusters and counts[label] < max_size:
+            labels[i] = label
+            counts[label] += 1
+
+    free = np.flatnonzero(labels == -1)
+    if len(free):
+        slots = np.repeat(np.arange(n_clusters), max_size - counts)
+        cost_matrix = distance_matrix(points[free], np.asarray(centroids))[:, slots]
+        row_ind, col_ind = linear_sum_assignment(cost_matrix)
+        labels[free[row_ind]] = slots[col_ind]
+
+    return labels
+
+
+PLOT_MAX_POINTS = 5000
+
+
+def plot_clusters(data, labels, path, max_points=PLOT_MAX_POINTS):
+    # Figure + Agg canvas directly (no pyplot): headless, and nothing is
+    # left registered in pyplot's global figure list between requests.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    data = np.asarray(data, dtype=float)
+    labels = np.asarray(labels)
+    if len(data) > max_points:
+        keep = np.random.default_rng(42).choice(len(data), max_points, replace=False)
+        keep.sort()
+        data, labels = data[keep], labels[keep]
+
+    fig = Figure(figsize=(6, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    for label in np.unique(labels):
+        mask = labels == label
+        ax.scatter(data[mask, 0], data[mask, 1], s=8, label=f"Cluster {label}")
+    ax.set_title("KMeans Clustering of Stoppings")
+    ax.set_xlabel("Longitude")
+    ax.set_ylabel("Latitude")
+    ax.legend(fontsize="small")
+    output_path = f"{path}/cluster_plot.png"
+    fig.savefig(output_path)
+    fig.clear()
+    return output_path
+
+
+def render_cluster_plot(path, max_points=PLOT_MAX_POINTS):
+    """Renders cluster_plot.png from an existing clustered_stoppings.json."""
+    with open(f"{path}/clustered_stoppings.json") as f:
+        clustered_stoppings = json.load(f)
+
+    coords, labels = [], []
+    for cluster_name, stops in clustered_stoppings.items():
+        label = cluster_name.removeprefix("Cluster ")
+        coords.extend(stops.values())
+        labels.extend([label] * len(stops))
+
+    return plot_clusters(coords, labels, path, max_points)
+
+
+def main(path, plot=False, state_path=None, incremental=False):
+    """
+    Clusters today's stops into clustered_stoppings.json.
+
+    With `state_path` set, stops are projected to local metres around a
+    fixed origin (the depot) stored in that file together with the final
+    centroids and each stop's cluster, and the next run warm-starts KMeans
+    from those centroids.  `incremental=True` goes further and keeps
+    recurring stops in yesterday's cluster (see
+    incremental_cluster_stoppings).  Without a state file clustering is
+    purely in-memory (z-scored coordinates).  The state-file modes are
+    CLI-only (runPreprocesses.main); the API always passes no state.
+    """
+    with open(f"{path}/stoppingandpackage.json") as f:
+        data = json.load(f)
+    stop_location_dict = {
+        stop["stop_id"]: stop["location"]
+        for stop in data
+    }
+    stoppings = list(stop_location_dict.values())
+    stoppings = np.array(stoppings, dtype=float)
+    stop_ids = list(stop_location_dict.keys())
+
+    if state_path:
+        state = load_cluster_state(state_path)
+        if state is None:
+            from prePreocess.getRoute import STARTING_POINT
+            state = {"origin": list(STARTING_POINT), "centroids": None, "assignments": {}}
+        points = project_to_local_metres(stoppings, state["origin"])
+        labels = None
+        if incremental:
+            labels = incremental_cluster_stoppings(
+                stop_ids, points, state.get("assignments", {}), state["centroids"]
+            )
+        if labels is None:
+            labels = cluster_stoppings(points, init_centers=state["centroids"])
+    else:
+        points = standardize_stoppings(stoppings)
+        labels = cluster_stoppings(points)
+
+    clustered_stoppings = {}
+    for label in np.unique(labels):
+        mask = labels == label
+        clustered_stoppings[f"Cluster {label}"] = {
+            stop_ids[i]: stop_location_dict[stop_ids[i]]
+            for i in np.flatnonzero(mask)
+        }
+
+    with open(f"{path}/clustered_stoppings.json", "w") as f:
+        json.dump(clustered_stoppings, f, indent=1)
+
+    if state_path and len(labels):
+        n_clusters = -(-len(points) // MAX_CLUSTER_SIZE)
+        previous = state["centroids"]
+        if previous is not None and len(previous) != n_clusters:
+            previous = None
+        state["centroids"] = cluster_centroids(points, labels, n_clusters, previous).tolist()
+        state["assignments"] = {
+            stop_id: int(label) for stop_id, label in zip(stop_ids, labels)
+        }
+        save_cluster_state(state_path, state)
+
+    if plot:
+        render_cluster_plot(path)
@@ -22,18 +22,17 @@ RANGE_LNG = 0.08  # Approx 8km spread
 RANGE_LAT = 0.08
 
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "jsonFiles")
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def generate_stoppings():
+def generate_stoppings(num_stops=NUM_STOPS, num_clusters=NUM_CLUSTERS):
     stoppings = []
     # Create clusters naturally by defining some "hotspots"
     hotspots = [
         (BASE_LNG + random.uniform(-RANGE_LNG/2, RANGE_LNG/2), 
          BASE_LAT + random.uniform(-RANGE_LAT/2, RANGE_LAT/2))
-        for _ in range(NUM_CLUSTERS)
+        for _ in range(num_clusters)
     ]
     
-    for _ in range(NUM_STOPS):
+    for _ in range(num_stops):
         # Pick a random hotspot
         hx, hy = random.choice(hotspots)
         # Add some Gaussian noise around the hotspot
@@ -43,9 +42,9 @@ def generate_stoppings():
         
     return stoppings
 
-def generate_drivers():
+def generate_drivers(num_drivers=NUM_DRIVERS):
     drivers = {}
-    for i in range(1, NUM_DRIVERS + 1):
+    for i in range(1, num_drivers + 1):
         driver_id = f"D{i}"
         
         # Simulate varying driver capacities/histories
@@ -110,7 +109,10 @@ def generate_drivers():
                 },
                 "cognitive_density": random.uniform(0.002, 0.02)
             },
-            "consecutive_heavy_days": random.randint(0, 10) # Includes extreme bounds over the past 3 days/historical
+            "consecutive_heavy_days": random.randint(0, 10), # Includes extreme bounds over the past 3 days/historical
+            # Start point for the allocator's spatial index (agents/spatialIndex.py)
+            "location": [BASE_LNG + random.uniform(-RANGE_LNG/2, RANGE_LNG/2),
+                         BASE_LAT + random.uniform(-RANGE_LAT/2, RANGE_LAT/2)]
         }
     return drivers
 
@@ -150,13 +152,13 @@ def generate_packages_and_stops(stoppings):
         
     return stopping_and_package, stop_ids
 
-def generate_clusters(stoppings, stop_ids):
+def generate_clusters(stoppings, stop_ids, num_clusters=NUM_CLUSTERS):
     # Convert to standard list if it's not
     coords = np.array(stoppings)
-    kmeans = KMeans(n_clusters=NUM_CLUSTERS, random_state=42, n_init="auto")
+    kmeans = KMeans(n_clusters=num_clusters, random_state=42, n_init="auto")
     labels = kmeans.fit_predict(coords)
     
-    clustered = {f"Cluster {i}": {} for i in range(NUM_CLUSTERS)}
+    clustered = {f"Cluster {i}": {} for i in range(num_clusters)}
     
     for i, (loc, label) in enumerate(zip(stoppings, labels)):
         stop_id = stop_ids[i]
@@ -165,11 +167,22 @@ def generate_clusters(stoppings, stop_ids):
     return clustered
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic depot.")
+    parser.add_argument("--stops", type=int, default=NUM_STOPS)
+    parser.add_argument("--drivers", type=int, default=NUM_DRIVERS)
+    parser.add_argument("--clusters", type=int, default=NUM_CLUSTERS)
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    args = parser.parse_args()
+    OUTPUT_DIR = args.output
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
     print("Generating complex synthetic data...")
-    stoppings = generate_stoppings()
-    drivers = generate_drivers()
+    stoppings = generate_stoppings(args.stops, args.clusters)
+    drivers = generate_drivers(args.drivers)
     stopping_and_package, stop_ids = generate_packages_and_stops(stoppings)
-    clustered = generate_clusters(stoppings, stop_ids)
+    clustered = generate_clusters(stoppings, stop_ids, args.clusters)
     
     # Save files
     with open(os.path.join(OUTPUT_DIR, "stoppings.json"), "w") as f:
@@ -184,5 +197,5 @@ if __name__ == "__main__":
     with open(os.path.join(OUTPUT_DIR, "clustered_stoppings.json"), "w") as f:
         json.dump(clustered, f, indent=4)
         
-    print(f"Generated {NUM_STOPS} stops, {NUM_DRIVERS} drivers, and {NUM_CLUSTERS} clusters.")
+    print(f"Generated {args.stops} stops, {args.drivers} drivers, and {args.clusters} clusters.")
     print(f"Files saved in {OUTPUT_DIR}")
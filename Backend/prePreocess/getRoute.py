@@ -1,9 +1,14 @@
 import json
 import os
+import hashlib
+import threading
+from collections import OrderedDict
 import requests
 from dotenv import load_dotenv
 from typing import List, Dict
 
+from telemetry import span
+
 
 ORS_OPTIMIZATION_URL = "https://api.openrouteservice.org/optimization"
 
@@ -81,11 +86,95 @@ def send_optimization_request(
     return response.json()
 
 
+class RouteCache:
+    """
+    Thread-safe LRU cache of ORS optimisation responses.
+
+    Keyed on the stop locations and depot endpoints only, so the same
+    cluster re-submitted under a different vehicle id (or by another
+    depot in the same batch) is served without a network round-trip.
+    A hit is returned with its routes relabelled to the requesting
+    vehicle id, as ORS would have answered.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(payload: Dict) -> str:
+        vehicle = payload["vehicles"][0]
+        material = {
+            "profile": vehicle.get("profile"),
+            "start": vehicle.get("start"),
+            "end": vehicle.get("end"),
+            "jobs": [job["location"] for job in payload["jobs"]],
+        }
+        raw = json.dumps(material, sort_keys=True).encode()
+        return hashlib.sha1(raw).hexdigest()
+
+    def get(self, payload: Dict) -> Dict | None:
+        key = self.key(payload)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._for_vehicle(self._entries[key], payload["vehicles"][0]["id"])
+            self.misses += 1
+            return None
+
+    @staticmethod
+    def _for_vehicle(data: Dict, vehicle_id) -> Dict:
+        # Copies only what changes; steps are shared and never mutated.
+        return {
+            **data,
+            "routes": [{**route, "vehicle": vehicle_id} for route in data.get("routes", [])],
+        }
+
+    def put(self, payload: Dict, data: Dict):
+        key = self.key(payload)
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Process-wide cache shared by every dispatch (single or batch).
+ROUTE_CACHE = RouteCache()
+
+
+def cached_optimization_request(
+    url: str,
+    api_key: str,
+    payload: Dict,
+    cache: RouteCache | None = ROUTE_CACHE,
+) -> Dict | None:
+    with span("ors.optimization", kind="ors", jobs=len(payload["jobs"])) as s:
+        if cache is not None:
+            cached = cache.get(payload)
+            if cached is not None:
+                s.set(cache="hit")
+                return cached
+
+        s.set(cache="miss" if cache is not None else "off")
+        result = send_optimization_request(url=url, api_key=api_key, payload=payload)
+        if result is None:
+            s.status = "error"
+
+        if result is not None and cache is not None:
+            cache.put(payload, result)
+        return result
+
+
 def save_route(filepath: str, data: Dict):
     with open(filepath, "w") as file:
         json.dump(data, file, indent=2)
 
-def main(dirPath):
+def main(dirPath, cache: RouteCache | None = ROUTE_CACHE):
     api_key = load_api_key()
     clustered_stoppings = load_clustered_stoppings(
         f"{dirPath}/clustered_stoppings.json"
@@ -101,10 +190,11 @@ def main(dirPath):
             end=ENDING_POINT,
         )
 
-        result = send_optimization_request(
+        result = cached_optimization_request(
             url=ORS_OPTIMIZATION_URL,
             api_key=api_key,
             payload=payload,
+            cache=cache,
         )
 
         if result is None:
@@ -1,22 +1,78 @@
-from prePreocess.cluster import main as clusterMain
-from prePreocess.getRoute import main as getRouteMain
-from prePreocess.routeFeatures import main as routeFeatureMain
-from prePreocess.packageFeatures import main as packageFeatureMain
-from prePreocess.finalFeatures import main as finalFeatureMain
+import importlib
+
+from telemetry import span
 
 DATA_DIR_TEMPLATE = "data/jsonFiles{}/"
 
-def main(data_id):
+# Stages run in this order.  Each module is imported the first time its
+# stage runs, so callers that never preprocess (allocation-only CLI, API
+# startup) don't pay for scikit-learn / scipy / matplotlib / requests.
+STAGES = [
+    ("cluster",         "prePreocess.cluster"),
+    ("getRoute",        "prePreocess.getRoute"),
+    ("routeFeatures",   "prePreocess.routeFeatures"),
+    ("packageFeatures", "prePreocess.packageFeatures"),
+    ("finalFeatures",   "prePreocess.finalFeatures"),
+]
+
+
+def load_stage(module_name):
+    return importlib.import_module(module_name).main
+
+
+def preload_stages():
+    for _, module_name in STAGES:
+        load_stage(module_name)
+
+
+def iter_stages(data_id, cluster_state=None, incremental=False):
+    """Runs every stage in order, yielding (name, seconds) as each finishes."""
     data_path = DATA_DIR_TEMPLATE.format(data_id)
 
-    clusterMain(data_path)
-    getRouteMain(data_path)
-    routeFeatureMain(data_path)
-    packageFeatureMain(data_path)
-    finalFeatureMain(data_path)
+    for name, module_name in STAGES:
+        with span(name, kind="stage", data_id=data_id) as stage_span:
+            stage = load_stage(module_name)
+            if name == "cluster":
+                stage(data_path, state_path=cluster_state, incremental=incremental)
+            else:
+                stage(data_path)
+        yield name, stage_span.duration_ms / 1000.0
+
+
+def main(data_id, plot=False, cluster_state=None, incremental=False):
+    """
+    `cluster_state` is an optional path to a per-depot clustering state
+    file shared across days; `incremental` keeps recurring stops in their
+    previous cluster (see prePreocess.cluster.main).
+
+    Both are CLI-only:
+
+        python runPreprocesses.py <data_id> <state.json> [--incremental]
+
+    Dispatches made through the API (single, stream or batch) always
+    cluster from scratch.  A state file belongs to one depot's sequence
+    of days, and a data id names neither a depot nor a day — ids in one
+    batch run concurrently and would race on, and mix, a shared state.
+    Offline, run this once per depot per day in date order, then allocate
+    with `python -m agents.optimized_allocation <data_id>`.
+    """
+    data_path = DATA_DIR_TEMPLATE.format(data_id)
+
+    for _ in iter_stages(data_id, cluster_state, incremental):
+        pass
+
+    # The cluster plot is an optional artifact, never part of dispatch.
+    if plot:
+        from prePreocess.cluster import render_cluster_plot
+        with span("plot", kind="stage", data_id=data_id):
+            render_cluster_plot(data_path)
 
 
 if __name__ == "__main__":
     import sys
-    data_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
-    main(data_id)
\ No newline at end of file
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    data_id = int(args[0]) if args else 1
+    cluster_state = args[1] if len(args) > 1 else None
+    main(data_id, plot="--plot" in flags, cluster_state=cluster_state,
+         incremental="--incremental" in flags)
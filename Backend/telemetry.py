@@ -0,0 +1,248 @@
+"""
+telemetry.py
+────────────
+Per-dispatch timing spans for preprocessing stages, graph nodes, the
+allocator and every LLM / ORS call.
+
+Public API:
+    from telemetry import collect, span, traced_node, TracedLLM
+
+    with collect() as trace:                      # one per dispatch
+        with span("cluster", kind="stage"):
+            ...
+    trace.breakdown()
+    # {"total_ms": .., "by_kind": {"stage": {"count", "total_ms"}, ..},
+    #  "llm_tokens": {"input", "output", "total"}, "spans": [..]}
+
+    builder.add_node("planner", traced_node("planner", planner_node))
+    llm = TracedLLM(llm)          # .invoke() / .stream() spans carry token counts
+
+Nesting follows a ContextVar, so a span opened inside a graph node
+becomes that node's child.  Finished spans go to the active collector
+(if any) and to every registered exporter.  When opentelemetry is
+installed an OpenTelemetryExporter is registered automatically; spans
+then reach whatever SDK / OTLP exporter the process has configured and
+are no-ops otherwise.
+"""
+
+import contextvars
+import importlib.util
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Span:
+    __slots__ = ("name", "kind", "parent", "attributes", "status",
+                 "start", "duration_ms", "start_ns", "otel")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"],
+                 attributes: Dict[str, Any]):
+        self.name        = name
+        self.kind        = kind
+        self.parent      = parent
+        self.attributes  = attributes
+        self.status      = "ok"
+        self.start       = time.perf_counter()
+        self.start_ns    = time.time_ns()
+        self.duration_ms = 0.0
+        self.otel        = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            "name":        self.name,
+            "kind":        self.kind,
+            "parent":      self.parent.name if self.parent else None,
+            "start_ms":    round((self.start - origin) * 1000, 2),
+            "duration_ms": round(self.duration_ms, 2),
+            "status":      self.status,
+            "attributes":  self.attributes,
+        }
+
+
+class TraceCollector:
+    """In-process sink for the spans of one dispatch."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span_: Span):
+        with self._lock:
+            self.spans.append(span_)
+
+    def breakdown(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+
+        by_kind: Dict[str, Dict[str, float]] = {}
+        tokens = {"input": 0, "output": 0, "total": 0}
+        for s in spans:
+            entry = by_kind.setdefault(s.kind, {"count": 0, "total_ms": 0.0})
+            entry["count"]    += 1
+            entry["total_ms"] += s.duration_ms
+            if s.kind == "llm":
+                tokens["input"]  += s.attributes.get("input_tokens", 0)
+                tokens["output"] += s.attributes.get("output_tokens", 0)
+                tokens["total"]  += s.attributes.get("total_tokens", 0)
+        for entry in by_kind.values():
+            entry["total_ms"] = round(entry["total_ms"], 2)
+
+        roots = [s for s in spans if s.parent is None]
+        return {
+            "total_ms":   round(sum(s.duration_ms for s in roots), 2),
+            "by_kind":    by_kind,
+            "llm_tokens": tokens,
+            "spans":      [s.to_dict(self.origin) for s in spans],
+        }
+
+
+_COLLECTOR: contextvars.ContextVar[Optional[TraceCollector]] = \
+    contextvars.ContextVar("trace_collector", default=None)
+_CURRENT:   contextvars.ContextVar[Optional[Span]] = \
+    contextvars.ContextVar("current_span", default=None)
+
+
+# ─── Exporters ───────────────────────────────────────────────────────────────
+
+class OpenTelemetryExporter:
+    """Mirrors spans onto the OpenTelemetry API tracer."""
+
+    def __init__(self, tracer_name: str = "fairdispatch"):
+        from opentelemetry import trace
+        self._trace  = trace
+        self._tracer = trace.get_tracer(tracer_name)
+
+    def on_start(self, span_: Span):
+        parent  = span_.parent.otel if span_.parent is not None else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        span_.otel = self._tracer.start_span(
+            span_.name, context=context, start_time=span_.start_ns,
+            attributes={"dispatch.kind": span_.kind},
+        )
+
+    def on_end(self, span_: Span):
+        if span_.otel is None:
+            return
+        for key, value in span_.attributes.items():
+            if isinstance(value, (str, bool, int, float)):
+                span_.otel.set_attribute(key, value)
+        if span_.status != "ok":
+            span_.otel.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span_.otel.end(end_time=span_.start_ns + int(span_.duration_ms * 1e6))
+
+
+_EXPORTERS: List[Any] = []
+_EXPORTERS_LOADED = False
+_EXPORTERS_LOCK = threading.Lock()
+
+
+def add_exporter(exporter):
+    """Exporters implement on_start(span) and on_end(span)."""
+    with _EXPORTERS_LOCK:
+        _EXPORTERS.append(exporter)
+
+
+def _exporters() -> List[Any]:
+    global _EXPORTERS_LOADED
+    if not _EXPORTERS_LOADED:
+        with _EXPORTERS_LOCK:
+            if not _EXPORTERS_LOADED:
+                if importlib.util.find_spec("opentelemetry") is not None:
+                    _EXPORTERS.append(OpenTelemetryExporter())
+                _EXPORTERS_LOADED = True
+    return _EXPORTERS
+
+
+# ─── Spans ───────────────────────────────────────────────────────────────────
+
+@contextmanager
+def collect():
+    """Collects every span opened in this context until exit."""
+    collector = TraceCollector()
+    token = _COLLECTOR.set(collector)
+    try:
+        yield collector
+    finally:
+        _COLLECTOR.reset(token)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    span_     = Span(name, kind, _CURRENT.get(), attributes)
+    exporters = _exporters()
+    for exporter in exporters:
+        exporter.on_start(span_)
+    token = _CURRENT.set(span_)
+    try:
+        yield span_
+    except BaseException as e:
+        span_.status = "error"
+        span_.attributes.setdefault("error", f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _CURRENT.reset(token)
+        span_.duration_ms = (time.perf_counter() - span_.start) * 1000
+        collector = _COLLECTOR.get()
+        if collector is not None:
+            collector.add(span_)
+        for exporter in exporters:
+            exporter.on_end(span_)
+
+
+def current_span() -> Optional[Span]:
+    return _CURRENT.get()
+
+
+def traced_node(name: str, fn: Callable[[Any], dict]) -> Callable[[Any], dict]:
+    """Wraps a LangGraph node function in a "node" span."""
+    def node(state):
+        with span(name, kind="node"):
+            return fn(state)
+    node.__name__ = name
+    return node
+
+
+class TracedLLM:
+    """
+    Chat-model proxy: every .invoke() is an "llm" span named after the
+    node that made it, with latency and the provider's token usage.
+    """
+
+    def __init__(self, llm):
+        self._llm = llm
+
+    def invoke(self, prompt, *args, **kwargs):
+        parent = _CURRENT.get()
+        node   = parent.name if parent is not None else "direct"
+        model  = getattr(self._llm, "model_name", None) or getattr(self._llm, "model", None)
+        with span(f"llm.{node}", kind="llm", node=node, model=str(model)) as s:
+            resp  = self._llm.invoke(prompt, *args, **kwargs)
+            usage = getattr(resp, "usage_metadata", None) or {}
+            s.set(
+                input_tokens=int(usage.get("input_tokens", 0)),
+                output_tokens=int(usage.get("output_tokens", 0)),
+                total_tokens=int(usage.get("total_tokens", 0)),
+            )
+            return resp
+
+    def stream(self, prompt, *args, **kwargs):
+        parent = _CURRENT.get()
+        node   = parent.name if parent is not None else "direct"
+        model  = getattr(self._llm, "model_name", None) or getattr(self._llm, "model", None)
+        with span(f"llm.{node}", kind="llm", node=node, model=str(model), streamed=True) as s:
+            usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+            for chunk in self._llm.stream(prompt, *args, **kwargs):
+                for key, value in (getattr(chunk, "usage_metadata", None) or {}).items():
+                    if key in usage:
+                        usage[key] += int(value)
+                yield chunk
+            s.set(**usage)
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
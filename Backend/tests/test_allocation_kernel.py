@@ -0,0 +1,119 @@
+"""
+Equivalence of the allocator's fast paths with the Python candidate loop.
+
+For the same inputs and trials=1 (deterministic order), the compiled
+kernel — Numba and the NumPy fallback alike — and the shortlist pruner
+must assign every cluster to the same driver as the calculate_penalty
+loop, with or without a spatial index / nearest_k and soft constraints.
+"""
+
+import copy
+
+import numpy as np
+import pytest
+
+import agents.allocationKernel as allocation_kernel
+from agents.optimized_allocation import allocateDrivers_optimized
+from agents.softConstraints import compile_soft_constraints
+from agents.spatialIndex import build_spatial_index
+
+RULES = [
+    {"type": "avoid",     "driver": "D1", "cluster": "Cluster 3"},
+    {"type": "prefer",    "driver": "D2", "cluster": "Cluster 5"},
+    {"type": "cap_heavy", "driver": "D4", "max_consecutive": 1},
+]
+
+
+def _effort_vector(rng, scale):
+    v = rng.random(12) * scale
+    return {
+        "physical_load":  {"total_weight": v[0] * 100, "heavy_pkg_ratio": v[1], "bulky_ratio": v[2]},
+        "stair_load":     {"stair_load_index": v[3] * 10, "avg_floor": v[4] * 8, "elevator_coverage": v[5]},
+        "traffic_stress": {"traffic_index": v[6], "parking_stress": v[7], "stop_density": v[8]},
+        "route_distance": {"total_distance": v[9] * 20000, "total_duration": v[10] * 7200},
+        "cognitive_density": v[11],
+    }
+
+
+def _point(rng):
+    return [78.16 + rng.uniform(-0.05, 0.05), 11.68 + rng.uniform(-0.05, 0.05)]
+
+
+@pytest.fixture(params=[0, 1, 2], ids=lambda seed: f"seed{seed}")
+def depot(request):
+    rng = np.random.default_rng(request.param)
+    effort_vectors = {f"Cluster {i}": _effort_vector(rng, 1.0) for i in range(40)}
+    driver_data = {
+        f"D{i}": {
+            "cumulative_effort_vector": _effort_vector(rng, 3.0),
+            "consecutive_heavy_days":   int(rng.integers(0, 3)),
+            "location":                 _point(rng),
+        }
+        for i in range(12)
+    }
+    cluster_locations = {name: _point(rng) for name in effort_vectors}
+    return effort_vectors, driver_data, cluster_locations
+
+
+@pytest.fixture(params=["numba", "numpy"])
+def kernel_backend(request, monkeypatch):
+    if request.param == "numba":
+        if not allocation_kernel.numba_available():
+            pytest.skip("numba not installed")
+        monkeypatch.setattr(allocation_kernel, "_KERNEL", None)
+        assert allocation_kernel.kernel_backend() == "numba"
+    else:
+        monkeypatch.setattr(allocation_kernel, "_KERNEL",
+                            ("numpy", allocation_kernel._greedy_trial_numpy))
+    return request.param
+
+
+def _allocate(depot, spatial, nearest_k, constrained, **kwargs):
+    effort_vectors, driver_data, cluster_locations = depot
+    driver_data = copy.deepcopy(driver_data)
+    index = build_spatial_index(
+        [d["location"] for d in driver_data.values()],
+        [cluster_locations[name] for name in effort_vectors],
+    ) if spatial else None
+    constraints = compile_soft_constraints(
+        RULES, list(driver_data), list(effort_vectors)
+    ) if constrained else None
+    return allocateDrivers_optimized(effort_vectors, driver_data,
+                                     spatial_index=index, nearest_k=nearest_k,
+                                     constraints=constraints, trials=1, **kwargs)
+
+
+SPATIAL = pytest.mark.parametrize("spatial, nearest_k", [
+    (False, None), (True, None), (True, 4),
+], ids=["blind", "spatial", "nearest4"])
+CONSTRAINED = pytest.mark.parametrize("constrained", [False, True],
+                                      ids=["free", "constrained"])
+
+
+@SPATIAL
+@CONSTRAINED
+def test_kernel_matches_loop(depot, kernel_backend, spatial, nearest_k, constrained):
+    expected = _allocate(depot, spatial, nearest_k, constrained)
+    assert _allocate(depot, spatial, nearest_k, constrained, use_kernel=True) == expected
+
+
+@SPATIAL
+@CONSTRAINED
+@pytest.mark.parametrize("shortlist_k", [2, 4, 11])
+def test_shortlist_matches_loop(depot, spatial, nearest_k, constrained, shortlist_k):
+    expected = _allocate(depot, spatial, nearest_k, constrained)
+    assert _allocate(depot, spatial, nearest_k, constrained,
+                     shortlist_k=shortlist_k) == expected
+
+
+@CONSTRAINED
+def test_kernel_ignores_shortlist(depot, kernel_backend, constrained):
+    expected = _allocate(depot, False, None, constrained)
+    assert _allocate(depot, False, None, constrained,
+                     use_kernel=True, shortlist_k=3) == expected
+
+
+def test_every_cluster_assigned(depot, kernel_backend):
+    allocation = _allocate(depot, True, 4, True, use_kernel=True)
+    assert set(allocation) == set(depot[0])
+    assert set(allocation.values()) <= set(depot[1])
@@ -0,0 +1,66 @@
+"""
+Deterministic anomaly detection on a fixed cluster × feature matrix:
+every cluster over ANOMALY_RATIO × the median is flagged, whatever its
+robust z-score, and only clusters just under the ratio with a high z
+are sent to the LLM as borderline.
+"""
+
+import pytest
+
+import agents.contextSubgraph as context
+
+#            weight  stairs  distance  cognitive
+MATRIX = {
+    "Cluster 0": (100.0, 10.0,  1000.0, 0.010),
+    "Cluster 1": (102.0, 10.2,  1400.0, 0.011),
+    "Cluster 2": ( 98.0,  9.8,   600.0, 0.009),
+    "Cluster 3": (101.0, 10.1,  1200.0, 0.010),
+    "Cluster 4": ( 99.0,  9.9,   800.0, 0.010),
+    "Cluster 5": (160.0, 10.0,  1000.0, 0.010),   # 1.6× weight, huge z
+    "Cluster 6": (100.0, 13.0,  1000.0, 0.010),   # 1.3× stairs, high z
+    "Cluster 7": (100.0, 10.0,  1600.0, 0.010),   # 1.6× distance, z ≈ 2.0
+    "Cluster 8": (100.0, 10.0,  1250.0, 0.010),   # 1.25× distance, z < 2
+    "Cluster 9": (100.0, 11.5,  1000.0, 0.010),   # 1.15× stairs, high z
+}
+
+
+def _effort_vector(weight, stairs, distance, cognitive):
+    return {
+        "physical_load":     {"total_weight": weight},
+        "stair_load":        {"stair_load_index": stairs},
+        "route_distance":    {"total_distance": distance},
+        "cognitive_density": cognitive,
+    }
+
+
+@pytest.fixture
+def effort_vectors():
+    return {name: _effort_vector(*row) for name, row in MATRIX.items()}
+
+
+def test_every_cluster_over_the_ratio_is_flagged(effort_vectors):
+    flagged, _, _ = context._robust_anomalies(effort_vectors)
+    assert flagged == ["Cluster 5", "Cluster 7"]
+
+
+def test_borderline_band_is_under_the_ratio_with_high_z(effort_vectors):
+    _, borderline, _ = context._robust_anomalies(effort_vectors)
+    assert borderline == ["Cluster 6"]
+
+
+def test_medians(effort_vectors):
+    _, _, medians = context._robust_anomalies(effort_vectors)
+    assert medians == {"physical_weight":   100.0, "stair_load_index": 10.0,
+                       "total_distance":    1000.0, "cognitive_density": 0.01}
+
+
+def test_zero_median_feature_flags_any_positive_value():
+    effort_vectors = {f"Cluster {i}": _effort_vector(100.0, 0.0, 1000.0, 0.01)
+                      for i in range(5)}
+    effort_vectors["Cluster 4"]["stair_load"]["stair_load_index"] = 2.0
+    flagged, borderline, _ = context._robust_anomalies(effort_vectors)
+    assert (flagged, borderline) == (["Cluster 4"], [])
+
+
+def test_empty_depot():
+    assert context._robust_anomalies({}) == ([], [], {})
@@ -0,0 +1,184 @@
+"""LLMGateway against a stub chat model: coalescing, 429 backoff, deadlines."""
+
+import threading
+import time
+
+import pytest
+
+from agents.llmGateway import LLMDeadlineExceeded, LLMGateway, llm_deadline, llm_priority
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("429 Too Many Requests")
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = type("Response", (), {"status_code": 429, "headers": headers})()
+
+
+class StubClient:
+    """Answers with the prompt once `release` is set; fails the first `fail` calls."""
+
+    def __init__(self, fail=0, retry_after=None):
+        self.release     = threading.Event()
+        self.started     = threading.Event()
+        self.fail        = fail
+        self.retry_after = retry_after
+        self.calls       = []
+        self._lock       = threading.Lock()
+
+    def invoke(self, prompt, **kwargs):
+        with self._lock:
+            self.calls.append((prompt, kwargs))
+            failing = len(self.calls) <= self.fail
+        self.started.set()
+        if failing:
+            raise RateLimitError(self.retry_after)
+        self.release.wait(5)
+        return prompt
+
+
+def _in_thread(fn, *args):
+    out = {}
+
+    def run():
+        try:
+            out["result"] = fn(*args)
+        except Exception as e:
+            out["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, out
+
+
+def _invoke(gateway, client, prompt, deadline_s=None, priority="interactive"):
+    deadline = time.monotonic() + deadline_s if deadline_s is not None else None
+    with llm_priority(priority), llm_deadline(deadline):
+        return gateway.invoke(client, prompt)
+
+
+def _wait_for(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_identical_calls_are_coalesced():
+    gateway, client = LLMGateway(), StubClient()
+    leader = _in_thread(_invoke, gateway, client, "same")
+    client.started.wait(2)
+    followers = [_in_thread(_invoke, gateway, client, "same") for _ in range(3)]
+    _wait_for(lambda: gateway.stats()["coalesced"] == 3)
+    client.release.set()
+    for thread, out in [leader, *followers]:
+        thread.join(2)
+        assert out["result"] == "same"
+    assert len(client.calls) == 1
+
+
+def test_priorities_are_not_coalesced():
+    gateway, client = LLMGateway(), StubClient()
+    threads = [_in_thread(_invoke, gateway, client, "same", None, priority)
+               for priority in ("interactive", "batch")]
+    _wait_for(lambda: len(client.calls) == 2)
+    client.release.set()
+    for thread, out in threads:
+        thread.join(2)
+        assert out["result"] == "same"
+    assert gateway.stats()["coalesced"] == 0
+
+
+def test_429_is_retried_after_retry_after():
+    gateway = LLMGateway(max_retries=3)
+    client  = StubClient(fail=2, retry_after=0.05)
+    client.release.set()
+    start = time.monotonic()
+    assert gateway.invoke(client, "hello") == "hello"
+    assert time.monotonic() - start >= 0.1
+    assert len(client.calls) == 3
+    stats = gateway.stats()
+    assert (stats["rate_limited"], stats["retries"]) == (2, 2)
+    assert stats["in_flight"] == 0
+
+
+def test_429_gives_up_after_max_retries():
+    gateway = LLMGateway(max_retries=1, base_backoff=0.01)
+    client  = StubClient(fail=5)
+    with pytest.raises(RateLimitError):
+        gateway.invoke(client, "hello")
+    assert len(client.calls) == 2
+
+
+def test_backoff_past_deadline_is_not_retried():
+    gateway = LLMGateway(max_retries=3)
+    client  = StubClient(fail=1, retry_after=1.0)
+    with pytest.raises(LLMDeadlineExceeded):
+        _invoke(gateway, client, "hello", deadline_s=0.2)
+    assert len(client.calls) == 1
+    assert gateway.stats()["expired"] == 1
+
+
+def test_deadline_is_sent_as_request_timeout():
+    gateway, client = LLMGateway(), StubClient()
+    client.release.set()
+    _invoke(gateway, client, "hello", deadline_s=5.0)
+    timeout = client.calls[0][1]["timeout"]
+    assert 0 < timeout <= 5.0
+
+
+def test_expired_waiter_leaves_the_slot_queue():
+    gateway, client = LLMGateway(max_concurrency=1), StubClient()
+    holder = _in_thread(_invoke, gateway, client, "holder")
+    client.started.wait(2)
+    with pytest.raises(LLMDeadlineExceeded):
+        _invoke(gateway, client, "queued", deadline_s=0.05)
+    assert gateway.stats()["waiting"] == 0
+    client.release.set()
+    holder[0].join(2)
+    assert [prompt for prompt, _ in client.calls] == ["holder"]
+
+
+def test_coalesced_waiter_stops_at_its_own_deadline():
+    gateway, client = LLMGateway(), StubClient()
+    leader = _in_thread(_invoke, gateway, client, "same")
+    client.started.wait(2)
+    with pytest.raises(LLMDeadlineExceeded):
+        _invoke(gateway, client, "same", deadline_s=0.05)
+    client.release.set()
+    leader[0].join(2)
+    assert leader[1]["result"] == "same"
+
+
+def test_expired_waiter_does_not_spin_on_a_slow_leader():
+    gateway, client = LLMGateway(), StubClient()
+    leader = _in_thread(_invoke, gateway, client, "same")
+    client.started.wait(2)
+    waiter = _in_thread(_invoke, gateway, client, "same", -1.0)
+    waiter[0].join(0.5)
+    assert not waiter[0].is_alive(), "waiter kept polling the leader"
+    assert isinstance(waiter[1].get("error"), LLMDeadlineExceeded)
+    assert gateway.stats()["coalesced"] == 1
+    client.release.set()
+    leader[0].join(2)
+    assert leader[1]["result"] == "same"
+    assert [prompt for prompt, _ in client.calls] == ["same"]
+
+
+def test_waiter_outlives_an_expired_leader():
+    gateway, client = LLMGateway(max_concurrency=1), StubClient()
+    holder = _in_thread(_invoke, gateway, client, "holder")
+    client.started.wait(2)
+    leader = _in_thread(_invoke, gateway, client, "same", 0.2)
+    _wait_for(lambda: gateway.stats()["waiting"] == 1)
+    waiter = _in_thread(_invoke, gateway, client, "same")
+    _wait_for(lambda: gateway.stats()["coalesced"] == 1)
+    leader[0].join(2)
+    assert isinstance(leader[1].get("error"), LLMDeadlineExceeded)
+    client.release.set()
+    waiter[0].join(2)
+    holder[0].join(2)
+    assert waiter[1].get("result") == "same"
+    assert [prompt for prompt, _ in client.calls] == ["holder", "same"]
@@ -0,0 +1,39 @@
+"""Scraping /metrics: Prometheus text format, request and span metrics."""
+
+from fastapi.testclient import TestClient
+
+import main
+import metrics
+from telemetry import span
+
+
+def _scrape(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    return response.text
+
+
+def test_every_metric_is_declared():
+    text = _scrape(TestClient(main.app))
+    for metric in metrics.REGISTRY:
+        for line in metric.header():
+            assert line in text.splitlines()
+
+
+def test_request_latency_by_route_template():
+    client = TestClient(main.app)
+    _scrape(client)
+    text = _scrape(client)
+    assert ('dispatch_http_request_duration_seconds_count'
+            '{method="GET",route="/metrics",status="200"}') in text
+    assert ('dispatch_http_request_duration_seconds_bucket'
+            '{method="GET",route="/metrics",status="200",le="+Inf"}') in text
+
+
+def test_degraded_node_span_is_counted():
+    with span("critic_agent", kind="node") as node:
+        node.set(degraded=True)
+    text = _scrape(TestClient(main.app))
+    assert 'dispatch_degraded_nodes_total{node="critic_agent"}' in text
+    assert 'dispatch_node_duration_seconds_count{node="critic_agent"}' in text
@@ -0,0 +1,87 @@
+"""
+The spatial index on a generated depot: drivers from
+benchmarks/synthetic_depot.py carry start points, so the allocator's
+index is built and its KD-tree agrees with the brute-force distances.
+"""
+
+import copy
+import json
+import os
+
+import numpy as np
+import pytest
+
+import agents.allocationSubgraph as allocation_subgraph
+from agents.optimized_allocation import allocateDrivers_optimized, config_for
+from agents.spatialIndex import cluster_centroids, spatial_index_for
+from benchmarks.synthetic_depot import generate_depot
+
+
+@pytest.fixture(scope="module")
+def depot(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("depot"))
+    generate_depot(path, n_stops=600, n_drivers=30, seed=7)
+    with open(os.path.join(path, "driversdata.json")) as f:
+        driver_data = json.load(f)
+    with open(os.path.join(path, "clustered_stoppings.json")) as f:
+        cluster_locations = cluster_centroids(json.load(f))
+    return driver_data, cluster_locations
+
+
+def test_generated_drivers_have_locations(depot):
+    driver_data, _ = depot
+    assert all(len(d["location"]) == 2 for d in driver_data.values())
+
+
+def test_index_matches_brute_force(depot):
+    driver_data, cluster_locations = depot
+    index = spatial_index_for(driver_data, cluster_locations, cluster_locations)
+
+    assert index is not None
+    assert index.distance_km.shape == (len(driver_data), len(cluster_locations))
+    nearest = np.sort(np.argsort(index.distance_km, axis=0)[:3].T, axis=1)
+    assert np.array_equal(index.nearest_drivers(3), nearest)
+
+
+def test_nearest_k_allocation_assigns_every_cluster(depot):
+    driver_data, cluster_locations = depot
+    effort_vectors = {
+        name: {"physical_load": {"total_weight": 100.0}} for name in cluster_locations
+    }
+    index = spatial_index_for(driver_data, effort_vectors, cluster_locations)
+
+    allocation = allocateDrivers_optimized(effort_vectors, copy.deepcopy(driver_data),
+                                           spatial_index=index, nearest_k=4, trials=1)
+
+    assert set(allocation) == set(effort_vectors)
+    assert set(allocation.values()) <= set(driver_data)
+
+
+@pytest.mark.parametrize("k, unlocated, expected", [
+    (64,   False, None),    # 30 drivers < 2·64: every driver is scored
+    (8,    False, 8),
+    (8,    True,  8),       # one driver without a location: no index, k unused
+    (None, False, None),
+])
+def test_subgraph_nearest_k_falls_back_to_every_driver(depot, monkeypatch, k, unlocated, expected):
+    driver_data, cluster_locations = depot
+    driver_data = copy.deepcopy(driver_data)
+    if unlocated:
+        del next(iter(driver_data.values()))["location"]
+    effort_vectors = {
+        name: {"physical_load": {"total_weight": 100.0}} for name in cluster_locations
+    }
+    calls = []
+
+    def record(*args, **kwargs):
+        calls.append(kwargs)
+        return allocateDrivers_optimized(*args, **kwargs)
+
+    monkeypatch.setattr(allocation_subgraph, "NEAREST_DRIVERS_K", k)
+    monkeypatch.setattr(allocation_subgraph, "allocateDrivers_optimized", record)
+    allocation = allocation_subgraph._allocate(effort_vectors, driver_data,
+                                               cluster_locations, config_for(None), trials=1)
+
+    assert set(allocation) == set(effort_vectors)
+    assert calls[0]["nearest_k"] == expected
+    assert (calls[0]["spatial_index"] is None) == unlocated
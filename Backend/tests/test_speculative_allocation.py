@@ -0,0 +1,193 @@
+"""
+Reconciling the speculative allocation with the tuned inputs.
+
+_SpeculativeReplay must keep every cluster of an allocation the tuned
+greedy pass itself made, and its incremental repair must match
+allocateDrivers_optimized with the kept clusters fixed (trials=1).
+core_allocator must take the reuse and repair paths without a full
+allocator run, and those paths must be cheaper than no speculation.
+"""
+
+import copy
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+import agents.allocationSubgraph as allocation
+from agents.dispatchStore import open_inputs, resolve
+from agents.optimized_allocation import config_for, flatten_effort_vector
+from agents.softConstraints import compile_soft_constraints
+from agents.spatialIndex import cluster_centroids
+from benchmarks.synthetic_depot import generate_depot
+from telemetry import collect, span
+
+TUNED = {"physical_load": 1.1, "stair_load": 1.6, "route_distance": 0.9}
+
+
+def _effort_vector(rng, scale):
+    v = rng.random(12) * scale
+    return {
+        "physical_load":  {"total_weight": v[0] * 100, "heavy_pkg_ratio": v[1], "bulky_ratio": v[2]},
+        "stair_load":     {"stair_load_index": v[3] * 10, "avg_floor": v[4] * 8, "elevator_coverage": v[5]},
+        "traffic_stress": {"traffic_index": v[6], "parking_stress": v[7], "stop_density": v[8]},
+        "route_distance": {"total_distance": v[9] * 20000, "total_duration": v[10] * 7200},
+        "cognitive_density": v[11],
+    }
+
+
+@pytest.fixture(params=[0, 1, 2], ids=lambda seed: f"seed{seed}")
+def depot(request, tmp_path):
+    rng = np.random.default_rng(request.param)
+    generate_depot(str(tmp_path), n_stops=2000, n_drivers=60, seed=request.param)
+    with open(os.path.join(tmp_path, "driversdata.json")) as f:
+        driver_data = json.load(f)
+    with open(os.path.join(tmp_path, "clustered_stoppings.json")) as f:
+        cluster_locations = cluster_centroids(json.load(f))
+    effort_vectors = {name: _effort_vector(rng, 1.0) for name in cluster_locations}
+    return effort_vectors, driver_data, cluster_locations
+
+
+def _rules(effort_vectors, driver_data):
+    drivers, clusters = list(driver_data), list(effort_vectors)
+    return [
+        {"type": "avoid",     "driver": drivers[0], "cluster": clusters[0]},
+        {"type": "avoid",     "driver": drivers[5], "cluster": clusters[7]},
+        {"type": "prefer",    "driver": drivers[2], "cluster": clusters[3]},
+        {"type": "cap_heavy", "driver": drivers[1], "max_consecutive": 0},
+    ]
+
+
+def _days(driver_data):
+    return np.array([d.get("consecutive_heavy_days", 0) for d in driver_data.values()],
+                    dtype=np.int64)
+
+
+@pytest.fixture(params=[None, 4], ids=["all_drivers", "nearest4"])
+def nearest_k(request, monkeypatch):
+    monkeypatch.setattr(allocation, "NEAREST_DRIVERS_K", request.param)
+    return request.param
+
+
+@pytest.mark.parametrize("with_rules", [False, True], ids=["free", "constrained"])
+def test_replay_keeps_the_tuned_greedy_allocation(depot, nearest_k, with_rules):
+    effort_vectors, driver_data, cluster_locations = depot
+    config      = config_for(TUNED)
+    constraints = compile_soft_constraints(
+        _rules(effort_vectors, driver_data), list(driver_data), list(effort_vectors), config
+    ) if with_rules else None
+
+    speculative = allocation.speculative_allocation(effort_vectors, driver_data, cluster_locations)
+    tuned_drivers = copy.deepcopy(driver_data)
+    speculative["allocation"] = allocation._allocate(
+        effort_vectors, tuned_drivers, cluster_locations, config, constraints, trials=1)
+    speculative["drivers"] = tuned_drivers
+
+    with open_inputs("replay", effort_vectors, driver_data, cluster_locations) as handle:
+        replay = allocation._SpeculativeReplay(resolve(handle), speculative,
+                                               _days(driver_data), config, constraints)
+        assert replay.kept() == speculative["allocation"]
+
+
+@pytest.mark.parametrize("with_rules", [False, True], ids=["free", "constrained"])
+def test_repair_matches_a_fixed_assignment_run(depot, nearest_k, with_rules):
+    effort_vectors, driver_data, cluster_locations = depot
+    config      = config_for(TUNED)
+    constraints = compile_soft_constraints(
+        _rules(effort_vectors, driver_data), list(driver_data), list(effort_vectors), config
+    ) if with_rules else None
+    speculative = allocation.speculative_allocation(effort_vectors, driver_data, cluster_locations)
+
+    with open_inputs("repair", effort_vectors, driver_data, cluster_locations) as handle:
+        replay = allocation._SpeculativeReplay(resolve(handle), speculative,
+                                               _days(driver_data), config, constraints)
+        kept = replay.kept()
+        repaired, drivers = replay.repair(kept)
+
+    expected_drivers = copy.deepcopy(driver_data)
+    expected = allocation._allocate(effort_vectors, expected_drivers, cluster_locations,
+                                    config, constraints, fixed_assignment=kept, trials=1)
+    assert repaired == expected
+    for name, expected_driver in expected_drivers.items():
+        assert drivers[name]["consecutive_heavy_days"] == expected_driver["consecutive_heavy_days"]
+        np.testing.assert_allclose(
+            flatten_effort_vector(drivers[name]["cumulative_effort_vector"]),
+            flatten_effort_vector(expected_driver["cumulative_effort_vector"]),
+            rtol=1e-12,
+        )
+
+
+def _run_core_allocator(depot, tuned_weights, speculate, avoid_speculative=0):
+    """
+    (path, allocator spans, result, seconds).  `avoid_speculative` adds
+    avoid rules against that many of the speculative placements.
+    """
+    effort_vectors, driver_data, cluster_locations = depot
+    with open_inputs("core", effort_vectors, driver_data, cluster_locations) as handle:
+        speculative = allocation.speculative_allocation(effort_vectors, driver_data,
+                                                        cluster_locations)
+        if speculate:
+            resolve(handle).derived["speculative"] = speculative
+        rules = [{"type": "avoid", "driver": driver, "cluster": cluster}
+                 for cluster, driver in list(speculative["allocation"].items())[:avoid_speculative]]
+        state = {"inputs": handle, "tuned_weights": tuned_weights, "soft_constraints": rules}
+        with collect() as trace, span("core_allocator", kind="node") as node:
+            start   = time.perf_counter()
+            result  = allocation.core_allocator_node(state)
+            elapsed = time.perf_counter() - start
+    allocators = [s.name for s in trace.spans if s.kind == "allocator"]
+    return node.attributes.get("speculative"), allocators, result, elapsed
+
+
+def test_default_inputs_reuse_without_allocating(depot):
+    path, allocators, result, _ = _run_core_allocator(depot, None, speculate=True)
+    assert path == "reused"
+    assert allocators == []
+    assert set(result["allocation"]) == set(depot[0])
+
+
+def test_moved_clusters_are_repaired_without_a_full_run(depot):
+    path, allocators, result, _ = _run_core_allocator(depot, TUNED, speculate=True,
+                                                      avoid_speculative=2)
+    assert path == "repaired"
+    assert allocators == ["speculative_repair"]
+    assert set(result["allocation"]) == set(depot[0])
+
+
+def test_repair_limit_falls_back_to_a_full_run(depot, monkeypatch):
+    monkeypatch.setattr(allocation, "SPECULATIVE_REPAIR_LIMIT", 0.0)
+    path, allocators, _, _ = _run_core_allocator(depot, TUNED, speculate=True,
+                                                 avoid_speculative=2)
+    assert path == "full"
+    assert allocators == ["allocateDrivers_optimized"]
+
+
+@pytest.mark.parametrize("speculate", [False, True], ids=["full", "speculative"])
+def test_allocated_drivers_stay_in_the_store(depot, speculate):
+    effort_vectors, driver_data, cluster_locations = depot
+    with open_inputs("store", effort_vectors, driver_data, cluster_locations) as handle:
+        inputs = resolve(handle)
+        assert inputs.allocated_drivers() is driver_data
+        if speculate:
+            inputs.derived["speculative"] = allocation.speculative_allocation(
+                effort_vectors, driver_data, cluster_locations)
+        result  = allocation.core_allocator_node({"inputs": handle, "tuned_weights": TUNED})
+        drivers = inputs.allocated_drivers()
+
+    assert set(result) == {"allocation"}
+    assert drivers is not driver_data and set(drivers) == set(driver_data)
+    for cluster, driver in result["allocation"].items():
+        assert (flatten_effort_vector(drivers[driver]["cumulative_effort_vector"])
+                > flatten_effort_vector(driver_data[driver]["cumulative_effort_vector"])).any()
+
+
+@pytest.mark.parametrize("avoid_speculative", [0, 2], ids=["reuse", "repair"])
+def test_speculation_shortens_core_allocator(depot, avoid_speculative):
+    def best(speculate):
+        return min(_run_core_allocator(depot, TUNED, speculate, avoid_speculative)[3]
+                   for _ in range(3))
+
+    best(False)                                   # kernel warm-up
+    assert best(True) < best(False)
@@ -28,7 +28,7 @@ function App() {
   const handleProceedFromDataset = (id) => {
     setSelectedDatasetId(id);
     setIsCustom(false);
-    dispatch.startDispatch(id, false);
+    dispatch.startLiveDispatch(id);
     setView('process');
   };
 
@@ -69,6 +69,8 @@ function App() {
           allocation={dispatch.allocation}
           fairnessReport={dispatch.fairnessReport}
           critique={dispatch.critique}
+          liveResult={dispatch.liveResult}
+          error={dispatch.error}
           onReset={handleReset}
         />
       )}
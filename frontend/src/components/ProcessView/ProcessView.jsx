@@ -1,7 +1,9 @@
 import React, { useMemo } from 'react';
 import './ProcessView.css';
 
-const ProcessView = ({ status, currentStage, logs, allocation, fairnessReport, critique, onReset }) => {
+const ProcessView = ({
+  status, currentStage, logs, allocation, fairnessReport, critique, liveResult, error, onReset,
+}) => {
   const stages = [
     { id: 1, name: 'Loading', icon: '📥' },
     { id: 2, name: 'Analyzing', icon: '🔍' },
@@ -43,7 +45,7 @@ const ProcessView = ({ status, currentStage, logs, allocation, fairnessReport, c
             {status === 'loading' && '⏳ Starting dispatch allocation...'}
             {status === 'streaming' && '🔄 Processing allocation...'}
             {status === 'completed' && '✅ Allocation complete!'}
-            {status === 'error' && '❌ Error during processing'}
+            {status === 'error' && `❌ Error during processing${error ? `: ${error}` : ''}`}
           </div>
         </div>
 
@@ -72,7 +74,16 @@ const ProcessView = ({ status, currentStage, logs, allocation, fairnessReport, c
 
           {/* Results Panels */}
           <div className="grid-column">
-            {status === 'completed' && allocation && (
+            {liveResult?.allocation && (
+              <>
+                <LiveAllocationTable allocation={liveResult.allocation} preview={liveResult.preview} />
+                {liveResult.fairness_report && <LiveFairness report={liveResult.fairness_report} />}
+                {liveResult.critique && <LiveCritique critique={liveResult.critique} />}
+                {liveResult.explanation && <LiveBriefing text={liveResult.explanation} />}
+              </>
+            )}
+
+            {!liveResult && status === 'completed' && allocation && (
               <>
                 {/* Allocation Table */}
                 <AllocationTable allocation={allocation} />
@@ -88,7 +99,7 @@ const ProcessView = ({ status, currentStage, logs, allocation, fairnessReport, c
               </>
             )}
 
-            {status !== 'completed' && (
+            {!liveResult?.allocation && status !== 'completed' && (
               <div className="process-card">
                 <div className="card-title">Results</div>
                 <div style={{ padding: '2rem', textAlign: 'center', color: 'var(--text-muted)' }}>
@@ -100,7 +111,7 @@ const ProcessView = ({ status, currentStage, logs, allocation, fairnessReport, c
         </div>
 
         {/* Action Buttons */}
-        {status === 'completed' && (
+        {(status === 'completed' || status === 'error') && (
           <div className="process-actions">
             <button className="btn btn-primary" onClick={onReset}>
               ← Back to Datasets
@@ -159,6 +170,91 @@ const AllocationTable = ({ allocation }) => {
   );
 };
 
+/* Live dispatch results (POST /dispatch/{id}/stream) */
+const LiveAllocationTable = ({ allocation, preview }) => {
+  return (
+    <div className="process-card">
+      <div className="card-title">📊 Allocation{preview ? ' (preview)' : ''}</div>
+      <div className="table-wrapper">
+        <table className="allocation-table">
+          <thead>
+            <tr>
+              <th>Cluster</th>
+              <th>Driver ID</th>
+            </tr>
+          </thead>
+          <tbody>
+            {Object.entries(allocation).map(([cluster, driver]) => (
+              <tr key={cluster}>
+                <td>{cluster}</td>
+                <td className="mono">{driver}</td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      </div>
+    </div>
+  );
+};
+
+const LiveFairness = ({ report }) => {
+  return (
+    <div className="process-card">
+      <div className="card-title">⚙️ Fairness Report</div>
+      <div className="fairness-grid">
+        <div className="metric-box">
+          <div className="metric-label">Overall Score</div>
+          <div className="metric-value big">{(report.fairness_score * 100).toFixed(1)}%</div>
+          <div className="metric-bar">
+            <div className="metric-fill" style={{ width: `${report.fairness_score * 100}%` }} />
+          </div>
+        </div>
+      </div>
+    </div>
+  );
+};
+
+const LiveCritique = ({ critique }) => {
+  return (
+    <div className="process-card">
+      <div className="card-title">🔐 AI Fairness Audit</div>
+      <div className="critique-section">
+        <p className="audit-summary">
+          Critique score {(critique.score * 100).toFixed(1)}%
+          {critique.source ? ` (${critique.source})` : ''}
+        </p>
+        {critique.issues?.length > 0 && (
+          <div className="violations-list">
+            <h5>Issues Detected</h5>
+            {critique.issues.map((issue, idx) => (
+              <div key={idx} className="violation-item warning">{issue}</div>
+            ))}
+          </div>
+        )}
+        {critique.suggestion && (
+          <div className="recommendations">
+            <h6>Recommendations</h6>
+            <ul>
+              <li>{critique.suggestion}</li>
+            </ul>
+          </div>
+        )}
+      </div>
+    </div>
+  );
+};
+
+const LiveBriefing = ({ text }) => {
+  return (
+    <div className="process-card">
+      <div className="card-title">💡 AI Briefing</div>
+      <div className="explanation">
+        <p>{text}</p>
+      </div>
+    </div>
+  );
+};
+
 const FairnessReport = ({ report, metrics }) => {
   const reportData = report || {
     fairness_score: 0.90,
@@ -1,6 +1,14 @@
 import { useState, useCallback, useRef } from 'react';
 import apiClient from '../utils/api.js';
 
+/* ProcessView stage reached when a supervisor node finishes */
+const LIVE_STAGES = {
+  context_phase: 2,
+  core_allocator: 3,
+  allocation_phase: 4,
+  critique_phase: 5,
+};
+
 export const useDispatch = () => {
   const [state, setState] = useState({
     status: 'idle', // idle, loading, streaming, completed, error
@@ -10,43 +18,12 @@ export const useDispatch = () => {
     allocation: null,
     fairnessReport: null,
     critique: null,
+    liveResult: null,
     error: null,
   });
 
   const logStreamRef = useRef([]);
-
-  const startDispatch = useCallback(async (datasetId, isCustom = false) => {
-    try {
-      setState(prev => ({
-        ...prev,
-        status: 'loading',
-        logs: [],
-        currentStage: 1,
-        error: null,
-      }));
-
-      const response = await apiClient.dispatchAllocation(datasetId, isCustom);
-
-      if (response.success) {
-        setState(prev => ({
-          ...prev,
-          jobId: response.jobId,
-          allocation: response,
-          status: 'streaming',
-        }));
-
-        await streamLogs(response.jobId);
-      } else {
-        throw new Error('Failed to start dispatch');
-      }
-    } catch (err) {
-      setState(prev => ({
-        ...prev,
-        status: 'error',
-        error: err.message,
-      }));
-    }
-  }, []);
+  const liveAbortRef = useRef(null);
 
   const streamLogs = useCallback(async (jobId) => {
     try {
@@ -87,6 +64,90 @@ export const useDispatch = () => {
     }
   }, []);
 
+  /* Live dispatch over SSE: partial results arrive as each stage / node finishes */
+  const startLiveDispatch = useCallback(async (datasetId) => {
+    const log = (message, level = 'info') => {
+      logStreamRef.current.push({ timestamp: new Date().toISOString(), message, level });
+      return [...logStreamRef.current];
+    };
+
+    liveAbortRef.current?.abort();
+    const controller = new AbortController();
+    liveAbortRef.current = controller;
+
+    logStreamRef.current = [];
+    setState(prev => ({
+      ...prev,
+      status: 'streaming',
+      logs: [],
+      currentStage: 1,
+      liveResult: null,
+      error: null,
+    }));
+
+    for await (const { type, data } of apiClient.streamDispatch(datasetId, controller.signal)) {
+      if (controller.signal.aborted) break;
+      if (type === 'stage') {
+        setState(prev => ({ ...prev, logs: log(`Stage ${data.stage} done in ${data.seconds}s`) }));
+      } else if (type === 'node') {
+        const stage = LIVE_STAGES[data.node];
+        setState(prev => ({
+          ...prev,
+          logs: log(data.phase ? `${data.phase} › ${data.node}` : `${data.node} finished`),
+          currentStage: stage ? Math.max(prev.currentStage, stage) : prev.currentStage,
+        }));
+      } else if (type === 'allocation') {
+        setState(prev => ({
+          ...prev,
+          logs: log(data.preview ? 'Preview allocation ready' : 'Allocation ready', 'success'),
+          liveResult: { ...prev.liveResult, allocation: data.allocation, preview: data.preview },
+        }));
+      } else if (type === 'fairness') {
+        setState(prev => ({
+          ...prev,
+          logs: log(`Fairness score: ${data.fairness_score}`),
+          liveResult: { ...prev.liveResult, fairness_report: data },
+        }));
+      } else if (type === 'critique') {
+        setState(prev => ({
+          ...prev,
+          logs: log(`Critique score: ${data.critique.score}`),
+          liveResult: { ...prev.liveResult, critique: data.critique },
+        }));
+      } else if (type === 'result') {
+        setState(prev => ({
+          ...prev,
+          logs: log('Dispatch complete', 'success'),
+          currentStage: 6,
+          status: 'completed',
+          liveResult: { ...data, preview: false },
+        }));
+      } else if (type === 'explanation_token') {
+        setState(prev => ({
+          ...prev,
+          liveResult: {
+            ...prev.liveResult,
+            explanation: (prev.liveResult?.explanation || '') + data.text,
+          },
+        }));
+      } else if (type === 'explanation') {
+        setState(prev => ({
+          ...prev,
+          logs: log(data.status === 'ready' ? 'Briefing ready' : `Briefing ${data.status}`),
+          liveResult: { ...prev.liveResult, explanation: data.explanation },
+        }));
+      } else if (type === 'error') {
+        setState(prev => ({
+          ...prev,
+          logs: log(data.detail, 'error'),
+          status: prev.status === 'completed' ? prev.status : 'error',
+          error: data.detail,
+        }));
+      }
+    }
+    if (liveAbortRef.current === controller) liveAbortRef.current = null;
+  }, []);
+
   const submitCustomAllocation = useCallback(async (customData) => {
     try {
       // Validate data first
@@ -127,6 +188,9 @@ export const useDispatch = () => {
   }, [streamLogs]);
 
   const reset = useCallback(() => {
+    // Disconnecting stops the server-side dispatch
+    liveAbortRef.current?.abort();
+    liveAbortRef.current = null;
     setState({
       status: 'idle',
       currentStage: 0,
@@ -135,6 +199,7 @@ export const useDispatch = () => {
       allocation: null,
       fairnessReport: null,
       critique: null,
+      liveResult: null,
       error: null,
     });
     logStreamRef.current = [];
@@ -142,7 +207,7 @@ export const useDispatch = () => {
 
   return {
     ...state,
-    startDispatch,
+    startLiveDispatch,
     submitCustomAllocation,
     reset,
   };
@@ -5,16 +5,56 @@ const delay = (ms) => new Promise(resolve => setTimeout(resolve, ms));
 
 /* Mock API client - Replace with actual axios calls to FastAPI */
 export const apiClient = {
-  /* Dispatch allocation */
-  async dispatchAllocation(datasetId, custom = false) {
-    await delay(2000); // Simulate processing
+  /* Stream a live dispatch: Server-Sent Events from POST /dispatch/{id}/stream.
+     Yields { type, data } until the briefing ("explanation") or an "error" event.
+     Aborting `signal` (or leaving the loop) disconnects, which stops the dispatch. */
+  async *streamDispatch(datasetId, signal) {
+    const controller = new AbortController();
+    const abort = () => controller.abort();
+    signal?.addEventListener('abort', abort);
 
-    return {
-      success: true,
-      jobId: `job-${Date.now()}`,
-      ...MOCK_ALLOCATION,
-      timestamp: new Date().toISOString(),
-    };
+    try {
+      const response = await fetch(`${API_BASE_URL}/dispatch/${datasetId}/stream`, {
+        method: 'POST',
+        headers: { Accept: 'text/event-stream' },
+        signal: controller.signal,
+      });
+      if (!response.ok) {
+        yield { type: 'error', data: { status: 'error', detail: `HTTP ${response.status}` } };
+        return;
+      }
+
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = '';
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += value;
+
+        let end;
+        while ((end = buffer.indexOf('\n\n')) !== -1) {
+          const block = buffer.slice(0, end);
+          buffer = buffer.slice(end + 2);
+          let type = 'message';
+          let data = '';
+          for (const line of block.split('\n')) {
+            if (line.startsWith('event:')) type = line.slice(6).trim();
+            else if (line.startsWith('data:')) data += line.slice(5).trim();
+          }
+          const event = { type, data: data ? JSON.parse(data) : {} };
+          yield event;
+          if (type === 'explanation' || type === 'error') return;
+        }
+      }
+      yield { type: 'error', data: { status: 'error', detail: 'Connection lost' } };
+    } catch (err) {
+      if (err.name !== 'AbortError') {
+        yield { type: 'error', data: { status: 'error', detail: err.message } };
+      }
+    } finally {
+      signal?.removeEventListener('abort', abort);
+      controller.abort();
+    }
   },
 
   /* Get allocation status */